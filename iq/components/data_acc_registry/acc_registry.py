@@ -13,6 +13,7 @@ The procedure for working with the accumulation register:
 
 import datetime
 import sqlalchemy
+import sqlalchemy.dialects.postgresql
 from sqlalchemy.orm import sessionmaker
 
 from ...util import log_func
@@ -21,7 +22,7 @@ from ..data_uniobj_model.spc import GUID_FIELD_NAME
 
 from ..data_model import data_object
 
-__version__ = (0, 0, 0, 1)
+__version__ = (0, 0, 0, 3)
 
 
 # Default operation table name
@@ -41,6 +42,9 @@ DT_REQUISITE_TYPE = 'datetime'
 RECEIPT_OPERATION_CODE = '+'
 EXPENSE_OPERATION_CODE = '-'
 
+# Bulk operations. The number of result positions in one WHERE/VALUES clause
+BULK_CHUNK_SIZE = 500
+
 # Operation table field names
 CODE_OPERATION_FIELD = 'operation_code'
 DT_OPERATION_FIELD = 'dt_operation'
@@ -106,6 +110,9 @@ class iqAccRegistry(data_object.iqDataObject):
         # Extended requisites
         self._extended_requisites = list()
 
+        # Can the result positions be upserted? Key - (DB URL, table name, dimension requisite names)
+        self._upsert_result_tables = dict()
+
     def getOperationTable(self):
         """
         Operation table sqlalchemy object.
@@ -435,6 +442,10 @@ class iqAccRegistry(data_object.iqDataObject):
 
         requisites = self._getResultRequisites()
         self._result_table = self.genTable(result_table_name, requisites)
+        dimension_requisite_names = self.getDimensionRequisiteNames()
+        if dimension_requisite_names:
+            # One position for each dimension values. Used for the upsert of bulk operations
+            self._result_table.append_constraint(sqlalchemy.UniqueConstraint(*dimension_requisite_names))
         self._result_table.create(checkfirst=True)
         return self._result_table
 
@@ -475,6 +486,23 @@ class iqAccRegistry(data_object.iqDataObject):
         column_names = mapper.columns.keys()
         return GUID_FIELD_NAME in column_names
 
+    def _getPositionWhere(self, result_table, dimension_requisites):
+        """
+        Get conditions for finding the result position by dimension values.
+        Values are bound by the column types, so the position is found
+        regardless of the Python type of the value (date/datetime, '5'/5).
+        NULL dimension value is compared by IS NULL.
+
+        :param result_table: Result table object (sqlalchemy).
+        :param dimension_requisites: Dimension requisite values dictionary.
+        :return: Condition list.
+        """
+        where = list()
+        for name, value in dimension_requisites.items():
+            column = getattr(result_table.c, name)
+            where.append(column.is_(None) if value is None else column == sqlalchemy.literal(value, type_=column.type))
+        return where
+
     def _doOperation(self, transaction,
                      operation_table, result_table,
                      requisite_values):
@@ -496,9 +524,9 @@ class iqAccRegistry(data_object.iqDataObject):
         # Check if there is a record in the summary table according to measurements
         dimension_requisite_names = self.getDimensionRequisiteNames()
         dimension_requisites = {name: value for name, value in requisite_values.items() if name in dimension_requisite_names}
-        where = [getattr(result_table.c, name) == value for name, value in dimension_requisites.items()]
-        find = result_table.select(sqlalchemy.and_(*where)).execute()
-        if not find.rowcount:
+        where = self._getPositionWhere(result_table, dimension_requisites)
+        find = transaction.execute(result_table.select(sqlalchemy.and_(*where)))
+        if find.first() is None:
             # If there is no such record, then create it
             resource_requisite_names = self.getResourceRequisiteNames()
             resource_requisites = {name: 0 for name in resource_requisite_names}
@@ -540,6 +568,193 @@ class iqAccRegistry(data_object.iqDataObject):
         transaction.execute(sql)
         return True
 
+    def _isUpsertResultTable(self, transaction, result_table):
+        """
+        Can the result positions be added by INSERT ... ON CONFLICT DO UPDATE?
+        PostgreSQL result table must have an unique constraint on dimension requisites.
+
+        :param transaction: Transaction object (sqlalchemy).
+        :param result_table: Result table object (sqlalchemy).
+        :return: True/False.
+        """
+        engine = transaction.get_bind()
+        dimension_requisite_names = set(self.getDimensionRequisiteNames())
+        if engine.dialect.name != 'postgresql' or not dimension_requisite_names:
+            return False
+
+        # The table is inspected once
+        upsert_key = (str(engine.url), result_table.name, tuple(sorted(dimension_requisite_names)))
+        if upsert_key not in self._upsert_result_tables:
+            inspector = sqlalchemy.inspect(engine)
+            unique_column_names = [set(constraint['column_names']) for constraint in inspector.get_unique_constraints(result_table.name)]
+            unique_column_names += [set(index['column_names']) for index in inspector.get_indexes(result_table.name) if index['unique']]
+            self._upsert_result_tables[upsert_key] = dimension_requisite_names in unique_column_names
+        return self._upsert_result_tables[upsert_key]
+
+    def _upsertResultPositions(self, transaction, result_table, positions):
+        """
+        Add resource deltas to result positions by multi-row
+        INSERT ... ON CONFLICT DO UPDATE (PostgreSQL).
+
+        :param transaction: Transaction object (sqlalchemy).
+        :param result_table: Result table object (sqlalchemy).
+        :param positions: Result positions:
+            {(dimension values, ...): (resource deltas dictionary, extended requisite values dictionary), ...}
+        """
+        dimension_requisite_names = self.getDimensionRequisiteNames()
+        resource_requisite_names = self.getResourceRequisiteNames()
+
+        # All rows of one INSERT must have the same columns
+        position_groups = dict()
+        for dimension_values, (resource_deltas, extended_requisites) in positions.items():
+            requisites = dict(zip(dimension_requisite_names, dimension_values))
+            requisites.update(resource_deltas)
+            requisites.update(extended_requisites)
+            position_groups.setdefault(tuple(sorted(extended_requisites.keys())), list()).append(requisites)
+
+        for extended_requisite_names, rows in position_groups.items():
+            insert = sqlalchemy.dialects.postgresql.insert(result_table)
+            requisites = {name: getattr(result_table.c, name) + getattr(insert.excluded, name) for name in resource_requisite_names}
+            requisites.update({name: getattr(insert.excluded, name) for name in extended_requisite_names})
+            if requisites:
+                upsert = insert.on_conflict_do_update(index_elements=dimension_requisite_names, set_=requisites)
+            else:
+                upsert = insert.on_conflict_do_nothing(index_elements=dimension_requisite_names)
+            for i in range(0, len(rows), BULK_CHUNK_SIZE):
+                transaction.execute(upsert.values(rows[i:i + BULK_CHUNK_SIZE]))
+        log_func.debug(u'Accumulate registry <%s>. Upsert %d positions' % (self.getName(), len(positions)))
+
+    def _insertRows(self, transaction, table, rows):
+        """
+        Add rows by executemany INSERT.
+        Rows of one INSERT must have the same columns,
+        so the rows are grouped by column names.
+        Not set columns get the column server defaults.
+
+        :param transaction: Transaction object (sqlalchemy).
+        :param table: Table object (sqlalchemy).
+        :param rows: Row dictionary list.
+        """
+        row_groups = dict()
+        for row in rows:
+            row_groups.setdefault(tuple(sorted(row.keys())), list()).append(row)
+        for group_rows in row_groups.values():
+            transaction.execute(table.insert(), group_rows)
+
+    def _updateResultPositions(self, transaction, result_table, positions):
+        """
+        Add resource deltas to result positions.
+        Each position is updated by its dimension values in SQL,
+        so the values are compared by the column types and not by Python types.
+        Not found positions are added by executemany INSERT.
+
+        :param transaction: Transaction object (sqlalchemy).
+        :param result_table: Result table object (sqlalchemy).
+        :param positions: Result positions:
+            {(dimension values, ...): (resource deltas dictionary, extended requisite values dictionary), ...}
+        """
+        dimension_requisite_names = self.getDimensionRequisiteNames()
+
+        # If there is no such position, then create it with the resource deltas
+        new_rows = list()
+        for dimension_values, (resource_deltas, extended_requisites) in positions.items():
+            where = self._getPositionWhere(result_table, dict(zip(dimension_requisite_names, dimension_values)))
+            requisites = {name: getattr(result_table.c, name) + delta for name, delta in resource_deltas.items()}
+            requisites.update(extended_requisites)
+            if requisites:
+                update = result_table.update().values(**requisites)
+                if where:
+                    update = update.where(sqlalchemy.and_(*where))
+                found = transaction.execute(update).rowcount
+            else:
+                find = sqlalchemy.select([sqlalchemy.func.count()]).select_from(result_table)
+                if where:
+                    find = find.where(sqlalchemy.and_(*where))
+                found = transaction.execute(find).scalar()
+
+            if not found:
+                requisites = dict(zip(dimension_requisite_names, dimension_values))
+                requisites.update(resource_deltas)
+                requisites.update(extended_requisites)
+                new_rows.append(requisites)
+
+        if new_rows:
+            log_func.debug(u'Accumulate registry <%s>. Create %d positions' % (self.getName(), len(new_rows)))
+            self._insertRows(transaction, result_table, new_rows)
+        log_func.debug(u'Accumulate registry <%s>. Update %d positions' % (self.getName(), len(positions) - len(new_rows)))
+
+    def _doBulkOperations(self, transaction,
+                          operation_table, result_table,
+                          requisite_values_list):
+        """
+        Execute group operations by set-based bulk queries.
+        Resource deltas are aggregated by dimension values.
+        Then the result positions are changed by one upsert
+        and the operations are added by executemany INSERT.
+
+        :param transaction: Transaction object (sqlalchemy).
+        :param operation_table: Operation table object (sqlalchemy).
+        :param result_table: Result table object (sqlalchemy).
+        :param requisite_values_list: Requisite values list.
+        :return: True - operations were successfully completed.
+            False - Operations are not completed due to error.
+        """
+        dimension_requisite_names = self.getDimensionRequisiteNames()
+        resource_requisite_names = self.getResourceRequisiteNames()
+        extended_requisite_names = self.getExtendedRequisiteNames()
+        dt_operation = None
+
+        # (dimension values, ...) -> (resource deltas, extended requisite values)
+        positions = dict()
+        operations = list()
+        for requisite_values in requisite_values_list:
+            if self.isReceipt(**requisite_values):
+                # If the operation of receipt, then add
+                sign = 1
+            elif self.isExpense(**requisite_values):
+                # If the operation of expense, then subtract
+                sign = -1
+            else:
+                log_func.warning(u'Unsupported operation <%s>' % requisite_values.get(CODE_OPERATION_FIELD, None))
+                return False
+
+            dimension_values = tuple(requisite_values.get(name, None) for name in dimension_requisite_names)
+            if dimension_values not in positions:
+                positions[dimension_values] = (dict.fromkeys(resource_requisite_names, 0), dict())
+            resource_deltas, extended_requisites = positions[dimension_values]
+            for name in resource_requisite_names:
+                resource_deltas[name] += sign * (requisite_values.get(name, 0) or 0)
+            # Extended requisites of the last operation are saved in the result table
+            extended_requisites.update({name: requisite_values[name] for name in extended_requisite_names if name in requisite_values})
+
+            operation_requisite_values = self._getOperationRequisiteValues(**requisite_values)
+            # Each operation gets its own date-time of the motion operation.
+            # Operations are canceled in the exact reverse chronological order
+            dt_now = datetime.datetime.now()
+            if dt_operation is None or dt_now > dt_operation:
+                dt_operation = dt_now
+            else:
+                dt_operation += datetime.timedelta(microseconds=1)
+            operation_requisite_values[DT_OPERATION_FIELD] = dt_operation
+            operations.append(operation_requisite_values)
+
+        if not operations:
+            return True
+
+        if self._isUpsertResultTable(transaction, result_table):
+            # NULL dimension values do not conflict. These positions are updated in the usual way
+            null_positions = {dimension_values: position for dimension_values, position in positions.items() if None in dimension_values}
+            self._upsertResultPositions(transaction, result_table,
+                                        {dimension_values: position for dimension_values, position in positions.items() if None not in dimension_values})
+            if null_positions:
+                self._updateResultPositions(transaction, result_table, null_positions)
+        else:
+            self._updateResultPositions(transaction, result_table, positions)
+
+        # After changing the values in the final table, add the operations to the motion table
+        self._insertRows(transaction, operation_table, operations)
+        return True
+
     def _getOperationRequisiteValues(self, **requisite_values):
         """
         Get only required details of details for the operation table.
@@ -699,11 +914,13 @@ class iqAccRegistry(data_object.iqDataObject):
             log_func.fatal(u'Error undo operation <%s>' % requisite_values)
         return False
 
-    def doOperations(self, requisite_values_list):
+    def doOperations(self, requisite_values_list, bulk=True):
         """
         Execute group operations.
 
         :param requisite_values_list: Requisite values list.
+        :param bulk: Execute operations by set-based bulk queries?
+            If False then each operation is executed separately.
         :return: True - operation was successfully completed.
             False - Operation is not completed  due to error.
             The transaction rolled back the operation.
@@ -717,11 +934,16 @@ class iqAccRegistry(data_object.iqDataObject):
         transaction = session()
 
         try:
-            result = True
-            for requisite_values in requisite_values_list:
-                result = result and self._doOperation(transaction,
-                                                      operation_table, result_table,
-                                                      requisite_values)
+            if bulk:
+                result = self._doBulkOperations(transaction,
+                                                operation_table, result_table,
+                                                requisite_values_list)
+            else:
+                result = True
+                for requisite_values in requisite_values_list:
+                    result = result and self._doOperation(transaction,
+                                                          operation_table, result_table,
+                                                          requisite_values)
 
             if result:
                 # Commit transaction
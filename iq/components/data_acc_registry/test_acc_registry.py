@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Accumulate registry tests.
+"""
+
+import os
+import os.path
+import datetime
+import tempfile
+import unittest
+
+from . import acc_registry
+
+__version__ = (0, 0, 0, 1)
+
+
+class iqTestAccRegistry(acc_registry.iqAccRegistry):
+    """
+    Accumulate registry for tests.
+    """
+    def getName(self):
+        """
+        Object name.
+        """
+        return 'test_acc_registry'
+
+
+class iqAccRegistryTest(unittest.TestCase):
+    """
+    Accumulate registry test case.
+    """
+    def setUp(self):
+        db_file, self.db_filename = tempfile.mkstemp(suffix='.db')
+        os.close(db_file)
+        self.registry = iqTestAccRegistry(db_url='sqlite:///%s' % self.db_filename)
+        self.registry.addDimensionRequisite('item', acc_registry.INTEGER_REQUISITE_TYPE)
+        self.registry.addDimensionRequisite('dt', acc_registry.DT_REQUISITE_TYPE)
+        self.registry.addResourceRequisite('qty', acc_registry.FLOAT_REQUISITE_TYPE)
+        self.registry.addExtendedRequisite('note', acc_registry.TEXT_REQUISITE_TYPE)
+
+    def tearDown(self):
+        self.registry.disconnect()
+        if os.path.exists(self.db_filename):
+            os.remove(self.db_filename)
+
+    def getResults(self):
+        connection = self.registry.getConnection()
+        return [tuple(record) for record in connection.execute('SELECT item, qty, note FROM result ORDER BY item')]
+
+    def getOperationCount(self):
+        connection = self.registry.getConnection()
+        return connection.execute('SELECT COUNT(*) FROM operations').scalar()
+
+    def test_post_twice_to_same_position(self):
+        dt = datetime.date(2020, 1, 1)
+        for bulk in (True, False):
+            self.assertTrue(self.registry.doOperations([dict(operation_code='+', item=5, dt=dt, qty=2)], bulk=bulk))
+            self.assertTrue(self.registry.doOperations([dict(operation_code='+', item='5', dt=dt, qty=3, note='b')], bulk=bulk))
+            self.assertTrue(self.registry.doOperations([dict(operation_code='-', item=5, dt=dt, qty=1)], bulk=bulk))
+        self.assertEqual(self.getResults(), [(5, 8.0, 'b')])
+        self.assertEqual(self.getOperationCount(), 6)
+
+    def test_bulk_operations(self):
+        operations = [dict(operation_code='+', item=i % 3, qty=i, owner='doc') for i in range(10)]
+        operations += [dict(operation_code='-', item=1, qty=1, note='last')]
+        self.assertTrue(self.registry.doOperations(operations))
+        self.assertEqual(self.getResults(), [(0, 18.0, None), (1, 11.0, 'last'), (2, 15.0, None)])
+
+        connection = self.registry.getConnection()
+        dt_operations = [record[0] for record in connection.execute('SELECT dt_operation FROM operations')]
+        self.assertEqual(len(set(dt_operations)), len(operations))
+
+    def test_unsupported_operation(self):
+        self.assertFalse(self.registry.doOperations([dict(operation_code='?', item=1, qty=1)]))
+        self.assertEqual(self.getOperationCount(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
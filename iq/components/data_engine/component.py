@@ -116,6 +116,38 @@ class iqDataEngine(db_engine.iqDBEngineManager, object.iqObject):
         charset = self.getAttribute('charset')
         return db_engine.ENCODING2CHARSET.get(charset, charset)
 
+    def getPoolSize(self):
+        """
+        Get the number of connections to keep open inside the connection pool.
+
+        :return:
+        """
+        return self.getAttribute('pool_size')
+
+    def getMaxOverflow(self):
+        """
+        Get the number of connections to allow in connection pool overflow.
+
+        :return:
+        """
+        return self.getAttribute('max_overflow')
+
+    def getPoolRecycle(self):
+        """
+        Get connection recycle time in seconds.
+
+        :return:
+        """
+        return self.getAttribute('pool_recycle')
+
+    def isPoolPrePing(self):
+        """
+        Test connections for liveness upon each checkout?
+
+        :return:
+        """
+        return self.getAttribute('pool_pre_ping')
+
     def getDBFilename(self):
         """
         Get database filename (for SQLite).
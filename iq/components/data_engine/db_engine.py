@@ -15,7 +15,7 @@ import sqlalchemy.orm
 
 from ...util import log_func
 
-__version__ = (0, 0, 1, 2)
+__version__ = (0, 0, 1, 3)
 
 Base = sqlalchemy.ext.declarative.declarative_base()
 
@@ -26,6 +26,19 @@ ENCODING2CHARSET = {
 
 DEFAULT_SESSION_CLASS_ATTR_NAME = '__session_class'
 
+# Default number of records fetched from server-side cursor at a time
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def _convertValue(value):
+    """
+    Convert database value to python value.
+
+    :param value: Database value.
+    :return: Python value.
+    """
+    return float(value) if isinstance(value, decimal.Decimal) else value
+
 
 class iqDBEngineManager(object):
     """
@@ -103,6 +116,60 @@ class iqDBEngineManager(object):
         """
         return None
 
+    def getPoolSize(self):
+        """
+        Get the number of connections to keep open inside the connection pool.
+
+        :return:
+        """
+        return None
+
+    def getMaxOverflow(self):
+        """
+        Get the number of connections to allow in connection pool overflow.
+
+        :return:
+        """
+        return None
+
+    def getPoolRecycle(self):
+        """
+        Get connection recycle time in seconds.
+
+        :return:
+        """
+        return None
+
+    def isPoolPrePing(self):
+        """
+        Test connections for liveness upon each checkout?
+
+        :return:
+        """
+        return False
+
+    def getPoolOptions(self):
+        """
+        Get connection pool options for create engine.
+
+        :return: Connection pool options dictionary.
+        """
+        options = dict()
+        # SQLite engines do not use a queue pool
+        if self.getDialect() != sqlalchemy.dialects.sqlite.dialect.name:
+            pool_size = self.getPoolSize()
+            if pool_size:
+                options['pool_size'] = pool_size
+            max_overflow = self.getMaxOverflow()
+            if max_overflow is not None:
+                options['max_overflow'] = max_overflow
+        pool_recycle = self.getPoolRecycle()
+        if pool_recycle is not None:
+            options['pool_recycle'] = pool_recycle
+        if self.isPoolPrePing():
+            options['pool_pre_ping'] = True
+        return options
+
     def getDialectDriver(self):
         """
         Get dialect+driver.
@@ -214,11 +281,33 @@ class iqDBEngineManager(object):
     def getEngine(self, *args, **kwargs):
         """
         Get sqlalchemy DB engine object.
+        The engine is created once with the connection pool options.
         """
         if self._engine is None:
-            self._engine = self.create(*args, **kwargs)
+            pool_options = self.getPoolOptions()
+            pool_options.update(kwargs)
+            self._engine = self.create(*args, **pool_options)
         return self._engine
 
+    def getPoolStat(self):
+        """
+        Get connection pool statistics.
+
+        :return: Dictionary {'size': N, 'checked_in': N, 'checked_out': N, 'overflow': N, 'status': 'Pool status'}
+            or None if engine not created.
+        """
+        if self._engine is None:
+            return None
+
+        pool = self._engine.pool
+        # Not all pool classes support statistics
+        stat = dict(size=pool.size() if hasattr(pool, 'size') else None,
+                    checked_in=pool.checkedin() if hasattr(pool, 'checkedin') else None,
+                    checked_out=pool.checkedout() if hasattr(pool, 'checkedout') else None,
+                    overflow=pool.overflow() if hasattr(pool, 'overflow') else None,
+                    status=pool.status())
+        return stat
+
     def close(self, engine=None):
         """
         Close sqlalchemy DB engine object.
@@ -253,7 +342,7 @@ class iqDBEngineManager(object):
 
         :return: True/False.
         """
-        engine = self.create()
+        engine = self.getEngine()
 
         is_connect = False
         if engine:
@@ -272,33 +361,35 @@ class iqDBEngineManager(object):
 
         return is_connect
 
-    def executeSQL(self, sql_query, first_record=False):
+    def executeSQL(self, sql_query, first_record=False, params=None):
         """
         Execute SQL expression.
 
         :param sql_query: SQL query text.
         :param first_record: True - get only first record / False - get all records.
+        :param params: Bind parameters dictionary.
         :return: Dataset record list or None if error.
         """
-        if not self.checkConnection():
-            log_func.error(u'Not connect with DB <%s>' % self.getName())
-            return None
-
-        engine = self.create()
+        engine = self.getEngine()
         connection = None
         try:
             connection = engine.connect()
+        except:
+            log_func.fatal(u'Not connect with DB <%s>' % self.getName())
+            return None
 
+        try:
             recordset = list()
             transaction = connection.begin()
             try:
-                result = connection.execute(sql_query)
+                result = connection.execute(sql_query, params) if params else connection.execute(sql_query)
                 if result and result.returns_rows:
                     if first_record:
                         records = [result.fetchone()]
                     else:
                         records = result.fetchall()
-                    recordset = [{name: float(value) if isinstance(value, decimal.Decimal) else value for name, value in dict(rec).items()} for rec in records]
+                    names = list(result.keys())
+                    recordset = [dict(zip(names, [_convertValue(value) for value in rec])) for rec in records if rec is not None]
                 else:
                     log_func.info(u'Query <%s> not return recordset' % sql_query)
                 transaction.commit()
@@ -314,6 +405,106 @@ class iqDBEngineManager(object):
             log_func.fatal(err_txt)
         return None
 
+    def iterateSQL(self, sql_query, chunk_size=DEFAULT_CHUNK_SIZE, chunked=False, params=None):
+        """
+        Execute SQL expression and iterate records.
+        Records are fetched by server-side cursor chunk by chunk,
+        so the whole result is never materialized in memory.
+
+        :param sql_query: SQL query text.
+        :param chunk_size: Number of records fetched at a time.
+        :param chunked: True - yield record dictionary lists (chunks) / False - yield record dictionaries.
+        :param params: Bind parameters dictionary.
+        :return: Record dictionary (or record chunk) generator.
+        """
+        engine = self.getEngine()
+        connection = None
+        try:
+            connection = engine.connect().execution_options(stream_results=True)
+        except:
+            log_func.fatal(u'Not connect with DB <%s>' % self.getName())
+            return
+
+        transaction = connection.begin()
+        try:
+            result = connection.execute(sql_query, params) if params else connection.execute(sql_query)
+            if result and result.returns_rows:
+                names = list(result.keys())
+                while True:
+                    records = result.fetchmany(chunk_size)
+                    if not records:
+                        break
+                    chunk = [dict(zip(names, [_convertValue(value) for value in rec])) for rec in records]
+                    if chunked:
+                        yield chunk
+                    else:
+                        for record in chunk:
+                            yield record
+            else:
+                log_func.info(u'Query <%s> not return recordset' % sql_query)
+            transaction.commit()
+        except GeneratorExit:
+            transaction.rollback()
+            raise
+        except:
+            transaction.rollback()
+            log_func.fatal(u'Error execute SQL query <%s>' % sql_query)
+        finally:
+            connection.close()
+
+    def executeSQLColumns(self, sql_query, chunk_size=DEFAULT_CHUNK_SIZE, as_dataframe=False, params=None):
+        """
+        Execute SQL expression and get result as columns.
+        Records are fetched by server-side cursor chunk by chunk
+        without creating intermediate record dictionaries.
+
+        :param sql_query: SQL query text.
+        :param chunk_size: Number of records fetched at a time.
+        :param as_dataframe: True - get result as pandas DataFrame / False - as dictionary of lists.
+        :param params: Bind parameters dictionary.
+        :return: Dictionary {column name: [column values], ...}, pandas DataFrame or None if error.
+        """
+        engine = self.getEngine()
+        connection = None
+        try:
+            connection = engine.connect().execution_options(stream_results=True)
+        except:
+            log_func.fatal(u'Not connect with DB <%s>' % self.getName())
+            return None
+
+        columns = None
+        transaction = connection.begin()
+        try:
+            result = connection.execute(sql_query, params) if params else connection.execute(sql_query)
+            if result and result.returns_rows:
+                names = list(result.keys())
+                columns = {name: list() for name in names}
+                column_values = [columns[name] for name in names]
+                while True:
+                    records = result.fetchmany(chunk_size)
+                    if not records:
+                        break
+                    for values, chunk_values in zip(column_values, zip(*records)):
+                        values.extend([_convertValue(value) for value in chunk_values])
+            else:
+                log_func.info(u'Query <%s> not return recordset' % sql_query)
+                columns = dict()
+            transaction.commit()
+        except:
+            transaction.rollback()
+            log_func.fatal(u'Error execute SQL query <%s>' % sql_query)
+            columns = None
+        connection.close()
+
+        if columns is not None and as_dataframe:
+            try:
+                import pandas
+                return pandas.DataFrame(columns)
+            except ImportError:
+                log_func.error(u'Import error pandas. For install: pip3 install pandas')
+                return None
+        return columns
+
     def getSessionClass(self, db_url=None, base=None, *args, **kwargs):
         """
         Get session class.
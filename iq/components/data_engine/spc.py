@@ -116,6 +116,10 @@ DATAENGINE_SPC = {
     'echo': False,
     # 'echo_pool': False,
     'charset': None,
+    'pool_size': 5,
+    'max_overflow': 10,
+    'pool_recycle': -1,
+    'pool_pre_ping': False,
     # 'execution_options': None,
     # 'implicit_returning': True,
     # 'isolation_level': None,
@@ -150,6 +154,10 @@ DATAENGINE_SPC = {
             'editor': property_editor_id.CHOICE_EDITOR,
             'choices': getEncodings,
         },
+        'pool_size': property_editor_id.INTEGER_EDITOR,
+        'max_overflow': property_editor_id.INTEGER_EDITOR,
+        'pool_recycle': property_editor_id.INTEGER_EDITOR,
+        'pool_pre_ping': property_editor_id.CHECKBOX_EDITOR,
         # 'execution_options': property_editor_id.SCRIPT_EDITOR,
         # 'implicit_returning': property_editor_id.CHECKBOX_EDITOR,
         # 'isolation_level': property_editor_id.STRING_EDITOR,
@@ -169,18 +177,19 @@ DATAENGINE_SPC = {
         'echo': u'If True, the engine will log all statements',
         # 'echo_pool': u'if True, the connection pool will log all checkouts/checkins to the logging stream',
         'charset': 'Database code page',
+        'pool_size': u'The number of connections to keep open inside the connection pool',
+        'max_overflow': u'The number of connections to allow in connection pool overflow',
+        'pool_recycle': u'Recycle connections after the given number of seconds has passed. -1 - no timeout',
+        'pool_pre_ping': u'If True, test connections for liveness upon each checkout',
         # 'execution_options': u'Dictionary execution options which will be applied to all connections',
         # 'implicit_returning': u'When True, a RETURNING-compatible construct, if available, will be used to fetch newly generated primary key values',
         # 'isolation_level': u'This string parameter is interpreted by various dialects in order to affect the transaction isolation level of the database connection',
         # 'label_length': u'Optional integer value which limits the size of dynamically generated column labels to that many characters',
         # 'logging_name': u'',
-        # 'max_overflow': u'',
         # 'paramstyle': u'',
         # 'pool': u'',
         # 'poolclass': u'',
         # 'pool_logging_name': u'',
-        # 'pool_size': u'',
-        # 'pool_recycle': u'',
         # 'pool_reset_on_return': u'',
         # 'pool_timeout': u'',
         # 'strategy': u'',
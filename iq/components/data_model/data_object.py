@@ -11,10 +11,13 @@ from ...util import global_func
 from ..data_column import COMPONENT as column_component
 from . import component
 
-__version__ = (0, 0, 3, 1)
+__version__ = (0, 0, 3, 2)
 
 DATA_NAME_DELIMETER = '.'
 
+# The maximum number of values in one IN (...) query of the bulk record lookup
+LINK_CHUNK_SIZE = 500
+
 
 class iqDataObjectProto(object):
     """
@@ -80,6 +83,16 @@ class iqDataObject(iqDataObjectProto):
         log_func.warning(u'Not define method <getDataObjectRec> in <%s>' % self.__class__.__name__)
         return None
 
+    def getDataObjectRecs(self, values):
+        """
+        Get data object records by values.
+        Data objects with bulk lookup perform one IN (...) query per chunk of LINK_CHUNK_SIZE values.
+
+        :param values: Value list.
+        :return: Dictionary {value: record dictionary or None if not found}.
+        """
+        return dict([(value, self.getDataObjectRec(value)) for value in set(values)])
+
     def updateLinkDataDataset(self, dataset, columns=None):
         """
         Update dataset by link object data
@@ -95,10 +108,12 @@ class iqDataObject(iqDataObjectProto):
                         psp = column.getAttribute('link')
                         link_obj = global_func.getKernel().getObject(psp=psp)
                         if link_obj:
+                            column_name = column.getName()
+                            # One bulk lookup for all values of the column
+                            link_recs = link_obj.getDataObjectRecs([record.get(column_name, None) for record in dataset])
                             for i, record in enumerate(dataset):
-                                column_name = column.getName()
                                 value = record.get(column_name, None)
-                                link_rec = link_obj.getDataObjectRec(value)
+                                link_rec = link_recs.get(value, None)
                                 if isinstance(link_rec, dict):
                                     update_rec = {DATA_NAME_DELIMETER.join([column_name, name]): value for name, value in link_rec.items()}
                                     dataset[i].update(update_rec)
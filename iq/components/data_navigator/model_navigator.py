@@ -15,13 +15,13 @@ import sqlalchemy.sql.functions
 
 from ...util import log_func
 
-# from ..data_model import data_object
+from ..data_model import data_object
 
 from ..wx_filterchoicectrl import filter_convert
 
 from . import navigator_proto
 
-__version__ = (0, 0, 7, 4)
+__version__ = (0, 0, 7, 6)
 
 
 class iqModelNavigatorManager(navigator_proto.iqNavigatorManagerProto):
@@ -781,6 +781,39 @@ class iqModelNavigatorManager(navigator_proto.iqNavigatorManagerProto):
         self.stopTransaction(transaction)
         return None
 
+    def getRecsByColumnValues(self, column_name, values, cascade=True):
+        """
+        Get records by column values.
+        One IN (...) query is performed per chunk of values.
+
+        :param column_name: Column name.
+        :param values: Value list.
+        :param cascade: Add cascade data to record dictionaries?
+            If False then only record column values are got without relationship loading.
+        :return: Dictionary {value: first found record dictionary} or None if error.
+        """
+        values = [value for value in set(values) if value is not None]
+        model = self.getModel()
+        column = getattr(model, column_name)
+        result = dict()
+        if not values:
+            return result
+
+        transaction = self.startTransaction()
+        try:
+            for i in range(0, len(values), data_object.LINK_CHUNK_SIZE):
+                query = transaction.query(model).filter(column.in_(values[i:i + data_object.LINK_CHUNK_SIZE]))
+                for record in query:
+                    value = getattr(record, column_name)
+                    if value not in result:
+                        result[value] = self.getQueryResultRecordAsDict(record) if cascade else vars(record)
+            self.stopTransaction(transaction)
+            return result
+        except:
+            log_func.fatal(u'Error get records by column <%s> values in <%s>' % (column_name, self.getName()))
+        self.stopTransaction(transaction)
+        return None
+
     def loadDatasetRecs(self, id_field=None):
         """
         Load all dataset records from model.
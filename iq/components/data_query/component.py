@@ -65,6 +65,14 @@ class iqDataQuery(query.iqDBQuery, object.iqObject):
         """
         return self.getAttribute('sql_txt')
 
+    def isBindParams(self):
+        """
+        Pass query variables as bind parameters (:name)?
+
+        :return: True/False.
+        """
+        return self.getAttribute('bind_params')
+
     def test(self):
         """
         Object test function.
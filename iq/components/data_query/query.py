@@ -5,12 +5,17 @@
 Data query component.
 """
 
+import sqlalchemy
+
 from ...util import log_func
 from ...util import txtgen_func
 
 from ..data_model import data_object
 
-__version__ = (0, 0, 2, 1)
+__version__ = (0, 0, 3, 2)
+
+# Maximum number of compiled SQL statements in query cache
+COMPILED_SQL_CACHE_MAX_SIZE = 64
 
 
 class iqDBQuery(data_object.iqDataObjectProto):
@@ -21,7 +26,10 @@ class iqDBQuery(data_object.iqDataObjectProto):
         """
         Constructor.
         """
-        pass
+        # Compiled structural SQL template (SQL text, template object)
+        self._sql_template = None
+        # Compiled SQL statements. Key - SQL text
+        self._compiled_sql_cache = dict()
 
     def getDBEngine(self):
         """
@@ -41,6 +49,76 @@ class iqDBQuery(data_object.iqDataObjectProto):
         log_func.error(u'Not define getSQLText method in <%s>' % self.__class__.__name__)
         return None
 
+    def isBindParams(self):
+        """
+        Pass query variables as bind parameters (:name)?
+
+        :return: True/False.
+        """
+        return False
+
+    def _renderSQLText(self, sql_txt, variables):
+        """
+        Render SQL text template.
+        The template is compiled once for the SQL text.
+
+        :param sql_txt: SQL query text template.
+        :param variables: SQL query variables.
+        :return: SQL query text or None if error.
+        """
+        if self._sql_template is None or self._sql_template[0] != sql_txt:
+            self._sql_template = (sql_txt, txtgen_func.compileTemplate(sql_txt))
+        template = self._sql_template[1]
+        if template is None:
+            return None
+        return txtgen_func.generateByTemplate(template, variables)
+
+    def _getCompiledSQL(self, sql_txt):
+        """
+        Get compiled SQL statement from cache.
+
+        :param sql_txt: SQL query text.
+        :return: Tuple (compiled sqlalchemy text statement, bind parameter name list).
+        """
+        compiled_sql = self._compiled_sql_cache.get(sql_txt, None)
+        if compiled_sql is None:
+            if len(self._compiled_sql_cache) >= COMPILED_SQL_CACHE_MAX_SIZE:
+                self._compiled_sql_cache.clear()
+            statement = sqlalchemy.text(sql_txt)
+            compiled_sql = (statement, list(statement.compile().params.keys()))
+            self._compiled_sql_cache[sql_txt] = compiled_sql
+        return compiled_sql
+
+    def prepareSQL(self, **variables):
+        """
+        Prepare SQL query for execution.
+        In bind parameters mode the template is used only for structural templating,
+        variables are passed as bind values of :name parameters.
+        Not defined variables are bound as NULL with a warning.
+
+        :param variables: SQL query variables.
+        :return: Tuple (SQL query, bind parameters dictionary or None) or (None, None) if error.
+        """
+        sql_txt = self.getSQLText()
+        if not sql_txt:
+            return None, None
+
+        if txtgen_func.isGenered(sql_txt) or not self.isBindParams():
+            full_sql_txt = self._renderSQLText(sql_txt, variables)
+        else:
+            full_sql_txt = sql_txt
+
+        if not full_sql_txt or not self.isBindParams():
+            return full_sql_txt, None
+
+        statement, param_names = self._getCompiledSQL(full_sql_txt)
+        missing_names = [name for name in param_names if name not in variables]
+        if missing_names:
+            log_func.warning(u'Not defined SQL query variables %s in <%s>. NULL is used' % (missing_names,
+                                                                                          self.getName()))
+        params = {name: variables.get(name, None) for name in param_names}
+        return statement, params
+
     def execute(self, **variables):
         """
         Execute query.
@@ -49,18 +127,16 @@ class iqDBQuery(data_object.iqDataObjectProto):
         :return: Execute query result or None if error.
         """
         db = self.getDBEngine()
-        sql_txt = self.getSQLText()
-
-        if not db or not sql_txt:
+        if not db:
             return None
 
-        full_sql_txt = txtgen_func.generate(sql_txt, variables)
-        log_func.debug(u'Execute SQL:\n%s' % full_sql_txt)
+        full_sql, params = self.prepareSQL(**variables)
+        log_func.debug(u'Execute SQL:\n%s' % full_sql)
         try:
-            if full_sql_txt:
-                return db.executeSQL(full_sql_txt)
+            if full_sql is not None:
+                return db.executeSQL(full_sql, params=params)
         except:
-            log_func.fatal(u'Error execute query <%s>' % full_sql_txt)
+            log_func.fatal(u'Error execute query <%s>' % full_sql)
         return None
 
     def getFirstRecord(self, **variables):
@@ -71,18 +147,60 @@ class iqDBQuery(data_object.iqDataObjectProto):
         :return: Execute query result or None if error.
         """
         db = self.getDBEngine()
-        sql_txt = self.getSQLText()
+        if not db:
+            return None
+
+        full_sql, params = self.prepareSQL(**variables)
+        log_func.debug(u'Execute SQL:\n%s' % full_sql)
+        try:
+            if full_sql is not None:
+                return db.executeSQL(full_sql, first_record=True, params=params)
+        except:
+            log_func.fatal(u'Error execute query <%s>' % full_sql)
+        return None
+
+    def iterate(self, chunk_size=None, chunked=False, **variables):
+        """
+        Execute query and iterate records.
+        Records are fetched from the database chunk by chunk.
 
-        if not db or not sql_txt:
+        :param chunk_size: Number of records fetched at a time.
+            If None then default DB engine chunk size.
+        :param chunked: True - yield record dictionary lists (chunks) / False - yield record dictionaries.
+        :param variables: SQL query variables.
+        :return: Record dictionary (or record chunk) generator.
+        """
+        db = self.getDBEngine()
+        if not db:
+            return
+
+        full_sql, params = self.prepareSQL(**variables)
+        log_func.debug(u'Iterate SQL:\n%s' % full_sql)
+        if full_sql is not None:
+            if chunk_size:
+                yield from db.iterateSQL(full_sql, chunk_size=chunk_size, chunked=chunked, params=params)
+            else:
+                yield from db.iterateSQL(full_sql, chunked=chunked, params=params)
+
+    def getColumnDataset(self, as_dataframe=False, **variables):
+        """
+        Execute query and get result as columns.
+
+        :param as_dataframe: True - get result as pandas DataFrame / False - as dictionary of lists.
+        :param variables: SQL query variables.
+        :return: Dictionary {column name: [column values], ...}, pandas DataFrame or None if error.
+        """
+        db = self.getDBEngine()
+        if not db:
             return None
 
-        full_sql_txt = txtgen_func.generate(sql_txt, variables)
-        log_func.debug(u'Execute SQL:\n%s' % full_sql_txt)
+        full_sql, params = self.prepareSQL(**variables)
+        log_func.debug(u'Execute SQL:\n%s' % full_sql)
         try:
-            if full_sql_txt:
-                return db.executeSQL(full_sql_txt, first_record=True)
+            if full_sql is not None:
+                return db.executeSQLColumns(full_sql, as_dataframe=as_dataframe, params=params)
         except:
-            log_func.fatal(u'Error execute query <%s>' % full_sql_txt)
+            log_func.fatal(u'Error execute query <%s>' % full_sql)
         return None
 
     def genSQLText(self, **variables):
@@ -99,7 +217,7 @@ class iqDBQuery(data_object.iqDataObjectProto):
             return None
 
         try:
-            full_sql_txt = txtgen_func.generate(sql_txt, variables)
+            full_sql_txt = self._renderSQLText(sql_txt, variables)
             return full_sql_txt
         except:
             log_func.fatal(u'Error generate SQL query <%s>' % sql_txt)
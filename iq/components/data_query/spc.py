@@ -40,6 +40,7 @@ DATAQUERY_SPC = {
 
     'db_engine': None,
     'sql_txt': None,
+    'bind_params': False,
 
     '__package__': u'Data',
     '__icon__': 'fatcow/database_lightning',
@@ -53,10 +54,12 @@ DATAQUERY_SPC = {
             'valid': data_engine_spc.validDBEnginePsp,
         },
         'sql_txt': property_editor_id.SCRIPT_EDITOR,
+        'bind_params': property_editor_id.CHECKBOX_EDITOR,
     },
     '__help__': {
         'db_engine': u'Database engine',
         'sql_txt': u'SQL query text template',
+        'bind_params': u'Pass query variables as bind parameters (:name). The template is used only for structural templating',
     },
 }
 
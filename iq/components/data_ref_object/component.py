@@ -17,7 +17,7 @@ from ...util import global_func
 
 from ...role import component as role
 
-__version__ = (0, 0, 0, 1)
+__version__ = (0, 0, 0, 3)
 
 _ = lang_func.getTranslation().gettext
 
@@ -93,6 +93,42 @@ class iqDataRefObject(ref_object.iqRefObjectManager, data_navigator.COMPONENT):
         """
         return self.getAttribute('cache')
 
+    def getCacheMaxSize(self):
+        """
+        The maximum number of cached records.
+        """
+        max_size = self.getAttribute('cache_max_size')
+        return max_size if max_size else ref_object.ref_object_cache.DEFAULT_CACHE_MAX_SIZE
+
+    def getCacheTTL(self):
+        """
+        Cached record time to live in seconds. 0 - records do not expire.
+        """
+        ttl = self.getAttribute('cache_ttl')
+        return ttl if ttl else ref_object.ref_object_cache.DEFAULT_CACHE_TTL
+
+    def getCachePreload(self):
+        """
+        Preload whole ref object table to cache?
+        :return: True/False.
+        """
+        return bool(self.getAttribute('cache_preload'))
+
+    def getCacheVersion(self):
+        """
+        Check the table version counter for cross-process cache invalidation?
+        :return: True/False.
+        """
+        return bool(self.getAttribute('cache_version'))
+
+    def getSearchIndexMaxSize(self):
+        """
+        The maximum number of records in the text search index.
+        Larger ref objects are searched by SQL. 0 - search index is off.
+        """
+        max_size = self.getAttribute('search_index_max_size')
+        return max_size if max_size is not None else ref_object.ref_object_cache.DEFAULT_SEARCH_INDEX_MAX_SIZE
+
     def test(self):
         """
         Object test function.
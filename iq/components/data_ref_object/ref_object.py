@@ -6,6 +6,7 @@ Reference data object manager.
 """
 
 import sys
+import time
 import copy
 import operator
 import sqlalchemy.sql
@@ -23,7 +24,9 @@ from ...components.data_column import column_types
 
 from ..data_model import data_object
 
-__version__ = (0, 0, 7, 1)
+from . import ref_object_cache
+
+__version__ = (0, 0, 8, 0)
 
 _ = lang_func.getTranslation().gettext
 
@@ -31,6 +34,19 @@ DEFAULT_COD_COL_NAME = 'cod'
 DEFAULT_NAME_COL_NAME = 'name'
 DEFAULT_ACTIVE_COL_NAME = 'activate'
 
+LIKE_ESCAPE_CHAR = '\\'
+
+
+def escapeLike(text):
+    """
+    Escape LIKE pattern special characters.
+    Text search finds % and _ literally both by SQL and by the search index.
+
+    :param text: Search text.
+    :return: Escaped text for LIKE with escape=LIKE_ESCAPE_CHAR.
+    """
+    return text.replace(LIKE_ESCAPE_CHAR, LIKE_ESCAPE_CHAR * 2).replace('%', LIKE_ESCAPE_CHAR + '%').replace('_', LIKE_ESCAPE_CHAR + '_')
+
 
 class iqRefObjectManager(model_navigator.iqModelNavigatorManager):
     """
@@ -45,7 +61,7 @@ class iqRefObjectManager(model_navigator.iqModelNavigatorManager):
         model_navigator.iqModelNavigatorManager.__init__(self, model=model)
 
         # Internal object data cache
-        self.__cache__ = dict()
+        self.__cache__ = None
 
     def getCodColumnName(self):
         """
@@ -72,11 +88,230 @@ class iqRefObjectManager(model_navigator.iqModelNavigatorManager):
         """
         return False
 
+    def getCacheMaxSize(self):
+        """
+        The maximum number of cached records.
+        """
+        return ref_object_cache.DEFAULT_CACHE_MAX_SIZE
+
+    def getCacheTTL(self):
+        """
+        Cached record time to live in seconds. 0 - records do not expire.
+        """
+        return ref_object_cache.DEFAULT_CACHE_TTL
+
+    def getCachePreload(self):
+        """
+        Preload whole ref object table to cache?
+        :return: True/False.
+        """
+        return False
+
+    def getCacheVersion(self):
+        """
+        Check the table version counter for cross-process cache invalidation?
+        :return: True/False.
+        """
+        return False
+
+    def getSearchIndexMaxSize(self):
+        """
+        The maximum number of records in the text search index.
+        Larger ref objects are searched by SQL. 0 - search index is off.
+        """
+        return ref_object_cache.DEFAULT_SEARCH_INDEX_MAX_SIZE
+
+    def getRecCache(self):
+        """
+        Get internal ref object data cache.
+        """
+        if self.__cache__ is None:
+            self.__cache__ = ref_object_cache.iqRefObjectCache(max_size=self.getCacheMaxSize(),
+                                                               ttl=self.getCacheTTL(),
+                                                               preload=self.getCachePreload())
+        return self.__cache__
+
     def clearCache(self):
         """
         Clear internal ref object data cache.
         """
-        self.__cache__.clear()
+        if self.__cache__ is not None:
+            self.__cache__.clear()
+
+    def preloadCache(self):
+        """
+        Load whole ref object table to cache.
+
+        :return: True/False.
+        """
+        model = self.getModel()
+        transaction = self.startTransaction()
+        result = False
+        try:
+            records = [vars(record) for record in transaction.query(model).all()]
+            self.getRecCache().load(records, self.getCodColumnName())
+            result = True
+        except:
+            log_func.fatal(u'Error preload ref object <%s> cache' % self.getName())
+        self.stopTransaction(transaction)
+        return result
+
+    def _checkCacheVersion(self):
+        """
+        Clear cache if the table was changed by another process.
+        The table version is checked not more often than the version check period.
+        """
+        cache = self.getRecCache()
+        if time.time() - cache.version_check_time < ref_object_cache.DEFAULT_VERSION_CHECK_PERIOD:
+            return
+        transaction = self.startTransaction()
+        version = ref_object_cache.getTableVersion(transaction, self.getTable().name)
+        self.stopTransaction(transaction)
+        cache.version_check_time = time.time()
+        if version is not None and version != cache.version:
+            if cache.version is not None:
+                log_func.info(u'Ref object <%s> changed by another process. Clear cache' % self.getName())
+            cache.clear()
+            cache.version = version
+
+    def invalidateCache(self, cods=None):
+        """
+        Invalidate cached records after the ref object change.
+        The code hierarchy and the search indexes are invalidated too.
+        The table version is incremented for other processes.
+
+        :param cods: Changed code list. If None then the whole cache is invalidated.
+        """
+        if not self.getCache():
+            return
+        cache = self.getRecCache()
+        if cods is None or None in cods:
+            cache.invalidate()
+        else:
+            for cod in cods:
+                cache.invalidate(cod)
+            cache.invalidateIndexes()
+
+        if self.getCacheVersion():
+            transaction = self.startTransaction()
+            version = ref_object_cache.incTableVersion(transaction, self.getTable().name)
+            self.stopTransaction(transaction)
+            if version is None or cache.version is None or version != cache.version + 1:
+                # Another process also changed the table
+                cache.clear()
+            cache.version = version
+            cache.version_check_time = time.time()
+
+    def _prepareRecCache(self):
+        """
+        Prepare internal ref object data cache for lookup.
+        The cache is checked for changes in other processes and preloaded if necessary.
+
+        :return: Cache object.
+        """
+        cache = self.getRecCache()
+        if self.getCacheVersion():
+            self._checkCacheVersion()
+        if cache.preload and not cache.isLoaded():
+            self.preloadCache()
+        return cache
+
+    def buildHierarchy(self):
+        """
+        Build code hierarchy of the ref object by one code query.
+
+        :return: Code hierarchy object or None if error.
+        """
+        model = self.getModel()
+        transaction = self.startTransaction()
+        hierarchy = None
+        try:
+            cod_column = getattr(model, self.getCodColumnName())
+            cods = [record[0] for record in transaction.query(cod_column).all()]
+            hierarchy = ref_object_cache.iqRefObjectHierarchy(cod_len=self.getCodLen() or (), cods=cods)
+        except:
+            log_func.fatal(u'Error build code hierarchy of ref object <%s>' % self.getName())
+        self.stopTransaction(transaction)
+        return hierarchy
+
+    def isCacheIndexes(self):
+        """
+        Use cached indexes of the whole table (code hierarchy, search indexes)?
+        Indexes are used only if they follow changes in other processes:
+        the cache expires by time to live or checks the table version.
+
+        :return: True/False.
+        """
+        return bool(self.getCache() and (self.getCacheTTL() or self.getCacheVersion()))
+
+    def getHierarchy(self):
+        """
+        Get cached code hierarchy of the ref object.
+        The hierarchy is rebuilt after the ref object change.
+
+        :return: Code hierarchy object or None if the cached indexes are off or error.
+        """
+        if not self.isCacheIndexes():
+            return None
+        cache = self._prepareRecCache()
+        hierarchy = cache.getHierarchy()
+        if hierarchy is None:
+            hierarchy = self.buildHierarchy()
+            if hierarchy is not None:
+                cache.setHierarchy(hierarchy)
+        return hierarchy
+
+    def buildSearchIndex(self, column_name, sort_columns=()):
+        """
+        Build text search index of the column by one query.
+
+        :param column_name: Column name.
+        :param sort_columns: Sort order as column name list.
+        :return: Search index, False if the ref object is too large for the index
+            or None if error.
+        """
+        model = self.getModel()
+        transaction = self.startTransaction()
+        search_index = None
+        try:
+            max_size = self.getSearchIndexMaxSize()
+            query = transaction.query(getattr(model, self.getCodColumnName()), getattr(model, column_name))
+            if sort_columns:
+                query = query.order_by(*[getattr(model, col_name) for col_name in sort_columns])
+            rows = query.limit(max_size + 1).all()
+            if len(rows) > max_size:
+                log_func.info(u'Ref object <%s> is too large for search index. Search by SQL' % self.getName())
+                search_index = False
+            else:
+                search_index = ref_object_cache.iqRefObjectSearchIndex(rows)
+        except:
+            log_func.fatal(u'Error build search index of ref object <%s> column <%s>' % (self.getName(), column_name))
+        self.stopTransaction(transaction)
+        return search_index
+
+    def getSearchIndex(self, column_name, sort_columns=()):
+        """
+        Get cached text search index of the column.
+        The index is rebuilt after the ref object change.
+
+        :param column_name: Column name.
+        :param sort_columns: Sort order as column name list.
+        :return: Search index or None if the index is not used for the column.
+        """
+        if not self.isCacheIndexes() or not self.getSearchIndexMaxSize():
+            return None
+        column = self.getModel().__table__.columns.get(column_name, None)
+        if column is None or column.type.__class__ not in column_types.SQLALCHEMY_TEXT_TYPES:
+            return None
+
+        key = (column_name, tuple(sort_columns) if sort_columns else ())
+        cache = self._prepareRecCache()
+        search_index = cache.getSearchIndex(key)
+        if search_index is None:
+            search_index = self.buildSearchIndex(column_name, key[1])
+            if search_index is not None:
+                cache.setSearchIndex(key, search_index)
+        return search_index if search_index is not False else None
 
     def getRecByCod(self, cod):
         """
@@ -85,14 +320,20 @@ class iqRefObjectManager(model_navigator.iqModelNavigatorManager):
         :param cod: Reference data code.
         :return: Record dictionary or None if error.
         """
-        is_cache = self.getCache()
-        if is_cache and cod in self.__cache__:
-            return self.__cache__[cod]
+        if not self.getCache():
+            return self.getRecByColValue(column_name=self.getCodColumnName(),
+                                         column_value=cod)
+
+        cache = self._prepareRecCache()
+        found, record = cache.get(cod)
+        if found:
+            if record is None:
+                log_func.warning(u'Not found record by column <%s> value <%s>' % (self.getCodColumnName(), str(cod)))
+            return record
 
         record = self.getRecByColValue(column_name=self.getCodColumnName(),
                                        column_value=cod)
-        if is_cache:
-            self.__cache__[cod] = record
+        cache.put(cod, record)
         return record
 
     def getRecByColValue(self, column_name=None, column_value=None):
@@ -177,7 +418,7 @@ class iqRefObjectManager(model_navigator.iqModelNavigatorManager):
 
         :param column_name: Column name.
             If None then get cod column name.
-        :param search_text: Search content text.
+        :param search_text: Search content text. % and _ are not wildcards.
         :param case_sensitive: Case sensitive?
         :param do_sort: Sort result list by column.
         :param order_by: Sort column name list.
@@ -191,15 +432,33 @@ class iqRefObjectManager(model_navigator.iqModelNavigatorManager):
         if column_name is None:
             column_name = self.getCodColumnName()
 
+        if do_sort:
+            sort_columns = order_by if isinstance(order_by, (list, tuple)) else (column_name, )
+        else:
+            sort_columns = ()
+        search_index = self.getSearchIndex(column_name, sort_columns)
+        if search_index is not None:
+            cods = search_index.search(search_text, case_sensitive=case_sensitive, only_first=only_first)
+            if not cods:
+                log_func.warning(u'Reference data column <%s : %s> not found in <%s>' % (column_name,
+                                                                                         search_text,
+                                                                                         self.getName()))
+                return None
+            if len(cods) <= data_object.LINK_CHUNK_SIZE:
+                # Found records are got by one query at most
+                records = self.getDataObjectRecs(cods)
+                return [records[cod] for cod in cods if records.get(cod, None) is not None]
+            # Too many found records. Get them by a single search query
+
         model = self.getModel()
         transaction = self.startTransaction()
         result = None
         try:
-            search_expression = '%' + search_text + '%'
+            search_expression = '%' + escapeLike(search_text) + '%'
             if case_sensitive:
-                filter_data = [getattr(model, column_name).like(search_expression)]
+                filter_data = [getattr(model, column_name).like(search_expression, escape=LIKE_ESCAPE_CHAR)]
             else:
-                filter_data = [getattr(model, column_name).ilike(search_expression)]
+                filter_data = [getattr(model, column_name).ilike(search_expression, escape=LIKE_ESCAPE_CHAR)]
 
             query = transaction.query(model).filter(*filter_data)
             if do_sort:
@@ -253,7 +512,7 @@ class iqRefObjectManager(model_navigator.iqModelNavigatorManager):
         """
         :param column_name: Column name.
             If None then get cod column name.
-        :param search_text: Search content text.
+        :param search_text: Search content text. % and _ are not wildcards.
         :param case_sensitive: Case sensitive?
         :param do_sort: Sort result list by column.
         :return: Record dictionary or None if not found.
@@ -275,7 +534,7 @@ class iqRefObjectManager(model_navigator.iqModelNavigatorManager):
         """
         Search codes by column value.
 
-        :param search_value: Search value.
+        :param search_value: Search value. % and _ are not wildcards.
         :param search_colname: Search column name.
             If None then get name column.
         :param sort_columns: Sort order as column name list or
@@ -288,6 +547,10 @@ class iqRefObjectManager(model_navigator.iqModelNavigatorManager):
         if isinstance(sort_columns, str):
             sort_columns = (sort_columns, )
 
+        search_index = self.getSearchIndex(search_colname, sort_columns)
+        if search_index is not None:
+            return search_index.search(str(search_value), reverse=reverse)
+
         model = self.getModel()
         transaction = self.startTransaction()
         result = list()
@@ -297,8 +560,8 @@ class iqRefObjectManager(model_navigator.iqModelNavigatorManager):
 
             query = None
             if column_type.__class__ in column_types.SQLALCHEMY_TEXT_TYPES:
-                search_like = '%%%s%%' % search_value
-                query = transaction.query(model).filter(column.ilike(search_like))
+                search_like = '%%%s%%' % escapeLike(str(search_value))
+                query = transaction.query(model).filter(column.ilike(search_like, escape=LIKE_ESCAPE_CHAR))
             elif column_type.__class__ in column_types.SQLALCHEMY_INT_TYPES:
                 num_value = int(search_value)
                 query = transaction.query(model).filter(column == num_value)
@@ -392,6 +655,36 @@ class iqRefObjectManager(model_navigator.iqModelNavigatorManager):
         """
         return self.getRecByCod(cod=value)
 
+    def getDataObjectRecs(self, values):
+        """
+        Get data object records by values.
+        Not cached codes are got by IN (...) queries.
+
+        :param values: Reference data code list.
+        :return: Dictionary {code: record dictionary or None if not found}.
+        """
+        cods = set(values)
+        result = dict()
+        cache = self._prepareRecCache() if self.getCache() else None
+        if cache is not None:
+            for cod in list(cods):
+                found, record = cache.get(cod)
+                if found:
+                    result[cod] = record
+                    cods.discard(cod)
+        if not cods:
+            return result
+
+        records = self.getRecsByColumnValues(self.getCodColumnName(), cods, cascade=False)
+        for cod in cods:
+            record = records.get(cod, None) if records is not None else None
+            if record is None:
+                log_func.warning(u'Not found record by column <%s> value <%s>' % (self.getCodColumnName(), str(cod)))
+            result[cod] = record
+            if cache is not None and records is not None:
+                cache.put(cod, record)
+        return result
+
     def isEmpty(self):
         """
         Is the ref object empty?
@@ -495,6 +788,18 @@ class iqRefObjectManager(model_navigator.iqModelNavigatorManager):
         :param parent_cod: Parent level code. If None then get root level.
         :return: Record list or None if error.
         """
+        hierarchy = self.getHierarchy()
+        if hierarchy is not None:
+            cods = hierarchy.getChildCods(parent_cod)
+            if cods is None:
+                log_func.warning(u'Not valid parent code <%s> in ref object <%s>' % (parent_cod, self.getName()))
+                return None
+            if len(cods) <= self.getCacheMaxSize():
+                records = self.getDataObjectRecs(cods) if cods else dict()
+                return [records[cod] for cod in cods if records.get(cod, None) is not None]
+            # The level is larger than the record cache.
+            # Get it by a single level query and do not flood the cache
+
         cod_len = self.getCodLen()
         model = self.getModel()
         transaction = self.startTransaction()
@@ -532,6 +837,11 @@ class iqRefObjectManager(model_navigator.iqModelNavigatorManager):
         :param parent_cod: Code.
         :return: True/False.
         """
+        hierarchy = self.getHierarchy()
+        if hierarchy is not None:
+            child_count = hierarchy.getChildCount(parent_cod)
+            return bool(child_count) if child_count is not None else None
+
         cod_len = self.getCodLen()
 
         model = self.getModel()
@@ -719,6 +1029,7 @@ class iqRefObjectManager(model_navigator.iqModelNavigatorManager):
         :param record: Record data.
         :return: True/False.
         """
+        result = False
         if self.hasCod(cod):
             # log_func.debug(u'Save. Update record. Code <%s>' % cod)
             cod_col_name = self.getCodColumnName()
@@ -728,15 +1039,16 @@ class iqRefObjectManager(model_navigator.iqModelNavigatorManager):
             find_id = find_rec.get('id', None)
             # log_func.debug(u'Find ID %d' % find_id)
             if find_id:
-                return self.saveRec(id=find_id, record=record)
+                result = self.saveRec(id=find_id, record=record)
             else:
                 log_func.warning(u'Record not found fo cod <%s>' % cod)
         else:
             log_func.debug(u'Save. Add record. Code <%s>' % cod)
             new_record = copy.deepcopy(record)
             new_record[self.getCodColumnName()] = cod
-            return self.addRec(record=new_record)
-        return False
+            result = self.addRec(record=new_record)
+
+        return result
 
     def delRecByCod(self, cod):
         """
@@ -747,14 +1059,137 @@ class iqRefObjectManager(model_navigator.iqModelNavigatorManager):
         """
         return self.deleteRec(id=cod, id_field=self.getCodColumnName())
 
+    def _getChangedCods(self, id, record=None, id_field=None):
+        """
+        Get codes changed by the record identifier.
+
+        :param id: Record identifier in model.
+        :param record: New record dictionary.
+        :param id_field: Identifier field name.
+        :return: Code list.
+        """
+        cod_column_name = self.getCodColumnName()
+        if id_field == cod_column_name:
+            cods = [id]
+        else:
+            cods = self.getRecCache().findCods(id_field or 'id', id)
+        if record and cod_column_name in record:
+            cods.append(record[cod_column_name])
+        return cods
+
+    def addRec(self, record, auto_commit=True, ignore_readonly=False):
+        """
+        Add record in model.
+        The ref object cache is invalidated.
+
+        :param record: Record dictionary.
+        :param auto_commit: Automatic commit?
+        :param ignore_readonly: Ignore readonly option?
+        :return: True/False.
+        """
+        result = model_navigator.iqModelNavigatorManager.addRec(self, record=record, auto_commit=auto_commit,
+                                                                ignore_readonly=ignore_readonly)
+        if result:
+            self.invalidateCache([record.get(self.getCodColumnName(), None)])
+        return result
+
+    def addRecs(self, records, ignore_readonly=False):
+        """
+        Add records in model.
+        The ref object cache is invalidated.
+
+        :param records: Record list.
+        :param ignore_readonly: Ignore readonly option?
+        :return: True/False.
+        """
+        records = list(records)
+        result = model_navigator.iqModelNavigatorManager.addRecs(self, records=records,
+                                                                 ignore_readonly=ignore_readonly)
+        if result:
+            self.invalidateCache([record.get(self.getCodColumnName(), None) for record in records])
+        return result
+
+    def saveRec(self, id, record, id_field=None, ignore_readonly=False):
+        """
+        Save record in model.
+        The ref object cache is invalidated.
+
+        :param id: Record identifier in model.
+        :param record: Record dictionary.
+        :param id_field: Identifier field name.
+        :param ignore_readonly: Ignore readonly option?
+        :return: True/False.
+        """
+        changed_cods = self._getChangedCods(id, record=record, id_field=id_field) if self.getCache() else list()
+        result = model_navigator.iqModelNavigatorManager.saveRec(self, id=id, record=record, id_field=id_field,
+                                                                 ignore_readonly=ignore_readonly)
+        if result:
+            self.invalidateCache(changed_cods)
+        return result
+
+    def deleteRec(self, id, id_field=None, ignore_readonly=False):
+        """
+        Delete record in model.
+        The ref object cache is invalidated.
+
+        :param id: Record identifier in model.
+        :param id_field: Identifier field name.
+        :param ignore_readonly: Ignore readonly option?
+        :return: True/False.
+        """
+        changed_cods = self._getChangedCods(id, id_field=id_field) if self.getCache() else list()
+        result = model_navigator.iqModelNavigatorManager.deleteRec(self, id=id, id_field=id_field,
+                                                                   ignore_readonly=ignore_readonly)
+        if result:
+            self.invalidateCache(changed_cods)
+        return result
+
+    def deleteWhere(self, *where_args, **where_kwargs):
+        """
+        Delete record in model by filter.
+        The whole ref object cache is invalidated.
+
+        :param where_args: Where options.
+        :param where_kwargs: Where options.
+        :return: True/False.
+        """
+        result = model_navigator.iqModelNavigatorManager.deleteWhere(self, *where_args, **where_kwargs)
+        self.invalidateCache()
+        return result
+
+    def clear(self, ignore_readonly=False):
+        """
+        Clear reference data object tables.
+        The whole ref object cache is invalidated.
+
+        :param ignore_readonly: Ignore readonly option?
+        :return: True/False.
+        """
+        result = model_navigator.iqModelNavigatorManager.clear(self, ignore_readonly=ignore_readonly)
+        if result:
+            self.invalidateCache()
+        return result
+
     def isChildrenCodes(self, cod):
         """
         Does the above code have sublevel subcodes?
 
         :param cod: Ref object code.
         """
+        return bool(self.hasChildrenCodes(cod))
+
+    def getChildrenCount(self, cod=None):
+        """
+        Get number of children codes.
+
+        :param cod: Ref object code. If None then root level.
+        :return: Number of children codes or None if error.
+        """
+        hierarchy = self.getHierarchy()
+        if hierarchy is not None:
+            return hierarchy.getChildCount(cod)
         recs = self.getLevelRecsByCod(cod)
-        return bool(recs)
+        return len(recs) if recs is not None else None
 
     def getChildrenCodes(self, cod=None):
         """
@@ -763,6 +1198,10 @@ class iqRefObjectManager(model_navigator.iqModelNavigatorManager):
         :param cod: Ref object code.
         :return: Get children codes list as tuple.
         """
+        hierarchy = self.getHierarchy()
+        if hierarchy is not None:
+            cods = hierarchy.getChildCods(cod)
+            return list(cods) if cods else tuple()
         recs = self.getLevelRecsByCod(cod)
         return [rec.get(self.getCodColumnName(), None) for rec in recs] if recs else tuple()
 
@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Reference data object record cache.
+
+The cache keeps ref object records by code.
+The size of the cache is limited (LRU) and the records can expire (TTL).
+Small ref objects can be preloaded completely. Then a code missing
+in the preloaded cache means that there is no such record.
+
+The code hierarchy of the ref object (parent code -> child codes)
+and the text search indexes are kept in the cache too
+and are rebuilt after changes.
+
+Cross-process invalidation is made by the table version counter.
+Every process changing a ref object increments the version of its table.
+The cache is cleared when another version of the table is found.
+"""
+
+import time
+import collections
+import sqlalchemy
+
+from ...util import log_func
+
+__version__ = (0, 0, 0, 4)
+
+DEFAULT_CACHE_MAX_SIZE = 1000
+# Record time to live in seconds. 0 - records do not expire
+DEFAULT_CACHE_TTL = 0
+
+# The maximum number of records in the text search index.
+# Larger ref objects are searched by SQL. 0 - search index is off
+DEFAULT_SEARCH_INDEX_MAX_SIZE = 100000
+# Search index N-gram length
+SEARCH_NGRAM_LEN = 3
+
+# Period of the table version check in seconds
+DEFAULT_VERSION_CHECK_PERIOD = 5
+
+VERSION_TABLE_NAME = 'iq_table_version'
+
+VERSION_METADATA = sqlalchemy.MetaData()
+VERSION_TABLE = sqlalchemy.Table(VERSION_TABLE_NAME, VERSION_METADATA,
+                                 sqlalchemy.Column('table_name', sqlalchemy.String(255), primary_key=True),
+                                 sqlalchemy.Column('version', sqlalchemy.Integer, nullable=False, default=0))
+
+
+class iqRefObjectCache(object):
+    """
+    Reference data object record cache.
+    """
+    def __init__(self, max_size=DEFAULT_CACHE_MAX_SIZE, ttl=DEFAULT_CACHE_TTL, preload=False):
+        """
+        Constructor.
+
+        :param max_size: The maximum number of cached records.
+            Not used in preload mode.
+        :param ttl: Record time to live in seconds. 0 - records do not expire.
+        :param preload: Preload whole table mode?
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.preload = preload
+
+        # Code -> (record, cache time)
+        self._records = collections.OrderedDict()
+        # Preload time or None if the table is not loaded
+        self._load_time = None
+
+        # Code hierarchy and its build time
+        self._hierarchy = None
+        self._hierarchy_time = None
+        # Search index key -> (search index or False if the table is too large, build time)
+        self._search_indexes = dict()
+
+        # Known table version
+        self.version = None
+        # Last table version check time
+        self.version_check_time = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def _isExpired(self, cache_time):
+        """
+        Is the cache time expired?
+        """
+        return bool(self.ttl) and time.time() - cache_time > self.ttl
+
+    def isLoaded(self):
+        """
+        Is the whole table loaded?
+        """
+        if self._load_time is None:
+            return False
+        if self._isExpired(self._load_time):
+            self.clear()
+            return False
+        return True
+
+    def get(self, cod):
+        """
+        Get record from cache.
+
+        :param cod: Code.
+        :return: Tuple (found?, record). Missing code in the loaded table is found as None record.
+        """
+        cache_item = self._records.get(cod, None)
+        if cache_item is not None and not self._isExpired(cache_item[1]):
+            if not self.preload:
+                self._records.move_to_end(cod)
+            self.hits += 1
+            return True, cache_item[0]
+        if cache_item is None and self.isLoaded():
+            self.hits += 1
+            return True, None
+
+        if cache_item is not None:
+            del self._records[cod]
+        self.misses += 1
+        return False, None
+
+    def put(self, cod, record):
+        """
+        Put record to cache.
+
+        :param cod: Code.
+        :param record: Record dictionary or None if record not found.
+        """
+        self._records[cod] = (record, time.time())
+        if not self.preload:
+            self._records.move_to_end(cod)
+            while len(self._records) > self.max_size:
+                self._records.popitem(last=False)
+
+    def load(self, records, cod_column_name):
+        """
+        Load whole table to cache.
+
+        :param records: Record dictionary list.
+        :param cod_column_name: Code column name.
+        """
+        self._records.clear()
+        cache_time = time.time()
+        for record in records:
+            self._records[record.get(cod_column_name, None)] = (record, cache_time)
+        self._load_time = cache_time
+
+    def findCods(self, column_name, value):
+        """
+        Find cached record codes by column value.
+
+        :param column_name: Column name.
+        :param value: Column value.
+        :return: Code list.
+        """
+        return [cod for cod, (record, cache_time) in self._records.items()
+                if record is not None and record.get(column_name, None) == value]
+
+    def getHierarchy(self):
+        """
+        Get code hierarchy or None if it is not built or expired.
+        """
+        if self._hierarchy is not None and self._isExpired(self._hierarchy_time):
+            self._hierarchy = None
+        return self._hierarchy
+
+    def setHierarchy(self, hierarchy):
+        """
+        Set code hierarchy.
+
+        :param hierarchy: Code hierarchy object.
+        """
+        self._hierarchy = hierarchy
+        self._hierarchy_time = time.time()
+
+    def getSearchIndex(self, key):
+        """
+        Get text search index.
+
+        :param key: Search index key.
+        :return: Search index, False if the table is too large for the index
+            or None if it is not built or expired.
+        """
+        index_item = self._search_indexes.get(key, None)
+        if index_item is not None and self._isExpired(index_item[1]):
+            del self._search_indexes[key]
+            index_item = None
+        return index_item[0] if index_item is not None else None
+
+    def setSearchIndex(self, key, search_index):
+        """
+        Set text search index.
+
+        :param key: Search index key.
+        :param search_index: Search index or False if the table is too large for the index.
+        """
+        self._search_indexes[key] = (search_index, time.time())
+
+    def invalidate(self, cod=None):
+        """
+        Invalidate cached record and code hierarchy.
+        In preload mode the whole cache is invalidated.
+
+        :param cod: Code. If None then the whole cache is invalidated.
+        """
+        if cod is None or self.preload:
+            self.clear()
+        else:
+            self._records.pop(cod, None)
+            self.invalidateIndexes()
+
+    def invalidateIndexes(self):
+        """
+        Invalidate code hierarchy and search indexes.
+        """
+        self._hierarchy = None
+        self._search_indexes.clear()
+
+    def clear(self):
+        """
+        Clear cache.
+        """
+        self._records.clear()
+        self._load_time = None
+        self._hierarchy = None
+        self._search_indexes.clear()
+
+    def getStat(self):
+        """
+        Get cache statistics.
+
+        :return: Statistics dictionary.
+        """
+        return dict(size=len(self._records), max_size=self.max_size, ttl=self.ttl,
+                    preload=self.preload, loaded=self._load_time is not None,
+                    hierarchy=self._hierarchy is not None,
+                    search_indexes=len(self._search_indexes),
+                    hits=self.hits, misses=self.misses)
+
+
+class iqRefObjectHierarchy(object):
+    """
+    Code hierarchy of the ref object.
+    The parent code is the code prefix of the previous level length.
+    """
+    def __init__(self, cod_len=(), cods=()):
+        """
+        Constructor.
+
+        :param cod_len: Level code lengths.
+        :param cods: All ref object codes.
+        """
+        # Code lengths of levels. Level index -> code length
+        self._level_lens = [sum(cod_len[:i + 1]) for i in range(len(cod_len))]
+        # Parent code -> sorted child codes. Root level parent code is None
+        self._children = dict()
+        self.build(cods)
+
+    def build(self, cods):
+        """
+        Build hierarchy.
+
+        :param cods: All ref object codes.
+        """
+        self._children = dict()
+        for cod in cods:
+            if cod is None:
+                continue
+            if not self._level_lens:
+                self._children.setdefault(None, list()).append(cod)
+            elif len(cod) in self._level_lens:
+                self._children.setdefault(self.getParentCod(cod), list()).append(cod)
+        for child_cods in self._children.values():
+            child_cods.sort()
+
+    def getParentCod(self, cod):
+        """
+        Get parent code.
+
+        :param cod: Code.
+        :return: Parent code or None for the root level code.
+        """
+        level_idx = self._level_lens.index(len(cod))
+        return cod[:self._level_lens[level_idx - 1]] if level_idx else None
+
+    def isValidParentCod(self, parent_cod):
+        """
+        Can the code have child codes?
+
+        :param parent_cod: Code. If None then root level.
+        """
+        return parent_cod is None or not self._level_lens or len(parent_cod) in self._level_lens
+
+    def getChildCods(self, parent_cod=None):
+        """
+        Get child codes.
+
+        :param parent_cod: Parent code. If None then get root level codes.
+        :return: Code list or None if the parent code length is not valid.
+        """
+        if not self._level_lens:
+            # Not hierarchical ref object. All codes are root level codes
+            return self._children.get(None, list())
+        if not self.isValidParentCod(parent_cod):
+            return None
+        return self._children.get(parent_cod, list())
+
+    def getChildCount(self, parent_cod=None):
+        """
+        Get number of child codes.
+
+        :param parent_cod: Parent code. If None then root level.
+        :return: Number of child codes or None if the parent code length is not valid.
+        """
+        child_cods = self.getChildCods(parent_cod)
+        return len(child_cods) if child_cods is not None else None
+
+
+class iqRefObjectSearchIndex(object):
+    """
+    Text search index of the ref object column.
+    The index is a N-gram (trigram) map: N-gram -> row indexes.
+    Rows are kept in the sort order, so found codes are already sorted.
+    """
+    def __init__(self, rows=()):
+        """
+        Constructor.
+
+        :param rows: Sorted (code, column value) list.
+        """
+        self._cods = list()
+        self._values = list()
+        self._lower_values = list()
+        # N-gram -> increasing row index list
+        self._ngrams = dict()
+        self.build(rows)
+
+    def build(self, rows):
+        """
+        Build index.
+
+        :param rows: Sorted (code, column value) list.
+        """
+        self._cods = list()
+        self._values = list()
+        self._lower_values = list()
+        self._ngrams = dict()
+        for cod, value in rows:
+            value = value if value is not None else u''
+            lower_value = value.lower()
+            row_idx = len(self._cods)
+            self._cods.append(cod)
+            self._values.append(value)
+            self._lower_values.append(lower_value)
+            for ngram in set(lower_value[i:i + SEARCH_NGRAM_LEN] for i in range(len(lower_value) - SEARCH_NGRAM_LEN + 1)):
+                self._ngrams.setdefault(ngram, list()).append(row_idx)
+
+    def __len__(self):
+        return len(self._cods)
+
+    def _getCandidateRowIdxs(self, lower_text):
+        """
+        Get candidate row indexes for the search text.
+        The candidates are rows of the rarest N-gram of the text.
+
+        :param lower_text: Search text in lower case.
+        :return: Increasing row index sequence.
+        """
+        if len(lower_text) < SEARCH_NGRAM_LEN:
+            return range(len(self._cods))
+        row_idxs = None
+        for i in range(len(lower_text) - SEARCH_NGRAM_LEN + 1):
+            ngram_row_idxs = self._ngrams.get(lower_text[i:i + SEARCH_NGRAM_LEN], None)
+            if ngram_row_idxs is None:
+                return list()
+            if row_idxs is None or len(ngram_row_idxs) < len(row_idxs):
+                row_idxs = ngram_row_idxs
+        return row_idxs
+
+    def search(self, search_text, case_sensitive=False, reverse=False, only_first=False):
+        """
+        Search codes by column content.
+
+        :param search_text: Search content text.
+        :param case_sensitive: Case sensitive?
+        :param reverse: Reverse sort?
+        :param only_first: Get only first code.
+        :return: Code list in the sort order.
+        """
+        lower_text = search_text.lower()
+        row_idxs = self._getCandidateRowIdxs(lower_text)
+        if reverse:
+            row_idxs = reversed(row_idxs)
+        values = self._values if case_sensitive else self._lower_values
+        text = search_text if case_sensitive else lower_text
+
+        cods = list()
+        for row_idx in row_idxs:
+            if text in values[row_idx]:
+                cods.append(self._cods[row_idx])
+                if only_first:
+                    break
+        return cods
+
+
+def getTableVersion(transaction, table_name):
+    """
+    Get table version counter.
+    The version table is created if it does not exist.
+
+    :param transaction: Session/transaction object.
+    :param table_name: Table name.
+    :return: Table version or None if error.
+    """
+    try:
+        VERSION_TABLE.create(bind=transaction.get_bind(), checkfirst=True)
+        select = sqlalchemy.select([VERSION_TABLE.c.version]).where(VERSION_TABLE.c.table_name == table_name)
+        version = transaction.execute(select).scalar()
+        return version if version is not None else 0
+    except:
+        log_func.fatal(u'Error get table <%s> version' % table_name)
+    return None
+
+
+def incTableVersion(transaction, table_name):
+    """
+    Increment table version counter.
+
+    :param transaction: Session/transaction object.
+    :param table_name: Table name.
+    :return: New table version or None if error.
+    """
+    try:
+        VERSION_TABLE.create(bind=transaction.get_bind(), checkfirst=True)
+        update = VERSION_TABLE.update().where(VERSION_TABLE.c.table_name == table_name).values(version=VERSION_TABLE.c.version + 1)
+        if not transaction.execute(update).rowcount:
+            transaction.execute(VERSION_TABLE.insert().values(table_name=table_name, version=1))
+        transaction.commit()
+        select = sqlalchemy.select([VERSION_TABLE.c.version]).where(VERSION_TABLE.c.table_name == table_name)
+        return transaction.execute(select).scalar()
+    except:
+        transaction.rollback()
+        log_func.fatal(u'Error increment table <%s> version' % table_name)
+    return None
@@ -13,7 +13,7 @@ from ... import passport
 
 from .. import data_refobj_model
 
-__version__ = (0, 0, 0, 1)
+__version__ = (0, 0, 0, 4)
 
 
 REF_OBJ_MODEL_TYPES = (data_refobj_model.COMPONENT_TYPE, )
@@ -71,6 +71,11 @@ DATAREFOBJECT_SPC = {
     'cod_len': (2, ),
     'level_labels': None,
     'cache': True,
+    'cache_max_size': 1000,
+    'cache_ttl': 0,
+    'cache_preload': False,
+    'cache_version': False,
+    'search_index_max_size': 100000,
 
     '__package__': u'Data',
     '__icon__': 'fatcow/book_addresses',
@@ -87,11 +92,21 @@ DATAREFOBJECT_SPC = {
         'cod_len': property_editor_id.STRINGLIST_EDITOR,
         'level_labels': property_editor_id.STRINGLIST_EDITOR,
         'cache': property_editor_id.CHECKBOX_EDITOR,
+        'cache_max_size': property_editor_id.INTEGER_EDITOR,
+        'cache_ttl': property_editor_id.INTEGER_EDITOR,
+        'cache_preload': property_editor_id.CHECKBOX_EDITOR,
+        'cache_version': property_editor_id.CHECKBOX_EDITOR,
+        'search_index_max_size': property_editor_id.INTEGER_EDITOR,
     },
     '__help__': {
         'cod_len': u'List of level code lengths',
         'level_labels': u'Level label list',
         'cache': 'Cache ref object data',
+        'cache_max_size': u'The maximum number of cached records',
+        'cache_ttl': u'Cached record time to live in seconds (0 - records do not expire)',
+        'cache_preload': u'Preload whole ref object table to cache (for small ref objects)',
+        'cache_version': u'Invalidate cache by changes in other processes (table version counter)',
+        'search_index_max_size': u'The maximum number of records in the text search index (0 - search by SQL). Used with cache_ttl or cache_version',
     },
 }
 
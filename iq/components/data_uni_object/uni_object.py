@@ -18,7 +18,7 @@ from ..wx_filterchoicectrl import filter_convert
 
 from ..data_model import data_object
 
-__version__ = (0, 0, 5, 1)
+__version__ = (0, 0, 5, 2)
 
 _ = lang_func.getTranslation().gettext
 
@@ -178,6 +178,26 @@ class iqUniObjectManager(model_navigator.iqModelNavigatorManager):
         """
         return self.getRecByGuid(guid=value)
 
+    def getDataObjectRecs(self, values):
+        """
+        Get data object records by values.
+        Records are got by IN (...) queries.
+
+        :param values: Unique data GUID list.
+        :return: Dictionary {GUID: record dictionary or None if not found}.
+        """
+        records = self.getRecsByColumnValues(self.getGuidColumnName(), values)
+        if records is None:
+            return dict()
+        # Update found records by link object data with bulk lookup too
+        self.updateLinkDataDataset(list(records.values()))
+        result = dict()
+        for guid in set(values):
+            result[guid] = records.get(guid, None)
+            if result[guid] is None:
+                log_func.warning(u'Unique data guid <%s> not found in <%s>' % (guid, self.getName()))
+        return result
+
     def isEmpty(self):
         """
         Is the ref object empty?
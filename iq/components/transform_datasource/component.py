@@ -70,8 +70,14 @@ class iqTransformDataSource(transform_datasource_proto.iqTransformDataSourceProt
         if dataframe is None:
             table_datasource = self.getTabDataSource()
             log_func.info(u'Get table datasource <%s> for transform' % table_datasource.getName())
-            dataset = table_datasource.getDataset(**kwargs) if table_datasource else list()
-            self.importData(data=dataset)
+            if table_datasource and hasattr(table_datasource, 'getColumnDataset'):
+                # Get data as columns without intermediate record dictionaries
+                self._dataframe = table_datasource.getColumnDataset(as_dataframe=True, **kwargs)
+                if self._dataframe is None:
+                    self.importData(data=list())
+            else:
+                dataset = table_datasource.getDataset(**kwargs) if table_datasource else list()
+                self.importData(data=dataset)
             dataframe = self.getDataFrame()
 
         try:
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Virtual spreadsheet ODS writer benchmark.
+
+Saves the same spreadsheet with the odfpy ODS writer and
+with the fast stream ODS writer.
+
+Run:
+    python3 -m iq.components.virtual_spreadsheet.benchmark_v_ods [row_count [col_count]]
+"""
+
+import os
+import os.path
+import sys
+import time
+import tempfile
+
+from . import v_spreadsheet
+
+__version__ = (0, 0, 0, 1)
+
+DEFAULT_ROW_COUNT = 10000
+DEFAULT_COL_COUNT = 20
+
+
+def createBenchmarkSpreadsheet(row_count, col_count):
+    """
+    Create a filled spreadsheet.
+
+    :param row_count: Number of rows.
+    :param col_count: Number of columns.
+    :return: Spreadsheet object.
+    """
+    spreadsheet = v_spreadsheet.iqVSpreadsheet()
+    table = spreadsheet.createWorkbook().createWorksheet().createTable(compact=True)
+    for i_row in range(1, row_count + 1):
+        table.getRow(i_row).setHeight(15)
+        for i_col in range(1, col_count + 1):
+            table.getCell(i_row, i_col).setValue(i_row * i_col if i_col % 2 else u'Text %d' % i_row)
+    return spreadsheet
+
+
+def runBenchmark(row_count=DEFAULT_ROW_COUNT, col_count=DEFAULT_COL_COUNT):
+    """
+    Run benchmark.
+
+    :param row_count: Number of rows.
+    :param col_count: Number of columns.
+    :return: Dictionary {'odfpy': save time in seconds, 'stream': save time in seconds}.
+    """
+    spreadsheet = createBenchmarkSpreadsheet(row_count, col_count)
+    cell_count = row_count * col_count
+    print(u'Cells: %d x %d' % (row_count, col_count))
+
+    result = dict()
+    tmp_dirname = tempfile.mkdtemp()
+    for writer_name, stream_writer in (('odfpy', False), ('stream', True)):
+        ods_filename = os.path.join(tmp_dirname, 'benchmark_%s.ods' % writer_name)
+        time_start = time.time()
+        spreadsheet.saveAsODS(ods_filename, stream_writer=stream_writer)
+        result[writer_name] = time.time() - time_start
+
+        assert os.path.exists(ods_filename), u'ODS file save error'
+        print(u'%-6s Time: %8.2f sec  Time per cell: %8.1f us  Size: %d' % (writer_name, result[writer_name],
+                                                                           result[writer_name] / cell_count * 1000000,
+                                                                           os.path.getsize(ods_filename)))
+        os.remove(ods_filename)
+    os.rmdir(tmp_dirname)
+    return result
+
+
+if __name__ == '__main__':
+    runBenchmark(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Virtual spreadsheet worksheet benchmark.
+
+Fills the worksheet table cell by cell and reads all cells back.
+Time per cell must not grow with the number of rows.
+
+Run:
+    python3 -m iq.components.virtual_spreadsheet.benchmark_v_worksheet [row_count [col_count [compact]]]
+"""
+
+import sys
+import time
+
+from . import v_spreadsheet
+
+__version__ = (0, 0, 0, 2)
+
+DEFAULT_ROW_COUNT = 50000
+DEFAULT_COL_COUNT = 20
+
+
+def createBenchmarkTable(compact=False):
+    """
+    Create an empty worksheet table.
+
+    :param compact: Create compact table?
+    :return: Spreadsheet object and table object.
+    """
+    spreadsheet = v_spreadsheet.iqVSpreadsheet()
+    workbook = spreadsheet.createWorkbook()
+    worksheet = workbook.createWorksheet()
+    return spreadsheet, worksheet.createTable(compact=compact)
+
+
+def fillBenchmarkTable(table, row_count, col_count):
+    """
+    Fill the table cell by cell.
+
+    :param table: Table object.
+    :param row_count: Number of rows.
+    :param col_count: Number of columns.
+    """
+    for i_row in range(1, row_count + 1):
+        for i_col in range(1, col_count + 1):
+            table.getCell(i_row, i_col).setValue(i_row * i_col)
+
+
+def readBenchmarkTable(table, row_count, col_count):
+    """
+    Read all table cell values.
+
+    :param table: Table object.
+    :param row_count: Number of rows.
+    :param col_count: Number of columns.
+    :return: Sum of cell values.
+    """
+    return sum([int(table.getCell(i_row, i_col).getValue())
+                for i_row in range(1, row_count + 1) for i_col in range(1, col_count + 1)])
+
+
+def runBenchmark(row_count=DEFAULT_ROW_COUNT, col_count=DEFAULT_COL_COUNT, compact=False):
+    """
+    Run benchmark.
+
+    :param row_count: Number of rows.
+    :param col_count: Number of columns.
+    :param compact: Benchmark compact table?
+    :return: Dictionary {'fill': fill time in seconds, 'read': read time in seconds}.
+    """
+    spreadsheet, table = createBenchmarkTable(compact)
+    cell_count = row_count * col_count
+
+    time_start = time.time()
+    fillBenchmarkTable(table, row_count, col_count)
+    fill_time = time.time() - time_start
+
+    time_start = time.time()
+    value_sum = readBenchmarkTable(table, row_count, col_count)
+    read_time = time.time() - time_start
+
+    assert table.getUsedSize() == (row_count, col_count), u'Table size error'
+    assert value_sum == sum(range(1, row_count + 1)) * sum(range(1, col_count + 1)), u'Table value error'
+    print(u'Cells: %d x %d  Compact: %s' % (row_count, col_count, compact))
+    print(u'Fill  Time: %8.2f sec  Time per cell: %8.1f us' % (fill_time, fill_time / cell_count * 1000000))
+    print(u'Read  Time: %8.2f sec  Time per cell: %8.1f us' % (read_time, read_time / cell_count * 1000000))
+    return dict(fill=fill_time, read=read_time)
+
+
+if __name__ == '__main__':
+    runBenchmark(*[int(arg) for arg in sys.argv[1:4]])
@@ -6,15 +6,31 @@ Pandas DataFrame to Spreadsheet convert manager.
 """
 
 import os.path
+import array
+import numpy
 import pandas
 
 from . import v_spreadsheet
+from . import v_compact_table
 
 from ...util import log_func
 from ...util import file_func
 from ...util import xlsx2ods
 
-__version__ = (0, 0, 0, 1)
+__version__ = (0, 0, 0, 3)
+
+DATAFRAME_WORKSHEET_NAME = 'Sheet1'
+
+# The maximum number of decimal places in the float column number format
+MAX_DECIMAL_PLACES = 6
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+HEADER_STYLE_FONT = {'Bold': '1'}
+HEADER_STYLE_ALIGNMENT = {'Horizontal': 'Center', 'Vertical': 'Center'}
+HEADER_STYLE_BORDERS = {'_children_': [{'name': 'Border', 'Position': position,
+                                        'LineStyle': 'Continuous', 'Weight': '1'}
+                                       for position in ('Left', 'Top', 'Right', 'Bottom')]}
 
 
 class iqDataFrame2SpreadsheetManager(v_spreadsheet.iqVSpreadsheet):
@@ -41,18 +57,21 @@ class iqDataFrame2SpreadsheetManager(v_spreadsheet.iqVSpreadsheet):
         """
         return self._dataframe
 
-    def importDataFrame(self, dataframe=None, auto_delete=True):
+    def importDataFrame(self, dataframe=None, auto_delete=True, bulk=False):
         """
         Import DataFrame object as spreadsheet.
 
         :param dataframe: DataFrame object.
         :param auto_delete: Auto delete result file?
+        :param bulk: Bulk import into the compact table without intermediate files?
         :return: Spreadsheet data.
         """
         if dataframe is None:
             dataframe = self._dataframe
 
         try:
+            if bulk:
+                return self._importDataFrameBulk(dataframe=dataframe)
             return self._importDataFrame(dataframe=dataframe, auto_delete=auto_delete)
         except:
             log_func.fatal(u'Error import pandas DataFrame object')
@@ -81,3 +100,120 @@ class iqDataFrame2SpreadsheetManager(v_spreadsheet.iqVSpreadsheet):
             file_func.deleteFile(tmp_xlsx_filename)
             file_func.deleteFile(tmp_ods_filename)
         return result
+
+    def _importDataFrameBulk(self, dataframe=None, index=True):
+        """
+        Bulk import DataFrame object as spreadsheet.
+        The DataFrame is imported by whole columns into the compact table of the new workbook.
+        The header row and index columns are written as by DataFrame.to_excel.
+
+        :param dataframe: DataFrame object.
+        :param index: Write index columns?
+        :return: Spreadsheet data or None if error.
+        """
+        assert issubclass(dataframe.__class__, pandas.DataFrame), u'Pandas DataFrame type error'
+
+        self._data = None
+        workbook = self.createWorkbook()
+        styles = workbook.getStyles()
+        worksheet = workbook.createWorksheet()
+        worksheet.setName(DATAFRAME_WORKSHEET_NAME)
+        table = worksheet.createTable(compact=True)
+        table_data = table.getTableData()
+
+        header_style = styles.createStyle()
+        header_style.setAttrs(alignment=dict(HEADER_STYLE_ALIGNMENT), borders=dict(HEADER_STYLE_BORDERS),
+                              font=dict(HEADER_STYLE_FONT))
+        header_style_idx = table_data.getStyleIdx(header_style.getID())
+
+        columns = list()
+        if index:
+            index_frame = dataframe.index.to_frame(index=False)
+            columns += [(name, index_frame.iloc[:, i], header_style_idx)
+                        for i, name in enumerate(dataframe.index.names)]
+        columns += [(name, dataframe.iloc[:, i], None) for i, name in enumerate(dataframe.columns)]
+
+        # Header row
+        row = table_data.addRows(1)
+        for col, (name, series, style_idx) in enumerate(columns):
+            if isinstance(name, tuple):
+                name = u' '.join([str(name_item) for name_item in name])
+            if name is not None:
+                table_data.setCellData(row, col + 1, str(name), 'String')
+            table_data.setCellStyleID(row, col + 1, header_style.getID())
+
+        # Data rows by columns
+        number_styles = dict()
+        cells = numpy.empty((len(dataframe), len(columns) * 2),
+                            dtype=numpy.dtype(v_compact_table.ROW_ARRAY_TYPECODE))
+        for col, (name, series, style_idx) in enumerate(columns):
+            value_ids, number_format = self._getColumnValueIDs(table_data, series)
+            if style_idx is None and number_format:
+                number_style = number_styles.get(number_format, None)
+                if number_style is None:
+                    number_style = styles.createStyle()
+                    number_style.setAttrs(number_format={'Format': number_format})
+                    number_styles[number_format] = number_style
+                style_idx = table_data.getStyleIdx(number_style.getID())
+            cells[:, col * 2] = value_ids
+            cells[:, col * 2 + 1] = style_idx if style_idx is not None else v_compact_table.STYLE_ID_NO_STYLE
+
+        table_data.appendRowArrays(array.array(v_compact_table.ROW_ARRAY_TYPECODE, row_cells.tobytes())
+                                   for row_cells in cells)
+        return self._data
+
+    def _getColumnValueIDs(self, table_data, series):
+        """
+        Get cell value identifiers of the DataFrame column.
+        Column values are converted to strings at once and
+        every unique value is interned in the compact table once.
+
+        :param table_data: Compact table data.
+        :param series: Column Series object.
+        :return: Tuple (value identifier array, number format or None).
+        """
+        number_format = None
+        kind = series.dtype.kind
+        if kind in 'iu':
+            value_type = 'Number'
+            number_format = '0'
+            values = series.astype(str)
+        elif kind == 'f':
+            value_type = 'Number'
+            number_format = self._getFloatNumberFormat(series.to_numpy())
+            values = series.astype(str).where(series.notna(), None)
+        elif kind == 'b':
+            # Spreadsheet writers support only number values, so booleans are exported as 1/0
+            value_type = 'Number'
+            number_format = '0'
+            values = series.astype(int).astype(str)
+        elif kind == 'M':
+            value_type = 'String'
+            values = series.dt.strftime(DATETIME_FORMAT)
+        else:
+            value_type = 'String'
+            values = series.astype(str).where(series.notna(), None)
+
+        codes, uniques = pandas.factorize(values)
+        id_map = numpy.fromiter([table_data.getValueID(value, value_type) for value in uniques] +
+                                [v_compact_table.VALUE_ID_NO_DATA],
+                                dtype=numpy.int64, count=len(uniques) + 1)
+        # Missing values have code -1 and get the last identifier (cell without data)
+        return id_map[codes], number_format
+
+    def _getFloatNumberFormat(self, values):
+        """
+        Get number format of the float column.
+        The number of decimal places is the smallest one that shows all column values.
+
+        :param values: Column value array.
+        :return: Number format.
+        """
+        values = values[numpy.isfinite(values)]
+        decimal_places = 0
+        while decimal_places < MAX_DECIMAL_PLACES:
+            scaled_values = values * 10 ** decimal_places
+            if numpy.allclose(scaled_values, numpy.round(scaled_values), rtol=1e-9, atol=1e-6):
+                break
+            decimal_places += 1
+        return '0,' + '0' * decimal_places if decimal_places else '0'
@@ -7,7 +7,7 @@ from . import v_prototype
 
 from ...util import log_func
 
-__version__ = (0, 0, 0, 1)
+__version__ = (0, 0, 0, 3)
 
 
 class iqVCell(v_prototype.iqVIndexedPrototype):
@@ -212,9 +212,23 @@ class iqVCell(v_prototype.iqVIndexedPrototype):
             if 'MergeDown' in self._attributes:
                 del self._attributes['MergeDown']
 
-        # After merging, you need to clean the dictionary of merged cells
-        # table=self.getParentByName('Table')
-        # table._merge_cells=None
+        # After merging, the column map and the merged cell regions of the row must be indexed again
+        table = self.getParentByName('Table')
+        if table is not None and self._row_idx > 0 and self._col_idx > 0:
+            table.resetRowIndex(self._row_idx)
+
+    def setIndex(self, index):
+        """
+        The index of the cell in the row.
+        """
+        v_prototype.iqVIndexedPrototype.setIndex(self, index)
+
+        # The column map of the row is changed.
+        # A new cell without table coordinates is indexed when it is added to the row
+        if self._row_idx > 0:
+            table = self.getParentByName('Table')
+            if table is not None:
+                table.resetRowIndex(self._row_idx)
 
     def _delMergeArreaCells(self, row, column, merge_down, merge_across):
         """
@@ -0,0 +1,1263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compact table of the virtual spreadsheet for large sheets.
+
+Cells are not kept as XML-dict nodes. Every row is an array of
+(value id, style id) pairs. Cell values and style identifiers are interned
+in the value and style lists of the table.
+Rare cell attributes (merge, formula) are kept in the sparse dictionary.
+
+The table data object replaces the '_children_' list of the table
+attributes and presents columns and rows as XML-dict nodes on iteration.
+Row nodes are built on demand, so the spreadsheet save functions
+(dict2xml, v_ods) work with the compact table as with the usual one.
+
+Large XML (XMLSS) files can be loaded directly into the compact tables.
+Rows are imported while parsing and XML-dict nodes of the rows are not kept.
+"""
+
+import array
+import xml.sax
+import xml.sax.handler
+from xml.sax import xmlreader
+
+from . import v_prototype
+from . import v_range
+from . import v_cell
+from . import exceptions
+
+from ...util import xml2dict
+from ...util import log_func
+
+__version__ = (0, 0, 0, 4)
+
+# The maximum table size (ODS limits)
+COMPACT_MAX_ROW_COUNT = 1048576
+COMPACT_MAX_COL_COUNT = 1024
+
+# Value identifiers
+VALUE_ID_NO_CELL = 0        # Cell is absent
+VALUE_ID_NO_DATA = 1        # Cell without data
+# Style identifier of the cell without style
+STYLE_ID_NO_STYLE = 0
+
+# Row array item type
+ROW_ARRAY_TYPECODE = 'I'
+
+# Key of the additional data attributes in the additional cell attributes
+CELL_DATA_ATTRS_KEY = '_data_'
+
+CELL_ATTR_NAMES = ('name', '_children_', 'Index', 'StyleID')
+DATA_ATTR_NAMES = ('name', '_children_', 'value', 'Type')
+ROW_ATTR_NAMES = ('name', '_children_', 'Index')
+
+
+class iqVCompactTableData(object):
+    """
+    Compact table data.
+    Used as the '_children_' list of the table attributes.
+    Row index and column index start at 1.
+    """
+    def __init__(self):
+        """
+        Constructor.
+        """
+        # Column attributes list
+        self.columns = list()
+        # The maximum column index. Indexing starts at 0. See _maxElementIdx
+        self._max_col_idx = -1
+
+        # Row arrays. Row index - 1 -> array (value id, style id, value id, style id, ...) or None
+        self._rows = list()
+        # Row index -> additional row attributes (Height, Hidden, StyleID, ...)
+        self._row_attrs = dict()
+        # (row index, column index) -> additional cell attributes (MergeAcross, MergeDown, Formula, ...)
+        self._cell_attrs = dict()
+
+        # Interned cell values (value, value type)
+        self._values = [None, None]
+        self._value_ids = dict()
+        # Interned cell style identifiers
+        self._styles = [None]
+        self._style_ids = dict()
+
+        # Merged cell address (row, column) -> region (row, column, merge down, merge across)
+        self._merge_regions = dict()
+        # Row index -> list of merged cell regions covering the row
+        self._merge_rows = dict()
+
+    def clear(self):
+        """
+        Clear table data.
+        """
+        self.__init__()
+
+    # XML-dict list interface
+    def __len__(self):
+        return len(self.columns) + len(self._rows)
+
+    def __iter__(self):
+        for column in self.columns:
+            yield column
+        for i_row in range(len(self._rows)):
+            yield self.getRowDict(i_row + 1)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return list(self)[idx]
+        if idx < 0:
+            idx += len(self)
+        if 0 <= idx < len(self.columns):
+            return self.columns[idx]
+        elif len(self.columns) <= idx < len(self):
+            return self.getRowDict(idx - len(self.columns) + 1)
+        raise IndexError(idx)
+
+    def append(self, element):
+        """
+        Append column or row node.
+        The row node is imported to the compact table.
+        """
+        if element.get('name') == 'Column':
+            self.appendColumn(element)
+        elif element.get('name') == 'Row':
+            row = int(element['Index']) if 'Index' in element else len(self._rows) + 1
+            if row > len(self._rows):
+                self.addRows(row - len(self._rows))
+            self.importRow(row, element)
+
+    # Columns
+    def _indexColumn(self, element):
+        """
+        Take into account the column in the maximum column index.
+        """
+        if 'Index' in element:
+            self._max_col_idx = int(element['Index']) - 1
+        else:
+            self._max_col_idx += int(element['Span']) if 'Span' in element else 1
+
+    def appendColumn(self, element):
+        """
+        Append column attributes.
+        """
+        self.columns.append(element)
+        self._indexColumn(element)
+        return element
+
+    def getColumnCount(self):
+        """
+        Get number of columns.
+        """
+        return self._max_col_idx + 1
+
+    def findColumnPos(self, idx):
+        """
+        Find column position in the column list by index.
+
+        :param idx: Column index.
+        :return: Column position or -1 if not found.
+        """
+        cur_idx = 0
+        for i, element in enumerate(self.columns):
+            cur_idx = int(element['Index']) if 'Index' in element else cur_idx + 1
+            if cur_idx == idx:
+                return i
+        return -1
+
+    def delColumn(self, idx):
+        """
+        Delete column and the cells of the column.
+
+        :param idx: Column index.
+        :return: True/False.
+        """
+        pos = self.findColumnPos(idx)
+        if pos < 0:
+            return False
+        del self.columns[pos]
+        for element in self.columns[pos:]:
+            if 'Index' in element:
+                element['Index'] = int(element['Index']) - 1
+        self._max_col_idx = -1
+        for element in self.columns:
+            self._indexColumn(element)
+
+        for row_array in self._rows:
+            if row_array is not None and len(row_array) >= idx * 2:
+                del row_array[idx * 2 - 2:idx * 2]
+        self._cell_attrs = dict([((row, col - 1 if col > idx else col), attrs)
+                                 for (row, col), attrs in self._cell_attrs.items() if col != idx])
+        self._indexMergeRegions()
+        return True
+
+    # Rows
+    def getRowCount(self):
+        """
+        Get number of rows.
+        """
+        return len(self._rows)
+
+    def addRows(self, count=1):
+        """
+        Add empty rows to the end of the table.
+        """
+        self._rows.extend([None] * count)
+        return len(self._rows)
+
+    def appendRowArrays(self, row_arrays):
+        """
+        Append filled rows to the end of the table.
+
+        :param row_arrays: Iterable of row arrays (value id, style index, value id, style index, ...).
+            Value identifiers and style indexes are got by getValueID and getStyleIdx.
+        :return: Number of rows.
+        """
+        self._rows.extend(row_arrays)
+        return len(self._rows)
+
+    def getRowAttrs(self, row):
+        """
+        Get additional row attributes.
+        """
+        return self._row_attrs.get(row, dict())
+
+    def setRowAttr(self, row, name, value=None):
+        """
+        Set additional row attribute. If value is None the attribute is deleted.
+        """
+        if value is None:
+            self._row_attrs.get(row, dict()).pop(name, None)
+        else:
+            self._row_attrs.setdefault(row, dict())[name] = value
+
+    def getRowDict(self, row):
+        """
+        Get row as XML-dict node.
+
+        :param row: Row index.
+        :return: Row attributes.
+        """
+        row_dict = {'name': 'Row', '_children_': self.getRowCellDicts(row)}
+        row_dict.update(self.getRowAttrs(row))
+        return row_dict
+
+    def importRow(self, row, row_dict):
+        """
+        Set row from XML-dict node.
+
+        :param row: Row index.
+        :param row_dict: Row attributes.
+        """
+        self._row_attrs.pop(row, None)
+        for name, value in row_dict.items():
+            if name not in ROW_ATTR_NAMES:
+                self.setRowAttr(row, name, value)
+
+        if '_children_' in row_dict:
+            for col in self.getRowCols(row):
+                self.clearCell(row, col)
+            cur_idx = 0
+            for cell_dict in row_dict['_children_']:
+                cur_idx = int(cell_dict['Index']) if 'Index' in cell_dict else cur_idx + 1
+                self.importCell(row, cur_idx, cell_dict)
+                # Combined cell accounting
+                if 'MergeAcross' in cell_dict:
+                    cur_idx += int(cell_dict['MergeAcross'])
+
+    def delRow(self, row):
+        """
+        Delete row.
+
+        :param row: Row index.
+        :return: True/False.
+        """
+        if row < 1 or row > len(self._rows):
+            return False
+        del self._rows[row - 1]
+        self._row_attrs = dict([(i_row - 1 if i_row > row else i_row, attrs)
+                                for i_row, attrs in self._row_attrs.items() if i_row != row])
+        self._cell_attrs = dict([((i_row - 1 if i_row > row else i_row, col), attrs)
+                                 for (i_row, col), attrs in self._cell_attrs.items() if i_row != row])
+        self._indexMergeRegions()
+        return True
+
+    # Cells
+    def _getRowArray(self, row, create=False):
+        """
+        Get row array.
+
+        :param row: Row index.
+        :param create: Create row array if it does not exist?
+        :return: Row array or None.
+        """
+        if row > len(self._rows):
+            if not create:
+                return None
+            self.addRows(row - len(self._rows))
+        row_array = self._rows[row - 1]
+        if row_array is None and create:
+            row_array = array.array(ROW_ARRAY_TYPECODE)
+            self._rows[row - 1] = row_array
+        return row_array
+
+    def getRowArray(self, row):
+        """
+        Get row array (value id, style index, value id, style index, ...) or None if the row has no cells.
+        """
+        return self._getRowArray(row)
+
+    def getCellAttrRows(self):
+        """
+        Get indexes of rows with additional cell attributes.
+        """
+        return set([row for row, col in self._cell_attrs])
+
+    def getRowCols(self, row):
+        """
+        Get column indexes of existing row cells.
+        """
+        row_array = self._getRowArray(row)
+        if row_array is None:
+            return list()
+        return [i // 2 + 1 for i in range(0, len(row_array), 2) if row_array[i] != VALUE_ID_NO_CELL]
+
+    def getLastCol(self, row):
+        """
+        Get column index of the last row cell or 0 if the row has no cells.
+        """
+        cols = self.getRowCols(row)
+        return cols[-1] if cols else 0
+
+    def hasCell(self, row, col):
+        """
+        Does the cell exist?
+        """
+        row_array = self._getRowArray(row)
+        return row_array is not None and len(row_array) >= col * 2 and row_array[col * 2 - 2] != VALUE_ID_NO_CELL
+
+    def createCell(self, row, col):
+        """
+        Create cell if it does not exist.
+        """
+        row_array = self._getRowArray(row, create=True)
+        if len(row_array) < col * 2:
+            row_array.extend([VALUE_ID_NO_CELL] * (col * 2 - len(row_array)))
+        if row_array[col * 2 - 2] == VALUE_ID_NO_CELL:
+            row_array[col * 2 - 2] = VALUE_ID_NO_DATA
+
+    def clearCell(self, row, col):
+        """
+        Delete cell.
+        """
+        row_array = self._getRowArray(row)
+        if row_array is not None and len(row_array) >= col * 2:
+            row_array[col * 2 - 2] = VALUE_ID_NO_CELL
+            row_array[col * 2 - 1] = STYLE_ID_NO_STYLE
+        if self._cell_attrs.pop((row, col), None) is not None:
+            self.setMergeRegion(row, col, 0, 0)
+
+    def delRowCell(self, row, col):
+        """
+        Delete cell and shift the next cells of the row to the left.
+        """
+        row_array = self._getRowArray(row)
+        if row_array is None or len(row_array) < col * 2:
+            return False
+        del row_array[col * 2 - 2:col * 2]
+        self._cell_attrs = dict([((i_row, i_col - 1 if i_row == row and i_col > col else i_col), attrs)
+                                 for (i_row, i_col), attrs in self._cell_attrs.items()
+                                 if i_row != row or i_col != col])
+        self._indexMergeRegions()
+        return True
+
+    def getCellData(self, row, col):
+        """
+        Get cell data.
+
+        :return: Tuple (value, value type) or None if the cell has no data.
+        """
+        row_array = self._getRowArray(row)
+        if row_array is None or len(row_array) < col * 2:
+            return None
+        return self._values[row_array[col * 2 - 2]]
+
+    def setCellData(self, row, col, value=None, value_type='String'):
+        """
+        Set cell data.
+        """
+        self.createCell(row, col)
+        self._rows[row - 1][col * 2 - 2] = self.getValueID(value, value_type)
+
+    def getValueID(self, value=None, value_type='String'):
+        """
+        Get interned value identifier. The value is interned if it is new.
+
+        :param value: Value as string.
+        :param value_type: Value type.
+        :return: Value identifier.
+        """
+        value_key = (value, value_type)
+        value_id = self._value_ids.get(value_key, None)
+        if value_id is None:
+            value_id = len(self._values)
+            self._values.append(value_key)
+            self._value_ids[value_key] = value_id
+        return value_id
+
+    def clearCellData(self, row, col):
+        """
+        Delete cell data.
+        """
+        if self.hasCell(row, col):
+            self._rows[row - 1][col * 2 - 2] = VALUE_ID_NO_DATA
+            self.getCellAttrs(row, col).pop(CELL_DATA_ATTRS_KEY, None)
+
+    def getCellStyleID(self, row, col):
+        """
+        Get cell style identifier or None if not defined.
+        """
+        row_array = self._getRowArray(row)
+        if row_array is None or len(row_array) < col * 2:
+            return None
+        return self._styles[row_array[col * 2 - 1]]
+
+    def setCellStyleID(self, row, col, style_id):
+        """
+        Set cell style identifier.
+        """
+        self.createCell(row, col)
+        self._rows[row - 1][col * 2 - 1] = self.getStyleIdx(style_id)
+
+    def getStyleIdx(self, style_id=None):
+        """
+        Get interned style index. The style identifier is interned if it is new.
+
+        :param style_id: Style identifier or None if the cell has no style.
+        :return: Style index.
+        """
+        if style_id is None:
+            return STYLE_ID_NO_STYLE
+        style_idx = self._style_ids.get(style_id, None)
+        if style_idx is None:
+            style_idx = len(self._styles)
+            self._styles.append(style_id)
+            self._style_ids[style_id] = style_idx
+        return style_idx
+
+    def getCellAttrs(self, row, col):
+        """
+        Get additional cell attributes.
+        """
+        return self._cell_attrs.get((row, col), dict())
+
+    def setCellAttr(self, row, col, name, value=None):
+        """
+        Set additional cell attribute. If value is None the attribute is deleted.
+        """
+        if value is None:
+            self._cell_attrs.get((row, col), dict()).pop(name, None)
+        else:
+            self.createCell(row, col)
+            self._cell_attrs.setdefault((row, col), dict())[name] = value
+
+    def getDataDict(self, row, col):
+        """
+        Get cell data as XML-dict node or None if the cell has no data.
+        """
+        data = self.getCellData(row, col)
+        if data is None:
+            return None
+        data_dict = {'name': 'Data', 'value': data[0], 'Type': data[1], '_children_': []}
+        data_dict.update(self.getCellAttrs(row, col).get(CELL_DATA_ATTRS_KEY, dict()))
+        return data_dict
+
+    def getCellDict(self, row, col):
+        """
+        Get cell as XML-dict node.
+
+        :param row: Row index.
+        :param col: Column index.
+        :return: Cell attributes.
+        """
+        cell_dict = {'name': 'Cell', '_children_': [], 'Index': str(col)}
+        style_id = self.getCellStyleID(row, col)
+        if style_id is not None:
+            cell_dict['StyleID'] = style_id
+        for name, value in self.getCellAttrs(row, col).items():
+            if name != CELL_DATA_ATTRS_KEY:
+                cell_dict[name] = value
+        data_dict = self.getDataDict(row, col)
+        if data_dict is not None:
+            cell_dict['_children_'].append(data_dict)
+        return cell_dict
+
+    def getRowCellDicts(self, row):
+        """
+        Get row cells as XML-dict nodes.
+        """
+        return [self.getCellDict(row, col) for col in self.getRowCols(row)]
+
+    def importCell(self, row, col, cell_dict):
+        """
+        Set cell from XML-dict node.
+
+        :param row: Row index.
+        :param col: Column index.
+        :param cell_dict: Cell attributes.
+        """
+        self.clearCell(row, col)
+        self.createCell(row, col)
+        if cell_dict.get('StyleID', None):
+            self.setCellStyleID(row, col, str(cell_dict['StyleID']))
+        for name, value in cell_dict.items():
+            if name not in CELL_ATTR_NAMES:
+                self.setCellAttr(row, col, name, value)
+
+        data_dicts = [element for element in cell_dict.get('_children_', ()) if element.get('name') == 'Data']
+        if data_dicts:
+            data_dict = data_dicts[0]
+            self.setCellData(row, col, data_dict.get('value', None), data_dict.get('Type', 'String'))
+            data_attrs = dict([(name, value) for name, value in data_dict.items() if name not in DATA_ATTR_NAMES])
+            if data_attrs:
+                self.setCellAttr(row, col, CELL_DATA_ATTRS_KEY, data_attrs)
+
+        if 'MergeAcross' in cell_dict or 'MergeDown' in cell_dict:
+            self.setMergeRegion(row, col, int(cell_dict.get('MergeDown', 0)), int(cell_dict.get('MergeAcross', 0)))
+
+    # Merged cells
+    def _indexMergeRegions(self):
+        """
+        Build merged cell region index from the cell attributes.
+        """
+        self._merge_regions = dict()
+        self._merge_rows = dict()
+        for (row, col), attrs in self._cell_attrs.items():
+            if 'MergeAcross' in attrs or 'MergeDown' in attrs:
+                self.setMergeRegion(row, col, int(attrs.get('MergeDown', 0)), int(attrs.get('MergeAcross', 0)))
+
+    def setMergeRegion(self, row, col, merge_down, merge_across):
+        """
+        Set merged cell region in index.
+        """
+        region = self._merge_regions.pop((row, col), None)
+        if region is not None:
+            for i_row in range(row, row + region[2] + 1):
+                regions = self._merge_rows.get(i_row, ())
+                if region in regions:
+                    regions.remove(region)
+
+        if merge_down > 0 or merge_across > 0:
+            region = (row, col, merge_down, merge_across)
+            self._merge_regions[(row, col)] = region
+            for i_row in range(row, row + merge_down + 1):
+                self._merge_rows.setdefault(i_row, list()).append(region)
+
+    def getMergeRegions(self):
+        """
+        Get merged cell regions.
+        """
+        return list(self._merge_regions.values())
+
+    def findMergeRegion(self, row, col):
+        """
+        Find the merged cell region the cell gets into.
+        The merged cell itself does not get into its region.
+
+        :return: Region (row, column, merge down, merge across) or None if not found.
+        """
+        for region in self._merge_rows.get(row, ()):
+            if region[1] <= col <= region[1] + region[3]:
+                if row != region[0] or col != region[1]:
+                    return region
+        return None
+
+
+class iqCompactXML2DICTReader(xml2dict.iqXML2DICTReader):
+    """
+    Excel-xml file analyzer class.
+    Worksheet tables are loaded into the compact tables.
+    """
+    def startElementNS(self, name, qname, attrs):
+        """
+        Parsing the start of a tag.
+        """
+        parent = self._cur_path[-1]
+        if isinstance(name, tuple) and isinstance(parent.get(xml2dict.CHILDREN_KEY, None), iqVCompactTableData):
+            # Table rows and columns are not added to the parent node.
+            # They are imported to the compact table at the end of the element
+            node = {xml2dict.TAG_KEY: name[1], xml2dict.CHILDREN_KEY: []}
+            for cur_qname in attrs.getQNames():
+                node[attrs.getNameByQName(cur_qname)[1]] = attrs.getValueByQName(cur_qname)
+            self._cur_path.append(node)
+            return
+
+        xml2dict.iqXML2DICTReader.startElementNS(self, name, qname, attrs)
+        node = self._cur_path[-1]
+        if node.get(xml2dict.TAG_KEY, None) == 'Table':
+            node[xml2dict.CHILDREN_KEY] = iqVCompactTableData()
+
+    def endElementNS(self, name, qname):
+        """
+        Parsing the closing tag.
+        """
+        node = self._cur_path[-1]
+        xml2dict.iqXML2DICTReader.endElementNS(self, name, qname)
+        children = self._cur_path[-1].get(xml2dict.CHILDREN_KEY, None)
+        if isinstance(children, iqVCompactTableData):
+            children.append(node)
+
+
+def loadCompactXML(xml_filename, encoding='utf-8'):
+    """
+    Load Excel-xml file. Worksheet tables are loaded into the compact tables.
+
+    :param xml_filename: XML filename.
+    :param encoding: XML file encoding.
+    :return: XML-dict data or None if error.
+    """
+    xml_file = None
+    try:
+        xml_file = open(xml_filename, 'rt', encoding=encoding)
+
+        input_source = xmlreader.InputSource()
+        input_source.setEncoding(encoding)
+        input_source.setCharacterStream(xml_file)
+
+        xml_reader = xml.sax.make_parser()
+        xml_parser = iqCompactXML2DICTReader(encoding=encoding)
+        xml_reader.setContentHandler(xml_parser)
+        xml_reader.setFeature(xml.sax.handler.feature_namespaces, 1)
+        xml_reader.parse(input_source)
+        xml_file.close()
+
+        return xml_parser.getData()
+    except:
+        if xml_file:
+            xml_file.close()
+        log_func.fatal(u'Error read file <%s>' % xml_filename)
+    return None
+
+
+class iqVCompactTable(v_prototype.iqVPrototype):
+    """
+    Compact table.
+    """
+    def __init__(self, parent, *args, **kwargs):
+        """
+        Constructor.
+        """
+        v_prototype.iqVPrototype.__init__(self, parent, *args, **kwargs)
+        self._attributes = {'name': 'Table', '_children_': iqVCompactTableData()}
+
+    def getTableData(self):
+        """
+        Get compact table data.
+        """
+        return self._attributes['_children_']
+
+    def getUsedSize(self):
+        """
+        Get used size.
+        """
+        return self.getRowCount(), self.getColumnCount()
+
+    def createColumn(self):
+        """
+        Create column.
+        """
+        col = v_range.iqVColumn(self)
+        self.getTableData().appendColumn(col.getAttributes())
+        return col
+
+    def getColumns(self, start_idx=0, stop_idx=None):
+        """
+        Get column list.
+
+        :param start_idx: First column index.
+        :param stop_idx: Last column index.
+        """
+        col_count = self.getColumnCount()
+        if stop_idx is None:
+            stop_idx = col_count
+        # Protection against incorrect input data
+        if start_idx > stop_idx:
+            start_idx = stop_idx
+        return [self.getColumn(idx) for idx in range(start_idx, stop_idx)]
+
+    def getColumnsAttrs(self):
+        """
+        column list. Attributes.
+        """
+        return self.getTableData().columns
+
+    def getColumnCount(self):
+        """
+        Get number of columns.
+        """
+        return self.getTableData().getColumnCount()
+
+    def getColumn(self, idx=-1):
+        """
+        Get column by index.
+        """
+        table_data = self.getTableData()
+        if idx <= 0:
+            idx = max(self.getColumnCount(), 1)
+        while self.getColumnCount() < idx:
+            self.createColumn()
+        pos = table_data.findColumnPos(idx)
+        if pos < 0:
+            return None
+        col = v_range.iqVColumn(self)
+        col.setAttributes(table_data.columns[pos])
+        return col
+
+    def createRow(self):
+        """
+        Create row.
+        """
+        return iqVCompactRow(self, self.getTableData().addRows(1))
+
+    def cloneRow(self, clear_cell=True, row=-1):
+        """
+        Clone table row.
+
+        :param clear_cell: To clear the values in the cells.
+        :param row: Index (Starting with 0) of the cloned cell. -1 is the last one.
+        :return: Returns an object of the cloned string.
+            If there are no rows in the table, it returns None.
+        """
+        row_count = self.getRowCount()
+        if row_count:
+            row_attr = self.getTableData().getRowDict(row + 1 if row >= 0 else row_count + row + 1)
+            if clear_cell:
+                for cell in row_attr['_children_']:
+                    cell['_children_'] = []
+            row_obj = v_range.iqVRow(self)
+            row_obj.setAttributes(row_attr)
+            return row_obj
+        return None
+
+    def getRowsAttrs(self):
+        """
+        Get row attributes list.
+        """
+        table_data = self.getTableData()
+        return [table_data.getRowDict(i_row + 1) for i_row in range(table_data.getRowCount())]
+
+    def getRowCount(self):
+        """
+        Get number of rows.
+        """
+        return self.getTableData().getRowCount()
+
+    def getRow(self, idx=-1):
+        """
+        Get row by index.
+        """
+        if idx <= 0:
+            idx = max(self.getRowCount(), 1)
+        table_data = self.getTableData()
+        if idx > table_data.getRowCount():
+            table_data.addRows(idx - table_data.getRowCount())
+        return iqVCompactRow(self, idx)
+
+    def _checkCellAddress(self, row, col):
+        """
+        Check cell address and add columns and rows up to the address.
+
+        :return: True - address is correct / False - address is out of the table limits.
+        """
+        # If the coordinates are not valid, then an error
+        if row <= 0:
+            raise IndexError
+        if col <= 0:
+            raise IndexError
+
+        # Limit on row and column indices
+        if row > COMPACT_MAX_ROW_COUNT or col > COMPACT_MAX_COL_COUNT:
+            return False
+
+        while self.getColumnCount() < col:
+            self.createColumn()
+        table_data = self.getTableData()
+        if row > table_data.getRowCount():
+            table_data.addRows(row - table_data.getRowCount())
+        return True
+
+    def createCell(self, row, col):
+        """
+        Create cell (row, col).
+        """
+        if not self._checkCellAddress(row, col):
+            return None
+
+        # Check for getting into the merged cell
+        if self.isInMergeCell(row, col):
+            sheet_name = self.getParentByName('Worksheet').getName()
+            err_txt = 'Getting new_cell (sheet: %s, row: %d, column: %d) into merge new_cell!' % (sheet_name, row, col)
+            raise exceptions.iqMergeCellError((100, err_txt))
+
+        return self.getRow(row).createCellIdx(col)
+
+    def getCell(self, row, col):
+        """
+        Get cell (row, col).
+        """
+        if not self._checkCellAddress(row, col):
+            return None
+
+        # Check for getting into the merged cell
+        region = self.getTableData().findMergeRegion(row, col)
+        if region is not None:
+            from . import v_worksheet
+            if v_worksheet.DETECT_MERGE_CELL_ERROR:
+                sheet_name = self.getParentByName('Worksheet').getName()
+                err_txt = 'Getting new_cell (sheet: %s, row: %d, column: %d) into merge new_cell!' % (sheet_name, row, col)
+                raise exceptions.iqMergeCellError((100, err_txt))
+            row, col = region[0], region[1]
+
+        return self.getRow(row).getCellIdx(col)
+
+    def clearTab(self):
+        """
+        Clear table.
+        """
+        return self.clear()
+
+    def clear(self):
+        """
+        Clear table.
+        """
+        self.getTableData().clear()
+
+    def setExpandedRowCount(self, expanded_row_count=None):
+        """
+        Calculation of the maximum number of rows in a table.
+        """
+        if expanded_row_count:
+            self._attributes['ExpandedRowCount'] = expanded_row_count
+        elif 'ExpandedRowCount' in self._attributes:
+            cur_count = int(self._attributes['ExpandedRowCount'])
+            self._attributes['ExpandedRowCount'] = min(max(self.getRowCount(), cur_count), COMPACT_MAX_ROW_COUNT)
+
+    def setExpandedColCount(self, expanded_col_count=None):
+        """
+        Calculation of the maximum number of columns per row.
+        """
+        if expanded_col_count:
+            self._attributes['ExpandedColumnCount'] = expanded_col_count
+        elif 'ExpandedColumnCount' in self._attributes:
+            cur_count = int(self._attributes['ExpandedColumnCount'])
+            self._attributes['ExpandedColumnCount'] = min(max(self.getColumnCount(), cur_count), COMPACT_MAX_COL_COUNT)
+
+    def paste(self, paste, to=None):
+        """
+        Insert a copy of the attributes of the object inside the current object
+        by the address.
+        """
+        if paste['name'] == 'Range':
+            return self._pasteRange(paste, to)
+        else:
+            log_func.error(u'Error paste object attributes %s' % paste)
+        return False
+
+    def _pasteRange(self, paste, to):
+        """
+        Insert a range into the table at the cell address.
+        """
+        if isinstance(to, tuple) and len(to) == 2:
+            to_row, to_col = to
+            # Cell address (row, col)
+            for i_row in range(paste['height']):
+                for i_col in range(paste['width']):
+                    cell_attrs = paste['_children_'][i_row]['_children_'][i_col]
+                    cell = self.getCell(to_row + i_row, to_col + i_col)
+                    cell.setAttributes(cell_attrs)
+            return True
+        else:
+            log_func.error(u'Paste address error %s' % to)
+        return False
+
+    def getMergeCells(self):
+        """
+        Dictionary of merged cells. As a key, a tuple of the cell coordinate.
+        """
+        return dict([(region, self.getRow(region[0]).getCellIdx(region[1]))
+                     for region in self.getTableData().getMergeRegions()])
+
+    def setMergeCell(self, row, column, merge_down, merge_across):
+        """
+        Register merged cell region.
+        """
+        self.getTableData().setMergeRegion(row, column, merge_down, merge_across)
+
+    def isInMergeCell(self, row, column):
+        """
+        Does the specified cell get in the merged?
+        """
+        return self.getTableData().findMergeRegion(row, column) is not None
+
+    def getInMergeCell(self, row, column):
+        """
+        Get the combined cell indicated by the coordinates.
+        """
+        region = self.getTableData().findMergeRegion(row, column)
+        if region is not None:
+            return self.getRow(region[0]).getCellIdx(region[1])
+        return None
+
+    def delColumn(self, idx=-1):
+        """
+        Delete column.
+        """
+        if idx <= 0:
+            idx = self.getColumnCount()
+        return self.getTableData().delColumn(idx)
+
+    def delRow(self, idx=-1):
+        """
+        Delete row.
+        """
+        if idx <= 0:
+            idx = self.getRowCount()
+        return self.getTableData().delRow(idx)
+
+
+class iqVCompactRow(v_range.iqVRow):
+    """
+    Compact table row.
+    """
+    def __init__(self, parent, row_idx=1, *args, **kwargs):
+        """
+        Constructor.
+
+        :param parent: Compact table.
+        :param row_idx: Row index.
+        """
+        v_range.iqVRow.__init__(self, parent, *args, **kwargs)
+        self._row_idx = row_idx
+
+    def getTableData(self):
+        """
+        Get compact table data.
+        """
+        return self._parent.getTableData()
+
+    def getAttributes(self):
+        """
+        Get row attributes as XML-dict node.
+        """
+        return self.getTableData().getRowDict(self._row_idx)
+
+    def setAttributes(self, data_attr={}):
+        """
+        Set row attributes.
+        """
+        self.getTableData().importRow(self._row_idx, data_attr)
+        return self.getAttributes()
+
+    def updateAttributes(self, data_attr={}):
+        """
+        Update row attributes.
+        """
+        row_dict = self.getAttributes()
+        row_dict.update(data_attr)
+        return self.setAttributes(row_dict)
+
+    def setHeight(self, height):
+        """
+        Set row height.
+        """
+        self.getTableData().setRowAttr(self._row_idx, 'Height', str(height))
+
+    def setHidden(self, hidden=True):
+        """
+        Hiding a row.
+        """
+        self.getTableData().setRowAttr(self._row_idx, 'Hidden', str(int(hidden)) if hidden else None)
+
+    def setIndex(self, index):
+        """
+        Compact table rows are not indexed by attribute.
+        """
+        pass
+
+    def createCell(self):
+        """
+        Create / Add to row cell.
+        """
+        return self.createCellIdx(self.getTableData().getLastCol(self._row_idx) + 1)
+
+    def insertCellIdx(self, cell, idx):
+        """
+        Insert a cell in a row by index.
+        """
+        self.getTableData().importCell(self._row_idx, idx, cell.getAttributes())
+        return self.getCellIdx(idx)
+
+    def createCellIdx(self, idx):
+        """
+        Create / Add to row cell.
+        """
+        self.getTableData().createCell(self._row_idx, idx)
+        return iqVCompactCell(self, self._row_idx, idx)
+
+    def getCellIdx(self, idx):
+        """
+        Get a cell from a row by number.
+        """
+        return self.createCellIdx(idx)
+
+    def delCell(self, idx):
+        """
+        Remove cell from row.
+        """
+        return self.getTableData().delRowCell(self._row_idx, idx)
+
+
+class iqVCompactCell(v_cell.iqVCell):
+    """
+    Compact table cell.
+    """
+    def __init__(self, parent, row_idx=-1, col_idx=-1, *args, **kwargs):
+        """
+        Constructor.
+
+        :param parent: Compact table row.
+        :param row_idx: Row index.
+        :param col_idx: Column index.
+        """
+        v_cell.iqVCell.__init__(self, parent, *args, **kwargs)
+        self._row_idx = row_idx
+        self._col_idx = col_idx
+
+    def getTableData(self):
+        """
+        Get compact table data.
+        """
+        return self._parent.getTableData()
+
+    def getAttributes(self):
+        """
+        Get cell attributes as XML-dict node.
+        Changes of the returned dictionary are not saved in the table.
+        Use setAttributes or updateAttributes.
+        """
+        return self.getTableData().getCellDict(self._row_idx, self._col_idx)
+
+    def setAttributes(self, data_attr={}):
+        """
+        Set cell attributes.
+        """
+        self.getTableData().importCell(self._row_idx, self._col_idx, data_attr)
+        return self.getAttributes()
+
+    def updateAttributes(self, data_attr={}):
+        """
+        Update cell attributes.
+        """
+        cell_dict = self.getAttributes()
+        cell_dict.update(data_attr)
+        return self.setAttributes(cell_dict)
+
+    def clear(self):
+        """
+        Clear cell data.
+        """
+        self.getTableData().clearCellData(self._row_idx, self._col_idx)
+
+    def setIndex(self, index):
+        """
+        Compact table cells are not indexed by attribute.
+        """
+        pass
+
+    def createData(self):
+        """
+        Create cell data.
+        """
+        self.getTableData().setCellData(self._row_idx, self._col_idx)
+        return iqVCompactData(self)
+
+    def getDataAttrs(self):
+        """
+        Get attributes data.
+        """
+        data_dict = self.getTableData().getDataDict(self._row_idx, self._col_idx)
+        return [data_dict] if data_dict is not None else []
+
+    def getData(self):
+        """
+        Get cell data.
+        """
+        if self.getTableData().getCellData(self._row_idx, self._col_idx) is None:
+            return self.createData()
+        return iqVCompactData(self)
+
+    def setStyle(self, alignment=None,
+                 borders=None, font=None, interior=None,
+                 number_format=None):
+        """
+        Set cell style.
+        """
+        my_workbook = self.getParentByName('Workbook')
+        style = my_workbook.getStyles().findStyle(alignment, borders, font, interior, number_format)
+        if not style:
+            style = my_workbook.getStyles().createStyle()
+            style.setAttrs(alignment, borders, font, interior, number_format)
+        self.setStyleID(style.getAttributes()['ID'])
+
+    def getStyle(self):
+        """
+        Get cell style.
+        """
+        my_workbook = self.getParentByName('Workbook')
+        style_id = self.getStyleID()
+        if style_id is not None:
+            # Get style from style list
+            style = my_workbook.getStyles().getStyle(style_id)
+        else:
+            # Create new style
+            style = my_workbook.getStyles().createStyle()
+        self.setStyleID(style.getAttributes()['ID'])
+        return style
+
+    def setStyleID(self, style_id):
+        """
+        Set style id for cell.
+        """
+        if style_id:
+            self.getTableData().setCellStyleID(self._row_idx, self._col_idx, str(style_id))
+
+    def getStyleID(self):
+        """
+        Get cell style id.
+        """
+        return self.getTableData().getCellStyleID(self._row_idx, self._col_idx)
+
+    def setFormulaR1C1(self, formula):
+        """
+        Set the formula in RC format.
+        """
+        self.getTableData().setCellAttr(self._row_idx, self._col_idx, 'Formula', self._A1Fmt2R1C1Fmt(formula))
+
+    def setMerge(self, across, down):
+        """
+        Set cells merge.
+        """
+        table_data = self.getTableData()
+        # Delete cells in the merge zone.
+        for i_row in range(self._row_idx, self._row_idx + max(down, 0) + 1):
+            for i_col in range(self._col_idx, self._col_idx + max(across, 0) + 1):
+                if not (i_row == self._row_idx and i_col == self._col_idx):
+                    table_data.clearCell(i_row, i_col)
+
+        table_data.setCellAttr(self._row_idx, self._col_idx, 'MergeAcross', str(across) if across > 0 else None)
+        table_data.setCellAttr(self._row_idx, self._col_idx, 'MergeDown', str(down) if down > 0 else None)
+        table_data.setMergeRegion(self._row_idx, self._col_idx, max(down, 0), max(across, 0))
+
+    def getRegion(self):
+        """
+        Cell Area = Cell Address + number of combined rows and columns.
+
+        :return: Returns a tuple
+             (row number, column number, merged rows, merged columns).
+        """
+        attrs = self.getTableData().getCellAttrs(self._row_idx, self._col_idx)
+        return self._row_idx, self._col_idx, int(attrs.get('MergeDown', 0)), int(attrs.get('MergeAcross', 0))
+
+    def getOffset(self, offset_row=0, offset_column=0):
+        """
+        Get cell by offset taking into account merged cells.
+
+        :param offset_row: Row offset.
+        :param offset_column: Column offset.
+        :return: Returns the cell object by offset or None in case of an error.
+        """
+        if offset_row <= 0 and offset_column <= 0:
+            return self
+        row, col, merge_down, merge_across = self.getRegion()
+        if offset_row > 0:
+            row += merge_down
+        if offset_column > 0:
+            col += merge_across
+
+        tab = self.getParentByName('Table')
+        if tab:
+            return tab.getCell(row + offset_row, col + offset_column)
+        return None
+
+
+class iqVCompactData(v_cell.iqVData):
+    """
+    Compact table cell data.
+    """
+    def getTableData(self):
+        """
+        Get compact table data.
+        """
+        return self._parent.getTableData()
+
+    def getAttributes(self):
+        """
+        Get data attributes as XML-dict node.
+        """
+        data_dict = self.getTableData().getDataDict(self._parent._row_idx, self._parent._col_idx)
+        return data_dict if data_dict is not None else dict(self._attributes)
+
+    def getValue(self):
+        """
+        Get value.
+        """
+        data = self.getTableData().getCellData(self._parent._row_idx, self._parent._col_idx)
+        return data[0] if data else None
+
+    def _isPersentageType(self):
+        """
+        Check for data belonging to the percentage type.
+        A new style is not created for the cell without style.
+        """
+        data = self.getTableData().getCellData(self._parent._row_idx, self._parent._col_idx)
+        if data and str(data[1]).lower().title() == v_cell.DEFAULT_PERCENTAGE_TYPE:
+            return True
+
+        style_id = self._parent.getStyleID()
+        if style_id is None:
+            return False
+        style = self.getParentByName('Workbook').getStyles().getStyle(style_id)
+        number_format = style.findChildAttrsByName('NumberFormat') if style else None
+        return bool(number_format and 'Format' in number_format and
+                    (('%' in number_format['Format']) or ('Percent' in number_format['Format'])))
+
+    def setValue(self, value, value_type='String'):
+        """
+        Set value.
+        """
+        val_type = value_type
+        if self._isPersentageType():
+            val_type = v_cell.DEFAULT_PERCENTAGE_TYPE
+        elif type(value) in (int, float):
+            val_type = v_cell.DEFAULT_NUMBER_TYPE
+
+        # Formula processing
+        if self._parent.isFormula(value):
+            self._parent.setFormulaR1C1(value)
+            if self._isPersentageType():
+                val_type = v_cell.DEFAULT_PERCENTAGE_TYPE
+            else:
+                val_type = v_cell.DEFAULT_NUMBER_TYPE
+
+        self.getTableData().setCellData(self._parent._row_idx, self._parent._col_idx, str(value), val_type)
+
+    def setXmlns(self, xmlns='http://www.w3.org/TR/REC-html40'):
+        """
+        Set the way to format text in a cell.
+        """
+        table_data = self.getTableData()
+        row, col = self._parent._row_idx, self._parent._col_idx
+        data_attrs = dict(table_data.getCellAttrs(row, col).get(CELL_DATA_ATTRS_KEY, dict()))
+        data_attrs['xmlns'] = str(xmlns)
+        table_data.setCellAttr(row, col, CELL_DATA_ATTRS_KEY, data_attrs)
@@ -13,7 +13,7 @@ import odf.table
 
 from ...util import log_func
 
-__version__ = (0, 0, 0, 1)
+__version__ = (0, 0, 0, 3)
 
 DIMENSION_CORRECT = 35
 DEFAULT_STYLE_ID = 'Default'
@@ -37,6 +37,46 @@ A3_PAPER_FORMAT = 'A3'
 
 DEFAULT_ENCODE = 'utf-8'
 
+# The maximum number of columns in A1 format (A..XFD)
+MAX_COLS_A1 = 16384
+
+# The maximum number of cached formula translations
+FORMULA_CACHE_SIZE = 10000
+
+
+def _genColsA1(count=MAX_COLS_A1):
+    """
+    Generate Excel column names in A1 format.
+
+    :param count: Number of columns.
+    :return: Tuple of column names (A, B, ..., Z, AA, AB, ...).
+    """
+    cols_a1 = list()
+    for col in range(1, count + 1):
+        name = ''
+        while col:
+            col, remainder = divmod(col - 1, 26)
+            name = chr(ord('A') + remainder) + name
+        cols_a1.append(name)
+    return tuple(cols_a1)
+
+
+# Excel column names in A1 format
+COLS_A1 = _genColsA1()
+# Column name -> column index. Indexing starts at 1
+COL_A1_INDEXES = dict([(name, i + 1) for i, name in enumerate(COLS_A1)])
+
+R1_PATTERN = re.compile(r'R[0-9]{1,7}')
+C1_PATTERN = re.compile(r'C[0-9]{1,7}')
+ALPHA_PATTERN = re.compile(r'[A-Z]{1,3}')
+DIGIT_PATTERN = re.compile(r'[0-9]{1,7}')
+R1C1_PATTERN = re.compile(r'R([0-9]{1,7})C([0-9]{1,7})')
+A1_PATTERN = re.compile(r'\.([A-Z]{1,3})([0-9]{1,7})')
+
+# Formula translation caches. Formula -> translated formula
+R1C1_FORMULA_CACHE = dict()
+A1_FORMULA_CACHE = dict()
+
 # Default page margins
 DEFAULT_XML_MARGIN_TOP = 0.787401575
 DEFAULT_XML_MARGIN_BOTTOM = 0.787401575
@@ -106,6 +146,16 @@ class iqODS(object):
         :param name: Child item name.
         """
         return [item for item in data_dict.get('_children_', []) if item.get('name') == name]
+
+    def iterChildrenByName(self, data_dict, name):
+        """
+        Iterate children by name.
+        The rows of the compact table are built on demand.
+
+        :param data_dict: Data dictionary.
+        :param name: Child item name.
+        """
+        return (item for item in data_dict.get('_children_', []) if item.get('name') == name)
         
     def setWorkbook(self, data_dict):
         """
@@ -541,7 +591,7 @@ class iqODS(object):
         
         # Rows
         i = 1
-        rows = self.getChildrenByName(data_dict, 'Row')
+        rows = self.iterChildrenByName(data_dict, 'Row')
         for row in rows:
             # Row index accounting
             idx = int(row.get('Index', i))
@@ -746,65 +796,41 @@ class iqODS(object):
         return type            
     
     # Excel column names in A1 format
-    COLS_A1 = None
+    COLS_A1 = COLS_A1
 
     def _getColsA1(self):
         """
         Excel column names in A1 format.
         """
-        if self.COLS_A1:
-            return self.COLS_A1
+        return COLS_A1
 
-        sAlf1 = ' ABCDEFGHIJKLMNOPQRSTUVWXYZ'
-        sAlf2 = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
-        self.COLS_A1 = []
-        for s1 in sAlf1:
-            for s2 in sAlf2:
-                self.COLS_A1.append((s1+s2).strip())
-                if len(self.COLS_A1) == 256:
-                    return self.COLS_A1
-        return self.COLS_A1
-        
-    R1_FORMAT = r'R[0-9]{1,5}'
-    C1_FORMAT = r'C[0-9]{1,5}'
+    R1_FORMAT = r'R[0-9]{1,7}'
+    C1_FORMAT = r'C[0-9]{1,7}'
 
     def _getA1(self, r1c1):
         """
         Convert an address from the format R1C1 to A1.
         """
-        parse = re.findall(self.R1_FORMAT, r1c1)
-        row = 1
-        if parse:
-            row = int(parse[0][1:])
-        parse = re.findall(self.C1_FORMAT, r1c1)
-        col = 1
-        if parse:
-            col = int(parse[0][1:])
-        cols_a1 = self._getColsA1()
-        return cols_a1[col-1]+str(row)
+        parse = R1_PATTERN.search(r1c1)
+        row = int(parse.group(0)[1:]) if parse else 1
+        parse = C1_PATTERN.search(r1c1)
+        col = int(parse.group(0)[1:]) if parse else 1
+        return COLS_A1[col-1]+str(row)
 
-    ALPHA_FORMAT = r'[A-Z]{1,2}'
-    DIGIT_FORMAT = r'[0-9]{1,5}'
+    ALPHA_FORMAT = r'[A-Z]{1,3}'
+    DIGIT_FORMAT = r'[0-9]{1,7}'
 
     def _getR1C1(self, a1):
         """
         Convert an address from A1 format to R1C1.
         """
-        parse = re.findall(self.DIGIT_FORMAT, a1)
-        row = 1
-        if parse:
-            row = int(parse[0])
-        parse = re.findall(self.ALPHA_FORMAT, a1)
-        col = 1
-        if parse:
-            cols_a1 = self._getColsA1()
-            try:
-                col = cols_a1.index(parse[0]) + 1
-            except:
-                pass
+        parse = DIGIT_PATTERN.search(a1)
+        row = int(parse.group(0)) if parse else 1
+        parse = ALPHA_PATTERN.search(a1)
+        col = COL_A1_INDEXES.get(parse.group(0), 1) if parse else 1
         return 'R%dC%d' % (row, col)
         
-    R1C1_FORMAT = r'R[0-9]{1,5}C[0-9]{1,5}'
+    R1C1_FORMAT = r'R([0-9]{1,7})C([0-9]{1,7})'
 
     def _R1C1Fmt2A1Fmt(self, formula):
         """
@@ -813,13 +839,27 @@ class iqODS(object):
         :param formula: The formula in a string.
         :return: String of translated formula.
         """
-        parse_all = re.findall(self.R1C1_FORMAT, formula)
-        for replace_addr in parse_all:
-            a1 = self._getA1(replace_addr)
-            if self._isSheetAddress(replace_addr, formula):
-                a1 = '.'+a1
-            formula = formula.replace(replace_addr, a1)
-        return formula
+        translation = R1C1_FORMULA_CACHE.get(formula, None)
+        if translation is None:
+            translation = R1C1_PATTERN.sub(self._replaceR1C1Address, formula)
+            if len(R1C1_FORMULA_CACHE) >= FORMULA_CACHE_SIZE:
+                R1C1_FORMULA_CACHE.clear()
+            R1C1_FORMULA_CACHE[formula] = translation
+        return translation
+
+    def _replaceR1C1Address(self, match):
+        """
+        Replace the R1C1 address found in the formula with the A1 address.
+
+        :param match: Match object of the address.
+        :return: A1 address.
+        """
+        a1 = COLS_A1[int(match.group(2))-1] + str(int(match.group(1)))
+        # Addressing a cell indicating a sheet. For example, Sheet1.A1
+        i = match.start()
+        if i > 0 and match.string[i - 1].isalnum():
+            a1 = '.'+a1
+        return a1
 
     def _isSheetAddress(self, address, formula):
         """
@@ -837,7 +877,7 @@ class iqODS(object):
                 return False
         return None
 
-    A1_FORMAT = r'\.[A-Z]{1,2}[0-9]{1,5}'
+    A1_FORMAT = r'\.([A-Z]{1,3})([0-9]{1,7})'
 
     def _A1Fmt2R1C1Fmt(self, formula):
         """
@@ -846,11 +886,22 @@ class iqODS(object):
         :param formula: The formula as a string.
         :return: String of translated formula.
         """
-        parse_all = re.findall(self.A1_FORMAT, formula)
-        for replace_addr in parse_all:
-            r1c1 = self._getR1C1(replace_addr)
-            formula = formula.replace(replace_addr, r1c1)
-        return formula
+        translation = A1_FORMULA_CACHE.get(formula, None)
+        if translation is None:
+            translation = A1_PATTERN.sub(self._replaceA1Address, formula)
+            if len(A1_FORMULA_CACHE) >= FORMULA_CACHE_SIZE:
+                A1_FORMULA_CACHE.clear()
+            A1_FORMULA_CACHE[formula] = translation
+        return translation
+
+    def _replaceA1Address(self, match):
+        """
+        Replace the A1 address found in the formula with the R1C1 address.
+
+        :param match: Match object of the address.
+        :return: R1C1 address.
+        """
+        return 'R%dC%d' % (int(match.group(2)), COL_A1_INDEXES.get(match.group(1), 1))
         
     def _translateR1C1Formula(self, formula):
         """
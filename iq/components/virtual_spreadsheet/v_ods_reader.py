@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Streaming ODS reader.
+
+content.xml is read by iterparse row by row. The read rows are
+removed from the parsed tree, so the whole document is never in memory.
+Repeated rows are expanded only on iteration or in the compact table.
+Empty repeated cells are not materialized. Only the cell index is shifted.
+
+Styles and worksheet options are read with the iqODS functions.
+ElementTree elements are wrapped in iqODSElement for this.
+"""
+
+import zipfile
+import xml.etree.ElementTree
+
+import odf.grammar
+import odf.namespaces
+import odf.style
+import odf.table
+
+from . import v_ods
+from . import v_compact_table
+from ...util import log_func
+
+__version__ = (0, 0, 0, 1)
+
+OFFICE_AUTOMATIC_STYLES_TAG = '{%s}automatic-styles' % odf.namespaces.OFFICENS
+OFFICE_STYLES_TAG = '{%s}styles' % odf.namespaces.OFFICENS
+OFFICE_MASTER_STYLES_TAG = '{%s}master-styles' % odf.namespaces.OFFICENS
+OFFICE_SPREADSHEET_TAG = '{%s}spreadsheet' % odf.namespaces.OFFICENS
+TABLE_TABLE_TAG = '{%s}table' % odf.namespaces.TABLENS
+TABLE_COLUMN_TAG = '{%s}table-column' % odf.namespaces.TABLENS
+TABLE_ROW_TAG = '{%s}table-row' % odf.namespaces.TABLENS
+TABLE_CELL_TAG = '{%s}table-cell' % odf.namespaces.TABLENS
+TABLE_COVERED_CELL_TAG = '{%s}covered-table-cell' % odf.namespaces.TABLENS
+TEXT_P_TAG = '{%s}p' % odf.namespaces.TEXTNS
+
+TABLE_NAME_ATTR = '{%s}name' % odf.namespaces.TABLENS
+TABLE_STYLE_NAME_ATTR = '{%s}style-name' % odf.namespaces.TABLENS
+TABLE_COLUMNS_REPEATED_ATTR = '{%s}number-columns-repeated' % odf.namespaces.TABLENS
+TABLE_ROWS_REPEATED_ATTR = '{%s}number-rows-repeated' % odf.namespaces.TABLENS
+TABLE_VISIBILITY_ATTR = '{%s}visibility' % odf.namespaces.TABLENS
+
+# Attributes of the not empty cell without data
+CELL_CONTENT_ATTRS = ('{%s}style-name' % odf.namespaces.TABLENS,
+                      '{%s}formula' % odf.namespaces.TABLENS,
+                      '{%s}number-columns-spanned' % odf.namespaces.TABLENS,
+                      '{%s}number-rows-spanned' % odf.namespaces.TABLENS)
+
+NONE_VALUES = ('None', 'none', 'NONE')
+
+# Content events
+WORKBOOK_EVENT = 'workbook'
+WORKSHEET_EVENT = 'worksheet'
+COLUMN_EVENT = 'column'
+ROW_EVENT = 'row'
+END_WORKSHEET_EVENT = 'end_worksheet'
+
+# Element qualified name cache. odfpy element class -> qualified name
+ELEMENT_QNAME_CACHE = dict()
+# Attribute name cache. (element qualified name, odfpy attribute name) -> ElementTree attribute name
+ATTRIBUTE_NAME_CACHE = dict()
+
+
+def _getElementQName(element_class):
+    """
+    Get qualified name of odfpy element class.
+
+    :param element_class: odfpy element class.
+    :return: Tuple (namespace, local name).
+    """
+    qname = ELEMENT_QNAME_CACHE.get(element_class, None)
+    if qname is None:
+        qname = element_class(check_grammar=False).qname
+        ELEMENT_QNAME_CACHE[element_class] = qname
+    return qname
+
+
+def _getAttributeName(qname, attr):
+    """
+    Get ElementTree attribute name by odfpy attribute name.
+
+    :param qname: Element qualified name.
+    :param attr: odfpy attribute name. For example 'stylename'.
+    :return: ElementTree attribute name. For example '{urn:...:table:1.0}style-name'.
+    """
+    key = (qname, attr)
+    attr_name = ATTRIBUTE_NAME_CACHE.get(key, None)
+    if attr_name is None:
+        allowed_attrs = odf.grammar.allowed_attributes.get(qname)
+        if allowed_attrs is None:
+            raise AttributeError('Unable to get simple attribute <%s>' % attr)
+        allowed_args = [allowed_attr[1].lower().replace('-', '') for allowed_attr in allowed_attrs]
+        allowed_attr = allowed_attrs[allowed_args.index(attr)]
+        attr_name = '{%s}%s' % allowed_attr
+        ATTRIBUTE_NAME_CACHE[key] = attr_name
+    return attr_name
+
+
+class iqODSElement(object):
+    """
+    ElementTree element with odfpy element interface used by iqODS read functions.
+    """
+    def __init__(self, element):
+        """
+        Constructor.
+
+        :param element: ElementTree element.
+        """
+        self._element = element
+
+    def _getQName(self):
+        """
+        Qualified name as tuple (namespace, local name).
+        """
+        tag = self._element.tag
+        if tag[0] == '{':
+            namespace, local_name = tag[1:].split('}', 1)
+            return namespace, local_name
+        return None, tag
+
+    qname = property(_getQName)
+
+    def _getTagName(self):
+        """
+        Tag name with prefix.
+        """
+        namespace, local_name = self.qname
+        return '%s:%s' % (odf.namespaces.nsdict.get(namespace, namespace), local_name)
+
+    tagName = property(_getTagName)
+
+    def _getAttributes(self):
+        """
+        Attributes dictionary {(namespace, local name): value}.
+        """
+        return dict([(tuple(name[1:].split('}', 1)) if name[0] == '{' else (None, name), value)
+                     for name, value in self._element.attrib.items()])
+
+    attributes = property(_getAttributes)
+
+    def _getChildNodes(self):
+        """
+        Child nodes. Text nodes are strings.
+        """
+        child_nodes = [self._element.text] if self._element.text else []
+        for child in self._element:
+            child_nodes.append(iqODSElement(child))
+            if child.tail:
+                child_nodes.append(child.tail)
+        return child_nodes
+
+    childNodes = property(_getChildNodes)
+
+    def getAttribute(self, attr):
+        """
+        Get attribute value by odfpy attribute name.
+
+        :param attr: odfpy attribute name. For example 'stylename'.
+        :return: Attribute value or None if not defined.
+        """
+        return self._element.get(_getAttributeName(self.qname, attr))
+
+    def getElementsByType(self, element_class):
+        """
+        Get the element and all descendant elements of the odfpy element class.
+
+        :param element_class: odfpy element class.
+        :return: List of elements.
+        """
+        tag = '{%s}%s' % _getElementQName(element_class)
+        return [iqODSElement(element) for element in self._element.iter(tag)]
+
+    def __str__(self):
+        return u''.join(self._element.itertext())
+
+
+class iqODSStreamDocument(object):
+    """
+    Styles of the ODS document for iqODS read functions.
+    """
+    def __init__(self):
+        """
+        Constructor.
+        """
+        self.automaticstyles = iqODSElement(xml.etree.ElementTree.Element(OFFICE_AUTOMATIC_STYLES_TAG))
+        self.styles = iqODSElement(xml.etree.ElementTree.Element(OFFICE_STYLES_TAG))
+        self.masterstyles = iqODSElement(xml.etree.ElementTree.Element(OFFICE_MASTER_STYLES_TAG))
+
+    def addStyles(self, element):
+        """
+        Add styles of the document part (content.xml or styles.xml).
+
+        :param element: ElementTree element of the styles.
+        """
+        if element.tag == OFFICE_AUTOMATIC_STYLES_TAG:
+            self.automaticstyles._element.extend(list(element))
+        elif element.tag == OFFICE_STYLES_TAG:
+            self.styles._element.extend(list(element))
+        elif element.tag == OFFICE_MASTER_STYLES_TAG:
+            self.masterstyles._element.extend(list(element))
+
+
+class iqODSStreamReader(v_ods.iqODS):
+    """
+    Streaming ODS reader.
+    """
+    def __init__(self):
+        """
+        Constructor.
+        """
+        v_ods.iqODS.__init__(self)
+
+        # Automatic style cache. Style name -> style object
+        self._automatic_styles = None
+
+    def _loadODS(self, filename):
+        """
+        Load from ODS file.
+        Worksheet tables are loaded into the compact table data.
+
+        :param filename: ODS filename.
+        :return: Data dictionary or None if error.
+        """
+        self.xmlss_data = {'name': 'Calc', '_children_': []}
+        workbook_data = None
+        table_data = None
+        for event in self.iterContent(filename):
+            if event[0] == ROW_EVENT:
+                self._fillCompactRows(table_data, event[2], event[3])
+            elif event[0] == COLUMN_EVENT:
+                table_data.appendColumn(event[2])
+            elif event[0] == WORKSHEET_EVENT:
+                table_data = v_compact_table.iqVCompactTableData()
+                event[1]['_children_'].append({'name': 'Table', '_children_': table_data})
+                workbook_data['_children_'].append(event[1])
+            elif event[0] == WORKBOOK_EVENT:
+                workbook_data = event[1]
+                self.xmlss_data['_children_'].append(workbook_data)
+        return self.xmlss_data
+
+    def _fillCompactRows(self, table_data, row_data, repeated=1):
+        """
+        Add rows to the compact table data.
+
+        :param table_data: Compact table data.
+        :param row_data: Row data dictionary.
+        :param repeated: Number of row repeats.
+        """
+        if not row_data['_children_'] and len(row_data) == 2:
+            # Empty rows
+            table_data.addRows(repeated)
+            return
+        for i in range(repeated):
+            table_data.importRow(table_data.addRows(1), row_data)
+
+    def iterRows(self, filename):
+        """
+        Iterate rows of all worksheets of ODS file.
+        Repeated rows are yielded as the same row data dictionary.
+
+        :param filename: ODS filename.
+        :return: Generator of tuples (worksheet name, row index, row data dictionary).
+            Row index starts at 1.
+        """
+        row_idx = 0
+        for event in self.iterContent(filename):
+            if event[0] == ROW_EVENT:
+                for i in range(event[3]):
+                    row_idx += 1
+                    yield event[1]['Name'], row_idx, event[2]
+            elif event[0] == WORKSHEET_EVENT:
+                row_idx = 0
+
+    def iterContent(self, filename):
+        """
+        Iterate content of ODS file.
+
+        :param filename: ODS filename.
+        :return: Generator of content events:
+            (WORKBOOK_EVENT, workbook data dictionary),
+            (WORKSHEET_EVENT, worksheet data dictionary),
+            (COLUMN_EVENT, worksheet data dictionary, column data dictionary),
+            (ROW_EVENT, worksheet data dictionary, row data dictionary, number of row repeats),
+            (END_WORKSHEET_EVENT, worksheet data dictionary).
+        """
+        self.ods_document = iqODSStreamDocument()
+        self._automatic_styles = None
+
+        with zipfile.ZipFile(filename) as ods_zip:
+            if 'styles.xml' in ods_zip.namelist():
+                with ods_zip.open('styles.xml') as styles_file:
+                    styles_root = xml.etree.ElementTree.parse(styles_file).getroot()
+                for element in styles_root:
+                    self.ods_document.addStyles(element)
+
+            with ods_zip.open('content.xml') as content_file:
+                for event in self._iterContentXML(content_file):
+                    yield event
+
+    def _iterContentXML(self, content_file):
+        """
+        Iterate content.xml events.
+
+        :param content_file: content.xml file object.
+        """
+        elements = list()
+        worksheet_data = None
+        table_depth = 0
+        i_row = 0
+        for action, element in xml.etree.ElementTree.iterparse(content_file, events=('start', 'end')):
+            if action == 'start':
+                if element.tag == TABLE_TABLE_TAG:
+                    table_depth += 1
+                    if table_depth == 1:
+                        worksheet_data = {'name': 'Worksheet', '_children_': [],
+                                          'Name': element.get(TABLE_NAME_ATTR)}
+                        i_row = 0
+                        yield WORKSHEET_EVENT, worksheet_data
+                elif element.tag == OFFICE_SPREADSHEET_TAG:
+                    # The content styles are already read
+                    data = {'name': 'Workbook', '_children_': [self.readStyles()]}
+                    yield WORKBOOK_EVENT, data
+                elements.append(element)
+                continue
+
+            elements.pop()
+            parent = elements[-1] if elements else None
+            if element.tag == TABLE_ROW_TAG and table_depth == 1:
+                row_data, repeated = self.readStreamRow(iqODSElement(element), worksheet_data, i_row)
+                i_row += 1
+                yield ROW_EVENT, worksheet_data, row_data, repeated
+                # Free the read rows
+                del parent[:]
+            elif element.tag == TABLE_COLUMN_TAG and table_depth == 1:
+                yield COLUMN_EVENT, worksheet_data, self.readColumn(iqODSElement(element))
+                del parent[:]
+            elif element.tag == TABLE_TABLE_TAG:
+                table_depth -= 1
+                if not table_depth:
+                    # Worksheet options
+                    ods_pagelayouts = self.ods_document.automaticstyles.getElementsByType(odf.style.PageLayout)
+                    worksheet_options = self.readWorksheetOptions(ods_pagelayouts)
+                    if worksheet_options:
+                        worksheet_data['_children_'].append(worksheet_options)
+                    yield END_WORKSHEET_EVENT, worksheet_data
+                    del parent[:]
+            elif element.tag == OFFICE_AUTOMATIC_STYLES_TAG and not table_depth:
+                self.ods_document.addStyles(element)
+
+    def _getAutomaticStyle(self, style_name):
+        """
+        Get automatic style by name.
+
+        :param style_name: Style name.
+        :return: Style object or None if not found.
+        """
+        if self._automatic_styles is None:
+            self._automatic_styles = dict()
+            for ods_style in self.ods_document.automaticstyles.getElementsByType(odf.style.Style):
+                self._automatic_styles.setdefault(ods_style.getAttribute('name'), ods_style)
+        return self._automatic_styles.get(style_name, None)
+
+    def readColumn(self, ods_element=None):
+        """
+        Read column data from ODS file.
+
+        :param ods_element: ODS item corresponding column.
+        """
+        data = {'name': 'Column', '_children_': []}
+        style_name = ods_element.getAttribute('stylename')
+        default_cell_style_name = ods_element.getAttribute('defaultcellstylename')
+        repeated = ods_element.getAttribute('numbercolumnsrepeated')
+        hidden = ods_element.getAttribute('visibility')
+
+        ods_style = self._getAutomaticStyle(style_name) if style_name else None
+        if ods_style is not None:
+            # Column width
+            ods_column_properties = ods_style.getElementsByType(odf.style.TableColumnProperties)
+            if ods_column_properties:
+                column_width = self._dimensionODS2XML(ods_column_properties[0].getAttribute('columnwidth'))
+                if column_width:
+                    data['Width'] = column_width
+
+        if default_cell_style_name and (default_cell_style_name not in ('Default', ) + NONE_VALUES):
+            data['StyleID'] = default_cell_style_name
+
+        if repeated and repeated != 'None':
+            data['Span'] = str(int(repeated)-1)
+
+        if hidden and hidden == 'collapse':
+            data['Hidden'] = True
+
+        return data
+
+    def readStreamRow(self, ods_element, worksheet=None, row=-1):
+        """
+        Read row data from ODS file.
+        Repeated rows are not expanded.
+
+        :param ods_element: ODS element corresponding to the row.
+        :param worksheet: Worksheet data dictionary.
+        :param row: Row number.
+        :return: Tuple (row data dictionary, number of row repeats).
+        """
+        data = {'name': 'Row', '_children_': []}
+        element = ods_element._element
+        style_name = element.get(TABLE_STYLE_NAME_ATTR)
+        repeated = element.get(TABLE_ROWS_REPEATED_ATTR)
+        hidden = element.get(TABLE_VISIBILITY_ATTR)
+
+        ods_style = self._getAutomaticStyle(style_name) if style_name else None
+        if ods_style is not None:
+            ods_row_properties = ods_style.getElementsByType(odf.style.TableRowProperties)
+            if ods_row_properties:
+                ods_row_property = ods_row_properties[0]
+                row_height = self._dimensionODS2XML(ods_row_property.getAttribute('rowheight'))
+                if row_height:
+                    data['Height'] = row_height
+                # Page breaks
+                page_break = ods_row_property.getAttribute('breakbefore')
+                if page_break and page_break == 'page' and worksheet:
+                    self._addPageBreak(worksheet, row)
+
+        row_repeated = 1
+        if repeated and (repeated not in NONE_VALUES):
+            # Row parameters duplicated on all subsequent rows
+            # at the end of the sheet are read once (see iqODS.readRow)
+            i_repeated = int(repeated)
+            if i_repeated <= v_ods.LIMIT_ROWS_REPEATED:
+                row_repeated = i_repeated
+
+        if hidden and hidden == 'collapse':
+            data['Hidden'] = True
+
+        # Cells
+        i = 1
+        set_idx = False
+        for cell_element in element:
+            repeated = cell_element.get(TABLE_COLUMNS_REPEATED_ATTR)
+            i_repeated = int(repeated) if repeated and (repeated not in NONE_VALUES) else 1
+            if cell_element.tag == TABLE_COVERED_CELL_TAG or (cell_element.tag == TABLE_CELL_TAG and
+                                                               self._isEmptyCell(cell_element)):
+                # Accounting for index and missing cells
+                i += i_repeated
+                set_idx = True
+            elif cell_element.tag == TABLE_CELL_TAG:
+                ods_cell = iqODSElement(cell_element)
+                data['_children_'].append(self.readCell(ods_cell, i if set_idx else None))
+                set_idx = False
+
+                if i_repeated > 1 and i_repeated < v_ods.LIMIT_COLUMNS_REPEATED:
+                    for ii in range(i_repeated-1):
+                        data['_children_'].append(self.readCell(ods_cell))
+                elif i_repeated > 1:
+                    set_idx = True
+                i += i_repeated
+
+        return data, row_repeated
+
+    def _isEmptyCell(self, element):
+        """
+        Is the cell empty? The empty cell has no data, style, formula and merge.
+
+        :param element: ElementTree element of the cell.
+        :return: True/False.
+        """
+        for attr_name in CELL_CONTENT_ATTRS:
+            if element.get(attr_name):
+                return False
+        return element.find(TEXT_P_TAG) is None and next(element.iter(TEXT_P_TAG), None) is None
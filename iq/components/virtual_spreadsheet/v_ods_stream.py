@@ -0,0 +1,571 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Fast ODS writer.
+
+Styles, columns and page setup are built with odfpy as in iqODS.
+Rows and cells are not built as odfpy objects.
+The XML of the table rows is written to a temporary file and then
+streamed to content.xml in the ODS zip container.
+Cell style names are computed once per style.
+Rows with the same height share one row style.
+"""
+
+import io
+import time
+import tempfile
+import zipfile
+
+import odf.opendocument
+import odf.element
+import odf.manifest
+import odf.office
+import odf.style
+import odf.table
+import odf.text
+
+from . import v_ods
+from . import v_compact_table
+from ...util import log_func
+
+__version__ = (0, 0, 0, 2)
+
+XML_PROLOGUE = u"<?xml version='1.0' encoding='UTF-8'?>\n"
+
+# Maximum size of the content body kept in memory
+BODY_SPOOL_MAX_SIZE = 16 * 1024 * 1024
+# Block size of copying the content body to the zip container
+BODY_COPY_BLOCK_SIZE = 1024 * 1024
+
+# Content body size with which zip64 extensions are used for content.xml
+BODY_ZIP64_SIZE = zipfile.ZIP64_LIMIT // 4
+
+# Content elements written without odfpy objects
+CONTENT_ELEMENT_CLASSES = (odf.table.TableRow, odf.table.TableCell,
+                           odf.table.CoveredTableCell, odf.text.P, odf.text.Span)
+
+# The maximum number of cached cell XML texts of the compact table
+CELL_XML_CACHE_SIZE = 100000
+
+# Permissions of files in the zip container
+ZIP_UNIXPERMS = 0o100644 << 16
+
+
+def _quoteAttr(value):
+    """
+    Escape and quote an attribute value as odfpy does.
+    """
+    return odf.element._quoteattr(str(value))
+
+
+def _escapeText(value):
+    """
+    Escape text as odfpy does.
+    """
+    return odf.element._sanitize(str(value))
+
+
+class iqODSStreamWriter(v_ods.iqODS):
+    """
+    Fast ODS writer.
+    Produces the same ODS document as iqODS.save without odfpy row and cell objects.
+    """
+    def __init__(self):
+        """
+        Constructor.
+        """
+        v_ods.iqODS.__init__(self)
+
+        # Content body file
+        self._body_file = None
+        # Names of styles used in content body
+        self._used_style_names = set()
+        # Style attribute cache. Style id -> quoted style name
+        self._style_attrs = dict()
+        # Row style cache. (height, page break) -> style name
+        self._row_styles = dict()
+        # Compact table cell XML cache. (value id, style index) -> cell XML text
+        self._cell_xml = dict()
+
+    def save(self, filename, data_dict=None):
+        """
+        Save to ODS file.
+
+        :param filename: ODS filename.
+        :param data_dict: Data dictionary.
+        :return: True/False.
+        """
+        if not data_dict:
+            log_func.warning(u'ODS. Not save data defined')
+            data_dict = dict()
+
+        self.ods_document = None
+        self._styles_ = {}
+        self._used_style_names = set()
+        self._style_attrs = dict()
+        self._row_styles = dict()
+        self._cell_xml = dict()
+
+        workbooks = data_dict.get('_children_', None)
+        workbook = workbooks[0] if workbooks else dict()
+
+        self._body_file = tempfile.SpooledTemporaryFile(max_size=BODY_SPOOL_MAX_SIZE,
+                                                        mode='w+', encoding=v_ods.DEFAULT_ENCODE)
+        try:
+            self.setWorkbook(workbook)
+            if self.ods_document:
+                self._saveDocument(filename)
+        finally:
+            self._body_file.close()
+            self._body_file = None
+            self.ods_document = None
+        return True
+
+    def setWorkbook(self, data_dict):
+        """
+        Set workbook.
+        The worksheets are written to the content body file.
+
+        :param data_dict: Data dictionary.
+        """
+        self.ods_document = odf.opendocument.OpenDocumentSpreadsheet()
+        # Register namespaces of content elements for the root element
+        for element_class in CONTENT_ELEMENT_CLASSES:
+            element_class()
+
+        body = self.ods_document.body
+        spreadsheet = self.ods_document.spreadsheet
+
+        sheets = list()
+        if data_dict:
+            styles = self.getChildrenByName(data_dict, 'Styles')
+            if styles:
+                self.setStyles(styles[0])
+            sheets = self.getChildrenByName(data_dict, 'Worksheet')
+
+        out = io.StringIO()
+        body.write_open_tag(1, out)
+        if sheets:
+            spreadsheet.write_open_tag(2, out)
+            self._body_file.write(out.getvalue())
+            for sheet in sheets:
+                self.setWorksheet(sheet)
+            out = io.StringIO()
+            spreadsheet.write_close_tag(2, out)
+        else:
+            spreadsheet.toXml(2, out)
+        body.write_close_tag(1, out)
+        self._body_file.write(out.getvalue())
+
+    def setWorksheet(self, data_dict):
+        """
+        Set worksheet.
+        The worksheet table is written to the content body file.
+
+        :param data_dict: Data dictionary.
+        """
+        sheet_name = data_dict.get('Name', 'Лист')
+        if not isinstance(sheet_name, str):
+            sheet_name = str(sheet_name)
+        ods_table = odf.table.Table(name=sheet_name)
+
+        # The page breaks change row styles. So they are defined before the rows
+        page_breaks = self.getChildrenByName(data_dict, 'PageBreaks')
+        row_breaks = self._getRowBreaks(page_breaks[0]) if page_breaks else set()
+
+        tables = self.getChildrenByName(data_dict, 'Table')
+        if tables and tables[0].get('_children_'):
+            out = io.StringIO()
+            ods_table.write_open_tag(3, out)
+            self._body_file.write(out.getvalue())
+            self.setTable(tables[0], ods_table, row_breaks)
+            self._body_file.write(u'</%s>' % ods_table.tagName)
+        else:
+            out = io.StringIO()
+            ods_table.toXml(3, out)
+            self._body_file.write(out.getvalue())
+
+        # Set worksheet options
+        worksheet_options = self.getChildrenByName(data_dict, 'WorksheetOptions')
+        if worksheet_options:
+            self.setWorksheetOptions(worksheet_options[0])
+        return ods_table
+
+    def _getRowBreaks(self, data_dict):
+        """
+        Get indexes of rows with page breaks.
+
+        :param data_dict: Page breaks data dictionary.
+        :return: Set of row indexes.
+        """
+        row_breaks = data_dict['_children_'][0]['_children_']
+        return set([int(row_break['_children_'][0]['value']) for row_break in row_breaks])
+
+    def setTable(self, data_dict, ods_table, row_breaks=()):
+        """
+        Set table.
+        Columns and rows are written to the content body file.
+
+        :param data_dict: Data dictionary.
+        :param ods_table: ODS table object.
+        :param row_breaks: Indexes of rows with page breaks.
+        """
+        out = io.StringIO()
+        # Columns
+        i = 1
+        table_data = data_dict['_children_']
+        if isinstance(table_data, v_compact_table.iqVCompactTableData):
+            # Do not build the rows of the compact table to find columns
+            columns = table_data.columns
+        else:
+            columns = self.getChildrenByName(data_dict, 'Column')
+        for column in columns:
+            # Column index accounting
+            idx = int(column.get('Index', i))
+            if idx > i:
+                for ii in range(idx-i):
+                    out.write(u'<table:table-column/>')
+                i = idx+1
+            else:
+                i += 1
+            ods_column = self.setColumn(column)
+            for name in ods_column.attributes.values():
+                self._used_style_names.add(name)
+            ods_column.toXml(4, out)
+
+            span = column.get('Span', None)
+            if span:
+                i += int(span)
+        self._body_file.write(out.getvalue())
+
+        if isinstance(table_data, v_compact_table.iqVCompactTableData):
+            self.setCompactRows(table_data, row_breaks)
+            return
+
+        # Rows
+        i = 1
+        i_ods_row = 0
+        rows = self.iterChildrenByName(data_dict, 'Row')
+        for row in rows:
+            # Row index accounting
+            idx = int(row.get('Index', i))
+            if idx > i:
+                self._body_file.write(u'<table:table-row/>' * (idx - i))
+                i_ods_row += idx - i
+                i = idx+1
+            else:
+                i += 1
+
+            self._body_file.write(self.setRow(row, i_ods_row in row_breaks))
+            i_ods_row += 1
+
+            span = row.get('Span', None)
+            if span:
+                i += int(span)
+
+    def _getRowStyleName(self, height, page_break=False):
+        """
+        Get the name of the row style with the height.
+        The style is created once for all rows with the same height.
+
+        :param height: Row height.
+        :param page_break: Page break before the row?
+        :return: Style name.
+        """
+        key = (height, page_break)
+        style_name = self._row_styles.get(key, None)
+        if style_name is None:
+            style_name = self._genRowStyleName()
+            ods_row_style = odf.style.Style(name=style_name, family='table-row')
+            ods_row_properties = odf.style.TableRowProperties(rowheight=self._dimensionXML2ODS(height),
+                                                              breakbefore='page' if page_break else 'auto')
+            ods_row_style.addElement(ods_row_properties)
+            self.ods_document.automaticstyles.addElement(ods_row_style)
+            # Register style
+            self._styles_[style_name] = ods_row_style
+            self._used_style_names.add(style_name)
+            self._row_styles[key] = style_name
+        return style_name
+
+    def _getStyleAttr(self, style_id):
+        """
+        Get the quoted style name attribute value by style id.
+
+        :param style_id: Style id.
+        :return: Quoted style name.
+        """
+        style_attr = self._style_attrs.get(style_id, None)
+        if style_attr is None:
+            ods_style = self._styles_.get(style_id, None)
+            style_name = ods_style.getAttrNS(odf.style.STYLENS, 'name') if ods_style is not None else None
+            self._used_style_names.add(str(style_name))
+            style_attr = _quoteAttr(style_name)
+            self._style_attrs[style_id] = style_attr
+        return style_attr
+
+    def setRow(self, data_dict, page_break=False):
+        """
+        Set row.
+
+        :param data_dict: Data dictionary.
+        :param page_break: Page break before the row?
+        :return: Row XML text.
+        """
+        row_xml = self._getRowOpenTag(data_dict, page_break)
+
+        # Cells
+        i = 1
+        prev_style_id = None
+        cells = self.getChildrenByName(data_dict, 'Cell')
+        if not cells:
+            row_xml.append(u'/>')
+            return u''.join(row_xml)
+
+        row_xml.append(u'>')
+        for cell in cells:
+            idx = int(cell.get('Index', i))
+            if idx > i:
+                row_xml.append(u'<table:covered-table-cell table:number-columns-repeated="%d"' % (idx-i))
+                if prev_style_id:
+                    row_xml.append(u' table:style-name=%s' % self._getStyleAttr(prev_style_id))
+                row_xml.append(u'/>')
+                i = idx+1
+            else:
+                i += 1
+
+            self.setCell(cell, row_xml)
+
+            # Combined cell accounting
+            merge = int(cell.get('MergeAcross', 0))
+            if merge > 0:
+                row_xml.append(u'<table:covered-table-cell table:number-columns-repeated="%d"' % merge)
+                if prev_style_id:
+                    row_xml.append(u' table:style-name=%s' % self._getStyleAttr(prev_style_id))
+                row_xml.append(u'/>')
+                i += merge
+
+            if 'StyleID' in cell:
+                prev_style_id = cell.get('StyleID', None)
+        row_xml.append(u'</table:table-row>')
+        return u''.join(row_xml)
+
+    def _getRowOpenTag(self, data_dict, page_break=False):
+        """
+        Get the row open tag without the closing bracket.
+
+        :param data_dict: Row data dictionary.
+        :param page_break: Page break before the row?
+        :return: List of row XML text parts.
+        """
+        row_xml = [u'<table:table-row']
+        height = data_dict.get('Height', None)
+        if height:
+            # Create automatic styles for line heights
+            row_xml.append(u' table:style-name=%s' % _quoteAttr(self._getRowStyleName(height, page_break)))
+
+        hidden = data_dict.get('Hidden', False)
+        if hidden:
+            row_xml.append(u' table:visibility="collapse"')
+        return row_xml
+
+    def setCompactRows(self, table_data, row_breaks=()):
+        """
+        Set rows of the compact table.
+        Cells are written from the row arrays without cell data dictionaries.
+        Rows with additional cell attributes (merge, formula) are written by setRow.
+
+        :param table_data: Compact table data.
+        :param row_breaks: Indexes of rows with page breaks.
+        """
+        cell_attr_rows = table_data.getCellAttrRows()
+        for row in range(1, table_data.getRowCount() + 1):
+            page_break = row - 1 in row_breaks
+            if row in cell_attr_rows:
+                self._body_file.write(self.setRow(table_data.getRowDict(row), page_break))
+            else:
+                self._body_file.write(self.setCompactRow(table_data, row, page_break))
+
+    def setCompactRow(self, table_data, row, page_break=False):
+        """
+        Set row of the compact table without additional cell attributes.
+
+        :param table_data: Compact table data.
+        :param row: Row index.
+        :param page_break: Page break before the row?
+        :return: Row XML text.
+        """
+        row_xml = self._getRowOpenTag(table_data.getRowAttrs(row), page_break)
+        row_array = table_data.getRowArray(row)
+        if not row_array or not any(row_array[::2]):
+            row_xml.append(u'/>')
+            return u''.join(row_xml)
+
+        row_xml.append(u'>')
+        i = 1
+        prev_style_idx = v_compact_table.STYLE_ID_NO_STYLE
+        cell_xml_cache = self._cell_xml
+        for pos in range(0, len(row_array), 2):
+            value_id = row_array[pos]
+            if value_id == v_compact_table.VALUE_ID_NO_CELL:
+                continue
+            col = pos // 2 + 1
+            if col > i:
+                row_xml.append(u'<table:covered-table-cell table:number-columns-repeated="%d"' % (col-i))
+                if prev_style_idx != v_compact_table.STYLE_ID_NO_STYLE:
+                    style_id = table_data.getCellStyleID(row, prev_style_col)
+                    row_xml.append(u' table:style-name=%s' % self._getStyleAttr(style_id))
+                row_xml.append(u'/>')
+            i = col + 1
+
+            style_idx = row_array[pos + 1]
+            key = (value_id, style_idx)
+            cell_xml = cell_xml_cache.get(key, None)
+            if cell_xml is None:
+                cell_xml = u''.join(self.setCell(table_data.getCellDict(row, col)))
+                if len(cell_xml_cache) >= CELL_XML_CACHE_SIZE:
+                    cell_xml_cache.clear()
+                cell_xml_cache[key] = cell_xml
+            row_xml.append(cell_xml)
+
+            if style_idx != v_compact_table.STYLE_ID_NO_STYLE:
+                prev_style_idx = style_idx
+                prev_style_col = col
+        row_xml.append(u'</table:table-row>')
+        return u''.join(row_xml)
+
+    def setCell(self, data_dict, row_xml=None):
+        """
+        Set cell.
+
+        :param data_dict: Data dictionary.
+        :param row_xml: List of row XML text parts. The cell XML text is appended to it.
+        :return: Row XML text parts.
+        """
+        if row_xml is None:
+            row_xml = list()
+
+        ods_type = self.getCellType(data_dict)
+        row_xml.append(u'<table:table-cell office:value-type=%s' % _quoteAttr(ods_type))
+        style_id = data_dict.get('StyleID', None)
+        if style_id:
+            row_xml.append(u' table:style-name=%s' % self._getStyleAttr(style_id))
+
+        merge_across = int(data_dict.get('MergeAcross', 0))
+        if merge_across:
+            row_xml.append(u' table:number-columns-spanned="%d"' % (merge_across+1))
+
+        merge_down = int(data_dict.get('MergeDown', 0))
+        if merge_down:
+            row_xml.append(u' table:number-rows-spanned="%d"' % (merge_down+1))
+
+        formula = data_dict.get('Formula', None)
+        if formula:
+            row_xml.append(u' table:formula=%s' % _quoteAttr(self._translateR1C1Formula(formula)))
+        else:
+            row_xml.append(u' office:value=%s' % _quoteAttr(self.getCellValue(data_dict)))
+
+        dates = self.getChildrenByName(data_dict, 'Data')
+        values = [_escapeText(val) for val in self.getDataValues(data_dict) if val] if dates else ()
+        if not values:
+            row_xml.append(u'/>')
+            return row_xml
+
+        row_xml.append(u'>')
+        if style_id and style_id != v_ods.DEFAULT_STYLE_ID:
+            style_attr = self._getStyleAttr(style_id)
+            paragraphs = [u'<text:p><text:span text:style-name=%s>%s</text:span></text:p>' % (style_attr, val)
+                          for val in values]
+        else:
+            paragraphs = [u'<text:p>%s</text:p>' % val for val in values]
+        for data in dates:
+            row_xml.extend(paragraphs)
+        row_xml.append(u'</table:table-cell>')
+        return row_xml
+
+    def _getUsedAutoStyles(self):
+        """
+        Get automatic styles used in content.
+
+        :return: List of automatic style objects.
+        """
+        used_style_names = set(self._used_style_names)
+        for top in (self.ods_document.styles, self.ods_document.automaticstyles):
+            used_style_names.update(self.ods_document._parseoneelement(top, []))
+        return [ods_style for ods_style in self.ods_document.automaticstyles.childNodes
+                if isinstance(ods_style, odf.element.Element) and
+                ods_style.getAttrNS(odf.style.STYLENS, 'name') in used_style_names]
+
+    def _writeContent(self, content_file):
+        """
+        Write content.xml to file.
+
+        :param content_file: Binary file object.
+        """
+        out = io.StringIO()
+        out.write(XML_PROLOGUE)
+        document_content = odf.office.DocumentContent()
+        document_content.write_open_tag(0, out)
+        if self.ods_document.scripts.hasChildNodes():
+            self.ods_document.scripts.toXml(1, out)
+        if self.ods_document.fontfacedecls.hasChildNodes():
+            self.ods_document.fontfacedecls.toXml(1, out)
+        automatic_styles = odf.office.AutomaticStyles()
+        style_list = self._getUsedAutoStyles()
+        if style_list:
+            automatic_styles.write_open_tag(1, out)
+            for ods_style in style_list:
+                ods_style.toXml(2, out)
+            automatic_styles.write_close_tag(1, out)
+        else:
+            automatic_styles.toXml(1, out)
+        content_file.write(out.getvalue().encode(v_ods.DEFAULT_ENCODE))
+
+        self._body_file.seek(0)
+        for block in iter(lambda: self._body_file.read(BODY_COPY_BLOCK_SIZE), u''):
+            content_file.write(block.encode(v_ods.DEFAULT_ENCODE))
+
+        out = io.StringIO()
+        document_content.write_close_tag(0, out)
+        content_file.write(out.getvalue().encode(v_ods.DEFAULT_ENCODE))
+
+    def _saveDocument(self, filename):
+        """
+        Save ODS zip container with the same files as odfpy.
+
+        :param filename: ODS filename.
+        """
+        now = time.localtime()[:6]
+        ods_manifest = odf.manifest.Manifest()
+
+        def _zipInfo(name, compress_type=zipfile.ZIP_DEFLATED):
+            zip_info = zipfile.ZipInfo(name, now)
+            zip_info.compress_type = compress_type
+            zip_info.external_attr = ZIP_UNIXPERMS
+            return zip_info
+
+        with zipfile.ZipFile(filename, 'w') as zip_file:
+            zip_file.writestr(_zipInfo('mimetype', zipfile.ZIP_STORED),
+                              self.ods_document.mimetype.encode(v_ods.DEFAULT_ENCODE))
+
+            ods_manifest.addElement(odf.manifest.FileEntry(fullpath=u'/', mediatype=self.ods_document.mimetype))
+            ods_manifest.addElement(odf.manifest.FileEntry(fullpath=u'styles.xml', mediatype=u'text/xml'))
+            zip_file.writestr(_zipInfo('styles.xml'), self.ods_document.stylesxml().encode(v_ods.DEFAULT_ENCODE))
+
+            ods_manifest.addElement(odf.manifest.FileEntry(fullpath=u'content.xml', mediatype=u'text/xml'))
+            force_zip64 = self._body_file.tell() > BODY_ZIP64_SIZE
+            with zip_file.open(_zipInfo('content.xml'), 'w', force_zip64=force_zip64) as content_file:
+                self._writeContent(content_file)
+
+            if self.ods_document.settings.hasChildNodes():
+                ods_manifest.addElement(odf.manifest.FileEntry(fullpath=u'settings.xml', mediatype=u'text/xml'))
+                zip_file.writestr(_zipInfo('settings.xml'),
+                                  self.ods_document.settingsxml().encode(v_ods.DEFAULT_ENCODE))
+
+            ods_manifest.addElement(odf.manifest.FileEntry(fullpath=u'meta.xml', mediatype=u'text/xml'))
+            zip_file.writestr(_zipInfo('meta.xml'), self.ods_document.metaxml().encode(v_ods.DEFAULT_ENCODE))
+
+            out = io.StringIO()
+            out.write(XML_PROLOGUE)
+            ods_manifest.toXml(0, out)
+            zip_file.writestr(_zipInfo('META-INF/manifest.xml'), out.getvalue().encode(v_ods.DEFAULT_ENCODE))
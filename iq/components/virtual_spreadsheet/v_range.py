@@ -6,7 +6,7 @@ import copy
 from . import v_prototype
 from . import v_cell
 
-__version__ = (0, 0, 0, 1)
+__version__ = (0, 0, 0, 2)
 
 RANGE_ROW_IDX = 0
 RANGE_COL_IDX = 1
@@ -443,7 +443,7 @@ class iqVRow(v_prototype.iqVIndexedPrototype, iqVRange):
         Create / Add to row cell.
         """
         cell = self.createCell()
-        self._attributes['_children_'] = self._attributes['_children_'][:-1]
+        del self._attributes['_children_'][-1]
 
         # Move cell by index
         cell = self.insertCellIdx(cell, idx)
@@ -8,12 +8,15 @@ import copy
 from . import v_prototype
 from . import v_workbook
 from . import v_ods
+from . import v_ods_stream
+from . import v_ods_reader
+from . import v_compact_table
 
 from ...util import xml2dict
 from ...util import dict2xml
 from ...util import log_func
 
-__version__ = (0, 0, 0, 1)
+__version__ = (0, 0, 0, 4)
 
 # Default colors
 HEADER_CELL_BACKGROUND_COLOR = (128, 128, 128)
@@ -164,9 +167,13 @@ class iqVSpreadsheet(v_prototype.iqVPrototype):
             log_func.fatal('convertXLS2XML function')
         return False
 
-    def loadXML(self, xml_filename=None):
+    def loadXML(self, xml_filename=None, compact=False):
         """
         Load from XML file.
+
+        :param xml_filename: XML filename.
+        :param compact: Load worksheet tables into the compact tables?
+            Table rows are not kept as XML-dict nodes.
         """
         if xml_filename:
             self.SpreadsheetFileName = os.path.abspath(xml_filename)
@@ -174,23 +181,28 @@ class iqVSpreadsheet(v_prototype.iqVPrototype):
             if not os.path.exists(self.SpreadsheetFileName) and os.path.exists(xls_file_name):
                 if not self.convertXLS2XML(xls_file_name):
                     return None
-        self._data = xml2dict.XmlFile2Dict(self.SpreadsheetFileName, encoding=self.encoding)
+        if compact:
+            self._data = v_compact_table.loadCompactXML(self.SpreadsheetFileName, encoding=self.encoding)
+        else:
+            self._data = xml2dict.XmlFile2Dict(self.SpreadsheetFileName, encoding=self.encoding)
 
         # Register an open book
         self._regWorkbook(self.SpreadsheetFileName, self._data)
 
         return self._data
 
-    def loadODS(self, ods_filename=None):
+    def loadODS(self, ods_filename=None, stream_reader=False):
         """
         Load from ODS file.
 
         :param ods_filename: ODS filename.
+        :param stream_reader: Use streaming ODS reader?
+            Worksheet tables are loaded into the compact tables.
         """
         if ods_filename:
             self.SpreadsheetFileName = os.path.abspath(ods_filename)
         
-            ods = v_ods.iqODS()
+            ods = v_ods_reader.iqODSStreamReader() if stream_reader else v_ods.iqODS()
             self._data = ods.load(ods_filename)
         
             # Register an open book
@@ -246,11 +258,13 @@ class iqVSpreadsheet(v_prototype.iqVPrototype):
             log_func.warning(u'Unsupported file type <%s>' % ext)
         return None
         
-    def saveAsODS(self, ods_filename=None):
+    def saveAsODS(self, ods_filename=None, stream_writer=False):
         """
         Save to ODS file.
 
         :param ods_filename: ODS filename.
+        :param stream_writer: Use fast ODS writer?
+            The rows and cells are streamed to content.xml without odfpy objects.
         """
         if ods_filename is None:
             ods_filename = os.path.splitext(self.SpreadsheetFileName)[0] + '.ods'
@@ -263,7 +277,7 @@ class iqVSpreadsheet(v_prototype.iqVPrototype):
             # If the file exists, delete it
             os.remove(ods_filename)
             
-        ods = v_ods.iqODS()
+        ods = v_ods_stream.iqODSStreamWriter() if stream_writer else v_ods.iqODS()
         return ods.save(ods_filename, self._data)
 
     def saveODS(self):
@@ -5,7 +5,7 @@ import hashlib
 
 from . import v_prototype
 
-__version__ = (0, 0, 0, 1)
+__version__ = (0, 0, 0, 2)
 
 COLOR_ENUM = ('#000000',)
 
@@ -358,26 +358,23 @@ class iqVStyles(v_prototype.iqVPrototype):
         del_styles_id = []
         styles_id = self.getStylesID()
         # Defining the IDs of the styles used
-        used_styles_id = ['Default']
+        used_styles_id = set(['Default'])
         work_sheets = [element for element in self._parent._attributes['_children_'] if element['name'] == 'Worksheet']
         for work_sheet in work_sheets:
             tables = [element for element in work_sheet['_children_'] if element['name'] == 'Table']
             for table in tables:
                 if 'StyleID' in table:
                     style_id = table['StyleID']
-                    if style_id not in used_styles_id:
-                        used_styles_id.append(style_id)
+                    used_styles_id.add(style_id)
                 for tab_element in table['_children_']:
                     if 'StyleID' in tab_element:
                         style_id = tab_element['StyleID']
-                        if style_id not in used_styles_id:
-                            used_styles_id.append(style_id)
+                        used_styles_id.add(style_id)
                     if tab_element['name'] == 'Row':
                         for cell in tab_element['_children_']:
                             if 'StyleID' in cell:
                                 style_id = cell['StyleID']
-                                if style_id not in used_styles_id:
-                                    used_styles_id.append(style_id)
+                                used_styles_id.add(style_id)
                                     
         for style_id in styles_id:
             if style_id not in used_styles_id:
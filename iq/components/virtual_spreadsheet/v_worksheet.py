@@ -5,11 +5,13 @@ import copy
 
 from . import v_prototype
 from . import v_range
+from . import v_cell
 from . import paper_size
 from . import exceptions
+from . import v_compact_table
 
 
-__version__ = (0, 0, 0, 1)
+__version__ = (0, 0, 0, 4)
 
 DETECT_MERGE_CELL_ERROR = False
 
@@ -81,11 +83,13 @@ class iqVWorksheet(v_prototype.iqVPrototype):
         """
         self._attributes['Name'] = name
 
-    def createTable(self):
+    def createTable(self, compact=False):
         """
         Create table.
+
+        :param compact: Create compact table for large sheets?
         """
-        self._table = iqVTable(self)
+        self._table = v_compact_table.iqVCompactTable(self) if compact else iqVTable(self)
         attrs = self._table.create()
         return self._table
 
@@ -99,7 +103,10 @@ class iqVWorksheet(v_prototype.iqVPrototype):
         tab_attr = [element for element in self._attributes['_children_'] if element['name'] == 'Table']
 
         if tab_attr:
-            self._table = iqVTable(self)
+            if isinstance(tab_attr[0]['_children_'], v_compact_table.iqVCompactTableData):
+                self._table = v_compact_table.iqVCompactTable(self)
+            else:
+                self._table = iqVTable(self)
             self._table.setAttributes(tab_attr[0])
         else:
             self.createTable()
@@ -230,6 +237,308 @@ class iqVWorksheet(v_prototype.iqVPrototype):
         return page_breaks
 
 
+class iqVTableIndex(object):
+    """
+    Sparse cell index of the table.
+    Rows are indexed by the row index, cells by the row and the column index
+    and the merged cell regions by the rows they cover.
+    Indexing starts at 1.
+    The index is kept together with the table attribute lists.
+    If the lists are changed bypassing the table,
+    the index is built again on the next access.
+    """
+    def __init__(self):
+        """
+        Constructor.
+        """
+        # Table children list of the index
+        self._children = None
+        self._children_len = 0
+
+        # Row index -> row attributes
+        self._rows = dict()
+        # Index of the last row element
+        self._last_row_idx = 0
+        # The maximum row and column indexes. Indexing starts at 0. See _maxElementIdx
+        self._max_row_idx = -1
+        self._max_col_idx = -1
+
+        # Row index -> [row cells list, cell count, index of the last cell, {column index -> cell attributes}]
+        self._row_cells = dict()
+
+        # Merged cell address (row, column) -> region (row, column, merge down, merge across)
+        self._merge_regions = None
+        # Row index -> list of merged cell regions covering the row
+        self._merge_rows = None
+
+    def reset(self):
+        """
+        Reset index. The index is built again on the next access.
+        """
+        self._children = None
+        self._children_len = 0
+        self._rows = dict()
+        self._last_row_idx = 0
+        self._max_row_idx = -1
+        self._max_col_idx = -1
+        self._row_cells = dict()
+        self._merge_regions = None
+        self._merge_rows = None
+
+    def _indexElement(self, element):
+        """
+        Add table child element to index.
+        Row and column indexes are calculated as in
+        _findElementIdxAttr and _maxElementIdx.
+
+        :param element: Row or column attributes.
+        """
+        if element['name'] == 'Row':
+            if 'Index' in element:
+                self._last_row_idx = int(element['Index'])
+                self._max_row_idx = self._last_row_idx - 1
+            else:
+                self._last_row_idx += 1
+                self._max_row_idx += int(element['Span']) if 'Span' in element else 1
+            self._rows.setdefault(self._last_row_idx, element)
+        elif element['name'] == 'Column':
+            if 'Index' in element:
+                self._max_col_idx = int(element['Index']) - 1
+            else:
+                self._max_col_idx += int(element['Span']) if 'Span' in element else 1
+
+    def check(self, children):
+        """
+        Check that the index corresponds to the table children list.
+        Build index if necessary.
+
+        :param children: Table children list.
+        """
+        if self._children is children and self._children_len == len(children):
+            return
+        self.reset()
+        for element in children:
+            self._indexElement(element)
+        self._children = children
+        self._children_len = len(children)
+
+    def appendElement(self, children):
+        """
+        Add the last appended table child element to index.
+
+        :param children: Table children list.
+        """
+        if self._children is children and self._children_len == len(children) - 1:
+            self._indexElement(children[-1])
+            self._children_len = len(children)
+        else:
+            self.check(children)
+
+    def getMaxRowIdx(self):
+        """
+        The maximum row index. Indexing starts at 0.
+        """
+        return self._max_row_idx
+
+    def getMaxColIdx(self):
+        """
+        The maximum column index. Indexing starts at 0.
+        """
+        return self._max_col_idx
+
+    def findRow(self, row):
+        """
+        Find row attributes by index.
+
+        :param row: Row index.
+        :return: Row attributes or None if not found.
+        """
+        return self._rows.get(row, None)
+
+    def _iterRowCells(self, cells):
+        """
+        Iterate row cells with cell indexes as in iqVCell._findElementIdxAttr.
+
+        :param cells: Row cells list.
+        :return: Generator of (column index, cell attributes, index of the last cell).
+        """
+        cur_idx = 0
+        for cell_attr in cells:
+            if 'Index' in cell_attr:
+                cur_idx = int(cell_attr['Index'])
+            else:
+                cur_idx += 1
+            col = cur_idx
+            # Combined cell accounting
+            if 'MergeAcross' in cell_attr:
+                cur_idx += int(cell_attr['MergeAcross'])
+            yield col, cell_attr, cur_idx
+
+    def _getRowCells(self, row, row_attrs):
+        """
+        Get row cell index item. Build it if necessary.
+
+        :param row: Row index.
+        :param row_attrs: Row attributes.
+        :return: Row cell index item.
+        """
+        cells = row_attrs['_children_']
+        row_cells = self._row_cells.get(row, None)
+        if row_cells is None or row_cells[0] is not cells or row_cells[1] != len(cells):
+            cols = dict()
+            last_idx = 0
+            for col, cell_attr, last_idx in self._iterRowCells(cells):
+                cols.setdefault(col, cell_attr)
+            row_cells = [cells, len(cells), last_idx, cols]
+            self._row_cells[row] = row_cells
+        return row_cells
+
+    def findCell(self, row, row_attrs, col):
+        """
+        Find cell attributes by index.
+
+        :param row: Row index.
+        :param row_attrs: Row attributes.
+        :param col: Column index.
+        :return: Cell attributes or None if not found.
+        """
+        return self._getRowCells(row, row_attrs)[3].get(col, None)
+
+    def getLastCellIdx(self, row, row_attrs):
+        """
+        Index of the last cell of the row taking into account the merged cells.
+
+        :param row: Row index.
+        :param row_attrs: Row attributes.
+        :return: Cell index or 0 if the row has no cells.
+        """
+        return self._getRowCells(row, row_attrs)[2]
+
+    def appendCell(self, row, row_attrs):
+        """
+        Add the new cell of the row to index.
+
+        :param row: Row index.
+        :param row_attrs: Row attributes.
+        """
+        cells = row_attrs['_children_']
+        row_cells = self._row_cells.get(row, None)
+        if row_cells is not None and row_cells[0] is cells and row_cells[1] == len(cells) - 1:
+            cell_attr = cells[-1]
+            col = int(cell_attr['Index']) if 'Index' in cell_attr else row_cells[2] + 1
+            row_cells[3].setdefault(col, cell_attr)
+            row_cells[2] = col + int(cell_attr['MergeAcross']) if 'MergeAcross' in cell_attr else col
+            row_cells[1] = len(cells)
+        else:
+            # The cell is inserted between the cells of the row
+            self._row_cells.pop(row, None)
+
+    def _addMergeRegion(self, region):
+        """
+        Add merged cell region to index.
+
+        :param region: Region (row, column, merge down, merge across).
+        """
+        row, col, merge_down, merge_across = region
+        self._merge_regions[(row, col)] = region
+        if merge_down > 0 or merge_across > 0:
+            for i_row in range(row, row + merge_down + 1):
+                self._merge_rows.setdefault(i_row, list()).append(region)
+
+    def _delMergeRegion(self, row, col):
+        """
+        Delete merged cell region from index.
+
+        :param row: Row index of the merged cell.
+        :param col: Column index of the merged cell.
+        """
+        region = self._merge_regions.pop((row, col), None)
+        if region is not None:
+            for i_row in range(row, row + region[2] + 1):
+                regions = self._merge_rows.get(i_row, ())
+                if region in regions:
+                    regions.remove(region)
+
+    def _getMergeRegions(self):
+        """
+        Get merged cell regions. Build merged cell region index if necessary.
+
+        :return: Dictionary {(row, column): region}.
+        """
+        if self._merge_regions is None:
+            self._merge_regions = dict()
+            self._merge_rows = dict()
+            for row, row_attrs in self._rows.items():
+                self._indexRowMergeRegions(row, row_attrs)
+        return self._merge_regions
+
+    def _indexRowMergeRegions(self, row, row_attrs):
+        """
+        Add merged cell regions of the row cells to index.
+
+        :param row: Row index.
+        :param row_attrs: Row attributes.
+        """
+        for col, cell_attr, last_idx in self._iterRowCells(row_attrs.get('_children_', ())):
+            if 'MergeAcross' in cell_attr or 'MergeDown' in cell_attr:
+                self._addMergeRegion((row, col,
+                                      int(cell_attr.get('MergeDown', 0)),
+                                      int(cell_attr.get('MergeAcross', 0))))
+
+    def resetRow(self, row):
+        """
+        Reset the row cell index after the cell attributes of the row are changed in place
+        (Index, MergeAcross, MergeDown). Merged cell regions of the row are indexed again.
+
+        :param row: Row index.
+        """
+        self._row_cells.pop(row, None)
+        if self._merge_regions is not None:
+            for region in [region for region in self._merge_rows.get(row, ()) if region[0] == row]:
+                self._delMergeRegion(region[0], region[1])
+            row_attrs = self._rows.get(row, None)
+            if row_attrs is not None:
+                self._indexRowMergeRegions(row, row_attrs)
+
+    def getMergeRegions(self):
+        """
+        Get merged cell regions.
+
+        :return: List of regions (row, column, merge down, merge across).
+        """
+        return list(self._getMergeRegions().values())
+
+    def setMergeRegion(self, row, col, merge_down, merge_across):
+        """
+        Set merged cell region.
+
+        :param row: Row index of the merged cell.
+        :param col: Column index of the merged cell.
+        :param merge_down: The number of merge lines.
+        :param merge_across: The number of merge columns.
+        """
+        self._getMergeRegions()
+        self._delMergeRegion(row, col)
+        if merge_down > 0 or merge_across > 0:
+            self._addMergeRegion((row, col, merge_down, merge_across))
+
+    def findMergeRegion(self, row, col):
+        """
+        Find the merged cell region the cell gets into.
+        The merged cell itself does not get into its region.
+
+        :param row: Row index.
+        :param col: Column index.
+        :return: Region (row, column, merge down, merge across) or None if not found.
+        """
+        self._getMergeRegions()
+        for region in self._merge_rows.get(row, ()):
+            if region[1] <= col <= region[1] + region[3]:
+                if row != region[0] or col != region[1]:
+                    return region
+        return None
+
+
 class iqVTable(v_prototype.iqVPrototype):
     """
     Table.
@@ -245,8 +554,8 @@ class iqVTable(v_prototype.iqVPrototype):
         self._basis_row = None
         self._basis_col = None
 
-        # Dictionary of merged cells
-        self._merge_cells = None
+        # Sparse cell index
+        self._index = iqVTableIndex()
 
     def getUsedSize(self):
         """
@@ -262,6 +571,7 @@ class iqVTable(v_prototype.iqVPrototype):
         """
         col = v_range.iqVColumn(self)
         attrs = col.create()
+        self._index.appendElement(self._attributes['_children_'])
         return col
 
     def getColumns(self, start_idx=0, stop_idx=None):
@@ -339,6 +649,7 @@ class iqVTable(v_prototype.iqVPrototype):
         """
         row = v_range.iqVRow(self)
         attrs = row.create()
+        self._index.appendElement(self._attributes['_children_'])
         return row
 
     def cloneRow(self, clear_cell=True, row=-1):
@@ -397,6 +708,13 @@ class iqVTable(v_prototype.iqVPrototype):
         """
         Get row by index.
         """
+        self._index.check(self._attributes['_children_'])
+        row_data = self._index.findRow(idx)
+        if row_data is not None:
+            row = v_range.iqVRow(self)
+            row.setAttributes(row_data)
+            return row
+
         row = None
         idxs, _i, row_data = self._findRowIdxAttr(idx)
         if row_data is not None:
@@ -431,6 +749,7 @@ class iqVTable(v_prototype.iqVPrototype):
 
         cur_row = self.getRow(row)
         cell = cur_row.createCellIdx(col)
+        self._index.appendCell(row, cur_row.getAttributes())
         return cell
 
     def getCell(self, row, col):
@@ -470,12 +789,37 @@ class iqVTable(v_prototype.iqVPrototype):
                 return cell
 
         cur_row = self.getRow(row)
-        cell = cur_row.getCellIdx(col)
+        cell = self._getRowCellIdx(cur_row, row, col)
         # Set cell coordinates
         cell._row_idx = row
         cell._col_idx = col
         return cell
 
+    def _getRowCellIdx(self, row_obj, row, col):
+        """
+        Get a cell from a row by index using the cell index.
+        If the cell does not exist, then it is created.
+
+        :param row_obj: Row object.
+        :param row: Row index.
+        :param col: Column index.
+        :return: Cell object.
+        """
+        row_attrs = row_obj.getAttributes()
+        cell_attrs = self._index.findCell(row, row_attrs, col)
+        if cell_attrs is None:
+            if col > self._index.getLastCellIdx(row, row_attrs):
+                # Add cell to the end of the row without search of the insert position
+                cell = row_obj.createCell()
+                cell.setIndex(col)
+            else:
+                cell = row_obj.createCellIdx(col)
+            self._index.appendCell(row, row_attrs)
+        else:
+            cell = v_cell.iqVCell(row_obj)
+            cell.setAttributes(cell_attrs)
+        return cell
+
     def clearTab(self):
         """
         Clear table.
@@ -501,14 +845,16 @@ class iqVTable(v_prototype.iqVPrototype):
         The maximum column index in the table.
         Indexing starts at 0.
         """
-        return self._getBasisCol()._maxElementIdx(elements=self.getColumnsAttrs())
+        self._index.check(self._attributes['_children_'])
+        return self._index.getMaxColIdx()
 
     def _maxRowIdx(self):
         """
         The maximum row index in the table.
         Indexing starts at 0.
         """
-        return self._getBasisRow()._maxElementIdx(elements=self.getRowsAttrs())
+        self._index.check(self._attributes['_children_'])
+        return self._index.getMaxRowIdx()
 
     def setExpandedRowCount(self, expanded_row_count=None):
         """
@@ -589,65 +935,62 @@ class iqVTable(v_prototype.iqVPrototype):
         """
         Dictionary of merged cells. As a key, a tuple of the cell coordinate.
         """
+        self._index.check(self._attributes['_children_'])
         merge_cells = {}
-        rows = [element for element in self._attributes['_children_'] if element['name'] == 'Row']
-        for i_row, row in enumerate(rows):
-            i_col = 0
-            for cell in row['_children_']:
-                if cell['name'] == 'Cell':
-                    if 'Index' in cell:
-                        new_i_col = int(cell['Index'])
-                        if new_i_col >= i_col:
-                            i_col = new_i_col
-                    else:
-                        i_col += 1
-
-                    if 'MergeAcross' in cell or 'MergeDown' in cell:
-                        cur_row = self.getRow(i_row+1)
-                        cell_obj = cur_row.getCellIdx(i_col)
-                        # Set cell coordinates
-                        cell_obj._row_idx = i_row+1
-                        cell_obj._col_idx = i_col
-                        merge_cells[cell_obj.getRegion()] = cell_obj
-                    if 'MergeAcross' in cell:
-                        # Accounting of the unified cells DO MANDATORY !!!
-                        # Otherwise, the previous merged cells are not counted
-                        i_col += int(cell['MergeAcross'])-1
-
+        for region in self._index.getMergeRegions():
+            merge_cells[region] = self._getMergeCell(region)
         return merge_cells
 
+    def _getMergeCell(self, region):
+        """
+        Get merged cell object by region.
+
+        :param region: Region (row, column, merge down, merge across).
+        :return: Cell object.
+        """
+        cur_row = self.getRow(region[0])
+        cell_obj = self._getRowCellIdx(cur_row, region[0], region[1])
+        # Set cell coordinates
+        cell_obj._row_idx = region[0]
+        cell_obj._col_idx = region[1]
+        return cell_obj
+
+    def setMergeCell(self, row, column, merge_down, merge_across):
+        """
+        Register merged cell region in the cell index.
+
+        :param row: Row index of the merged cell.
+        :param column: Column index of the merged cell.
+        :param merge_down: The number of merge lines.
+        :param merge_across: The number of merge columns.
+        """
+        self._index.check(self._attributes['_children_'])
+        self._index.setMergeRegion(row, column, merge_down, merge_across)
+
+    def resetRowIndex(self, row):
+        """
+        Reset the cell index of the row after the row cells are changed in place.
+
+        :param row: Row index.
+        """
+        self._index.check(self._attributes['_children_'])
+        self._index.resetRow(row)
+
     def isInMergeCell(self, row, column):
         """
         Does the specified cell get in the merged?
         """
-        # Caching merged cells in case of a hit
-        # in them when creating a new cell
-        if self._merge_cells is None:
-            self._merge_cells = self.getMergeCells()
-
-        for cell in self._merge_cells.items():
-            cell_region = cell[0]
-            if (row >= cell_region[0]) and (row <= (cell_region[0]+cell_region[2])) and \
-                    (column >= cell_region[1]) and (column <= (cell_region[1]+cell_region[3])):
-                if row != cell_region[0] or column != cell_region[1]:
-                    return True
-        return False
+        self._index.check(self._attributes['_children_'])
+        return self._index.findMergeRegion(row, column) is not None
 
     def getInMergeCell(self, row, column):
         """
         Get the combined cell indicated by the coordinates.
         """
-        # Caching merged cells in case of a hit
-        # in them when creating a new cell
-        if self._merge_cells is None:
-            self._merge_cells = self.getMergeCells()
-
-        for cell in self._merge_cells.items():
-            cell_region = cell[0]
-            if (row >= cell_region[0]) and (row<= (cell_region[0]+cell_region[2])) and \
-                    (column >= cell_region[1]) and (column <= (cell_region[1]+cell_region[3])):
-                if row != cell_region[0] or column != cell_region[1]:
-                    return cell[1]
+        self._index.check(self._attributes['_children_'])
+        region = self._index.findMergeRegion(row, column)
+        if region is not None:
+            return self._getMergeCell(region)
         return None
 
     def delColumn(self, idx=-1):
@@ -663,6 +1006,8 @@ class iqVTable(v_prototype.iqVPrototype):
                 row = self.getRow(i_row+1)
                 if row:
                     row.delCell(idx)
+            # Cell indexes of the rows are changed
+            self._index.reset()
             return result
         return False
 
@@ -674,7 +1019,10 @@ class iqVTable(v_prototype.iqVPrototype):
 
         if row:
             # Delete row from table
-            return row._delElementIdxAttr(idx - 1, 'Row')
+            result = row._delElementIdxAttr(idx - 1, 'Row')
+            # Row indexes after the deleted row are changed
+            self._index.reset()
+            return result
         return False
 
 
@@ -19,6 +19,7 @@ import gi.repository.GdkPixbuf
 from ....util import log_func
 from ....util import file_func
 from ....util import res_func
+from ....util import res_index_func
 from ....util import spc_func
 from ....util import lang_func
 from ....util import id_func
@@ -42,7 +43,7 @@ from . import new_resource_dialog
 
 from . import property_editor_manager
 
-__version__ = (0, 0, 0, 1)
+__version__ = (0, 0, 0, 2)
 
 _ = lang_func.getTranslation().gettext
 
@@ -347,6 +348,8 @@ class iqResourceEditor(gtk_handler.iqGtkHandler,
                                                         wildcard_filter='Resource files (*.res)|*.res')
         if self.res_filename:
             result = res_func.saveResourceText(self.res_filename, resource_data=resource)
+            res_func.invalidateResourceCache(self.res_filename)
+            res_index_func.invalidateResourceIndex()
             if result:
                 gtk_dlg_func.openMsgBox(title=u'EDITOR', prompt_text=u'Resource <%s> saving successful' % self.res_filename)
             else:
@@ -377,6 +380,8 @@ class iqResourceEditor(gtk_handler.iqGtkHandler,
 
         if res_filename:
             result = res_func.saveResourceText(res_filename, resource_data=resource)
+            res_func.invalidateResourceCache(res_filename)
+            res_index_func.invalidateResourceIndex()
             if result:
                 gtk_dlg_func.openMsgBox(title=u'EDITOR', prompt_text=u'Resource <%s> saving successful' % self.res_filename)
                 self.loadResourceFile(res_filename)
@@ -18,6 +18,7 @@ except:
 
 from ....util import log_func
 from ....util import res_func
+from ....util import res_index_func
 from ....util import spc_func
 from ....util import global_func
 from ....util import file_func
@@ -39,7 +40,7 @@ from . import new_resource_dialog
 from ....engine.wx import stored_wx_form_manager
 from ....engine.wx import splitter_manager
 
-__version__ = (0, 0, 1, 2)
+__version__ = (0, 0, 1, 3)
 
 _ = lang_func.getTranslation().gettext
 
@@ -415,6 +416,8 @@ class iqResourceEditor(resource_editor_frm.iqResourceEditorFrameProto,
                                                       wildcard_filter='Resource files (*.res)|*.res')
         if self.res_filename:
             result = res_func.saveResourceText(self.res_filename, resource_data=resource)
+            res_func.invalidateResourceCache(self.res_filename)
+            res_index_func.invalidateResourceIndex()
             if result:
                 wxdlg_func.openMsgBox(title=u'EDITOR', prompt_text=u'Resource <%s> saving successful' % self.res_filename)
             else:
@@ -447,6 +450,8 @@ class iqResourceEditor(resource_editor_frm.iqResourceEditorFrameProto,
 
         if res_filename:
             result = res_func.saveResourceText(res_filename, resource_data=resource)
+            res_func.invalidateResourceCache(res_filename)
+            res_index_func.invalidateResourceIndex()
             if result:
                 wxdlg_func.openMsgBox(title=u'EDITOR', prompt_text=u'Resource <%s> saving successful' % self.res_filename)
                 self.loadResourceFile(res_filename)
@@ -21,7 +21,7 @@ from . import objects_access
 from . import settings_access
 from . import locals_access
 
-__version__ = (0, 0, 1, 1)
+__version__ = (0, 0, 1, 3)
 
 RUNTIME_MODE_STATE = 'runtime'
 EDITOR_MODE_STATE = 'editor'
@@ -47,7 +47,16 @@ class iqKernel(object):
         self._components = components.getComponents()
 
         # Program object cache
+        # Key - canonical passport key (project, module, type, name)
         self._object_cache = dict()
+        # Registered passports by canonical passport key
+        self._object_passports = dict()
+        # Secondary index: (type, name) -> list of canonical passport keys
+        self._object_name_index = dict()
+        # GUID index: guid -> canonical passport key
+        self._object_guid_index = dict()
+        # Object cache statistics
+        self._object_cache_stat = dict(hits=0, misses=0, creations=0)
 
         # Application object
         # self.app = None
@@ -108,12 +117,13 @@ class iqKernel(object):
         # Clear cache
         log_func.info(u'Clear object cache')
         self.printObjCache()
-        for psp, obj in self._object_cache.items():
+        for psp_key, obj in self._object_cache.items():
             if hasattr(obj, 'destroy'):
                 try:
                     obj.destroy()
                 except:
-                    log_func.fatal(u'Error destroy object <%s>' % psp)
+                    log_func.fatal(u'Error destroy object <%s>' % str(self._object_passports.get(psp_key, psp_key)))
+        self.clearObjCache()
 
     def createByResource(self, parent=None, resource=None, context=None, *args, **kwargs):
         """
@@ -209,11 +219,102 @@ class iqKernel(object):
         :return: Registered object or None if not found.
         """
         obj_psp = passport.iqPassport().setAsAny(psp)
-        for cache_psp in self._object_cache.keys():
-            if obj_psp.isSamePassport(cache_psp, compare_guid=compare_guid):
-                return self._object_cache[cache_psp]
-        # log_func.debug(u'KERNEL. Object <%s> not found' % str(psp))
-        return None
+        psp_key = obj_psp.getCacheKey()
+        obj = self._object_cache.get(psp_key, None)
+        if obj is not None and compare_guid:
+            # Compare GUID of the registered passport
+            if passport.iqPassport().setAsAny(self._object_passports[psp_key]).guid != obj_psp.guid:
+                obj = None
+
+        if obj is None:
+            self._object_cache_stat['misses'] += 1
+            # log_func.debug(u'KERNEL. Object <%s> not found' % str(psp))
+            return None
+        self._object_cache_stat['hits'] += 1
+        return obj
+
+    def findObjectByName(self, typename, name):
+        """
+        Find object in object cache by type and name.
+
+        :param typename: Object type name.
+        :param name: Object name.
+        :return: List of registered objects.
+        """
+        psp_keys = self._object_name_index.get((typename, name), ())
+        return [self._object_cache[psp_key] for psp_key in psp_keys]
+
+    def registerObject(self, psp, obj):
+        """
+        Register object in object cache.
+
+        :param psp: Object passport.
+        :param obj: Object.
+        :return: True/False.
+        """
+        try:
+            obj_psp = passport.iqPassport().setAsAny(psp)
+            psp_key = obj_psp.getCacheKey()
+            if psp_key not in self._object_cache:
+                self._object_name_index.setdefault((obj_psp.typename, obj_psp.name), []).append(psp_key)
+            elif psp_key in self._object_passports:
+                # Drop GUID of the previous registered passport
+                prev_guid = passport.iqPassport().setAsAny(self._object_passports[psp_key]).guid
+                if self._object_guid_index.get(prev_guid, None) == psp_key:
+                    del self._object_guid_index[prev_guid]
+            self._object_cache[psp_key] = obj
+            self._object_passports[psp_key] = psp
+            if obj_psp.guid:
+                self._object_guid_index[obj_psp.guid] = psp_key
+            return True
+        except:
+            log_func.fatal(u'KERNEL. Error register object <%s>' % str(psp))
+        return False
+
+    def unregisterObject(self, psp):
+        """
+        Remove object from object cache.
+
+        :param psp: Object passport.
+        :return: Unregistered object or None if not found.
+        """
+        obj_psp = passport.iqPassport().setAsAny(psp)
+        psp_key = obj_psp.getCacheKey()
+        obj = self._object_cache.pop(psp_key, None)
+        registered_psp = self._object_passports.pop(psp_key, None)
+        name_keys = self._object_name_index.get((obj_psp.typename, obj_psp.name), [])
+        if psp_key in name_keys:
+            name_keys.remove(psp_key)
+        if not name_keys:
+            self._object_name_index.pop((obj_psp.typename, obj_psp.name), None)
+        if registered_psp is not None:
+            # Only the GUID of the registered passport is in the index
+            guid = passport.iqPassport().setAsAny(registered_psp).guid
+            if self._object_guid_index.get(guid, None) == psp_key:
+                del self._object_guid_index[guid]
+        return obj
+
+    def clearObjCache(self):
+        """
+        Clear object cache.
+
+        :return: True/False.
+        """
+        self._object_cache = dict()
+        self._object_passports = dict()
+        self._object_name_index = dict()
+        self._object_guid_index = dict()
+        return True
+
+    def getObjCacheStat(self):
+        """
+        Get object cache statistics.
+
+        :return: Dictionary {'hits': N, 'misses': N, 'creations': N, 'size': N}.
+        """
+        stat = dict(self._object_cache_stat)
+        stat['size'] = len(self._object_cache)
+        return stat
 
     def getObject(self, psp, compare_guid=False, register=True, *args, **kwargs):
         """
@@ -248,8 +349,9 @@ class iqKernel(object):
 
         obj = self.createByPsp(psp=psp, *args, **kwargs)
         # log_func.info(u'Create object <%s : %s>' % (str(psp), str(obj)))
+        self._object_cache_stat['creations'] += 1
         if register:
-            self._object_cache[psp] = obj
+            self.registerObject(psp, obj)
         return obj
 
     def printObjCache(self):
@@ -260,8 +362,14 @@ class iqKernel(object):
         """
         log_func.info(u'KERNEL. Object cache:')
         try:
-            for psp, obj in self._object_cache.items():
+            for psp_key, obj in self._object_cache.items():
+                psp = self._object_passports.get(psp_key, psp_key)
                 log_func.info(u'\t%s\t=\t%s' % (str(psp), str(obj)))
+            stat = self.getObjCacheStat()
+            log_func.info(u'KERNEL. Object cache statistics: size <%d> hits <%d> misses <%d> creations <%d>' % (stat['size'],
+                                                                                                                stat['hits'],
+                                                                                                                stat['misses'],
+                                                                                                                stat['creations']))
             return True
         except:
             log_func.fatal(u'Error print object cache')
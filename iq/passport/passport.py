@@ -12,21 +12,26 @@ The composition of the passport includes:
 """
 
 import os.path
+import copy
 import uuid
 import hashlib
 
 from ..util import file_func
 from ..util import global_func
 from ..util import res_func
+from ..util import res_index_func
 from ..util import spc_func
 from ..util import log_func
 
-__version__ = (0, 0, 0, 1)
+__version__ = (0, 0, 0, 2)
 
 
 PASSPORT_STR_DELIM = '.'
 DEFAULT_THIS_PROJECT_NAME = 'THIS'
 
+# Name of the object resource index in the runtime resource cache
+OBJ_RESOURCE_INDEX_NAME = 'obj_resource_index'
+
 
 class iqPassport(object):
     """
@@ -231,6 +236,22 @@ class iqPassport(object):
         # log_func.debug(u'Passport compare <%s> = <%s> : %s' % (passport, str(self), compare))
         return all(compare)
 
+    def getCacheKey(self, passport=None):
+        """
+        Get canonical hashable passport key.
+        The project name THIS is replaced by the current project name.
+        GUID is not included in the key.
+
+        :param passport: Passport as not known structure.
+            If None then get self passport.
+        :return: Passport key as tuple (project, module, type, name).
+        """
+        passport = self.setAsAny(passport)
+        prj = passport.prj
+        if not prj or prj == DEFAULT_THIS_PROJECT_NAME:
+            prj = global_func.getProjectName()
+        return prj, passport.module, passport.typename, passport.name
+
     def findResourceFilename(self, passport=None, find_path=None):
         """
         Find resource file by passport.
@@ -252,23 +273,26 @@ class iqPassport(object):
 
             find_path = prj_path
 
-        file_names = file_func.getFileNames(find_path)
-
         if not passport.module:
             log_func.warning(u'Not define passport module <%s>' % str(passport))
             return None
 
         res_filename = file_func.setFilenameExt(passport.module, res_func.RESOURCE_FILE_EXT)
-        if res_filename in file_names:
-            return os.path.join(find_path, res_filename)
-        else:
-            dir_paths = file_func.getDirectoryPaths(find_path)
-            for dir_path in dir_paths:
-                find_res_filename = self.findResourceFilename(passport, find_path=dir_path)
-                if find_res_filename:
-                    return find_res_filename
-        # log_func.warning(u'Resource file <%s> not found in %s' % (res_filename, file_names))
-        return None
+        module_name = os.path.splitext(res_filename)[0]
+        # Use project resource index instead of scanning folders
+        return res_index_func.findResourceFilename(module_name, find_path)
+
+    def getObjResourceIndex(self, res_filename, resource):
+        """
+        Get object resource index of shared runtime resource.
+        The index is kept in the runtime resource cache together with the resource.
+
+        :param res_filename: Resource filename.
+        :param resource: Shared runtime resource.
+        :return: Object resource index.
+        """
+        return res_func.getRuntimeResourceDerived(res_filename, resource,
+                                                  OBJ_RESOURCE_INDEX_NAME, spc_func.buildObjResourceIndex)
 
     def findObjResource(self, passport=None):
         """
@@ -282,15 +306,18 @@ class iqPassport(object):
 
         res_filename = self.findResourceFilename(passport=passport)
         if res_filename:
-            resource = res_func.loadRuntimeResource(res_filename)
-            obj_resource = spc_func.findObjResource(resource,
-                                                    object_type=passport.typename,
-                                                    object_name=passport.name,
-                                                    object_guid=passport.guid)
+            # Search in shared cached resource and copy only found object resource
+            resource = res_func.loadRuntimeResource(res_filename, shared=True)
+            obj_resource = spc_func.findObjResourceByIndex(self.getObjResourceIndex(res_filename, resource),
+                                                           resource,
+                                                           object_type=passport.typename,
+                                                           object_name=passport.name,
+                                                           object_guid=passport.guid) if resource else None
             if not obj_resource:
                 log_func.warning(u'Object <%s> not found in resource <%s>' % (str(passport),
                                                                             res_filename))
-            return obj_resource
+                return None
+            return copy.deepcopy(obj_resource)
         else:
             log_func.warning(u'Resource file <%s> not found' % str(passport))
         return None
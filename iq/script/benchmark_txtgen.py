@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Text template generation micro-benchmark.
+
+Compares render throughput of creating a new template on every call
+with the compiled template cache of txtgen_func.generate.
+
+Run:
+    python3 -m iq.script.benchmark_txtgen [count]
+"""
+
+import sys
+import timeit
+import jinja2
+
+from ..util import txtgen_func
+
+__version__ = (0, 0, 0, 1)
+
+DEFAULT_COUNT = 2000
+
+BENCHMARK_TEMPLATE = u'''SELECT cod, name, s_date
+FROM {{ table_name }}
+WHERE s_date BETWEEN '{{ start_date }}' AND '{{ stop_date }}'
+{% if cod %}AND cod LIKE '{{ cod }}%'{% endif %}
+ORDER BY {{ order_by|join(', ') }}'''
+
+BENCHMARK_CONTEXT = dict(table_name='nsi_product',
+                         start_date='2020-01-01',
+                         stop_date='2020-12-31',
+                         cod='001',
+                         order_by=('cod', 'name'))
+
+
+def generateWithoutCache(text_template, context):
+    """
+    Generate text by new template object as before template cache.
+    """
+    return jinja2.Template(text_template).render(**context)
+
+
+def runBenchmark(count=DEFAULT_COUNT):
+    """
+    Run benchmark.
+
+    :param count: Number of renders.
+    :return: Dictionary {'without_cache': renders per second, 'with_cache': renders per second}.
+    """
+    without_cache_time = timeit.timeit(lambda: generateWithoutCache(BENCHMARK_TEMPLATE, BENCHMARK_CONTEXT),
+                                       number=count)
+    txtgen_func.clearTemplateCache()
+    with_cache_time = timeit.timeit(lambda: txtgen_func.generate(BENCHMARK_TEMPLATE, BENCHMARK_CONTEXT),
+                                    number=count)
+    result = dict(without_cache=count / without_cache_time,
+                  with_cache=count / with_cache_time)
+    print(u'Renders: %d' % count)
+    print(u'New template per call:  %10.1f renders/s' % result['without_cache'])
+    print(u'Compiled template cache: %10.1f renders/s' % result['with_cache'])
+    print(u'Speedup: %.1fx' % (result['with_cache'] / result['without_cache']))
+    return result
+
+
+if __name__ == '__main__':
+    runBenchmark(*[int(arg) for arg in sys.argv[1:2]])
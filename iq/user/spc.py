@@ -17,7 +17,7 @@ from ..util import res_func
 from ..util import spc_func
 from .. import role
 
-__version__ = (0, 0, 0, 1)
+__version__ = (0, 0, 0, 2)
 
 COMPONENT_TYPE = 'iqUser'
 
@@ -38,7 +38,7 @@ def getProjectRoles(prj_name=None, *args, **kwargs):
 
     res_filename = os.path.join(file_func.getProjectPath(),
                                 prj_name + res_func.RESOURCE_FILE_EXT)
-    prj_resource = res_func.loadResource(res_filename)
+    prj_resource = res_func.loadRuntimeResource(res_filename, shared=True)
     if prj_resource:
         children = prj_resource.get(spc_func.CHILDREN_ATTR_NAME, list())
         child_names = [child.get('name', u'Unknown') for child in children if child.get('type', None) == role.COMPONENT_TYPE]
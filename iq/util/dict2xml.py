@@ -9,7 +9,7 @@ import sys
 import time
 from xml.sax import saxutils
 
-__version__ = (0, 0, 0, 1)
+__version__ = (0, 0, 0, 2)
 
 # Remove 'Cyr' from font names for Linux systems since on Linux all unicode fonts
 FONT_NAME_CYRILIC_DEL = not bool(sys.platform[:3].lower == 'win')
@@ -438,7 +438,8 @@ class iqDict2XmlssWriter(iqDICT2XMLWriter):
             self.setColumn(col)
 
         # Rows
-        rows = [element for element in data['_children_'] if element['name'] == 'Row']
+        # Generator: the rows of the compact table are built on demand
+        rows = (element for element in data['_children_'] if element['name'] == 'Row')
         prev_idx = 0
         for row in rows:
             # Remove unnecessary indexes
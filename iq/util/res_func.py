@@ -8,11 +8,13 @@ Resource file functions module.
 import os
 import os.path
 import pickle
+import marshal
+import collections
 
 from . import log_func
 from . import file_func
 
-__version__ = (0, 0, 1, 2)
+__version__ = (0, 0, 1, 5)
 
 # Resource file extension
 RESOURCE_FILE_EXT = '.res'
@@ -21,6 +23,19 @@ PICKLE_RESOURCE_FILE_EXT = '.pcl'
 PICKLE_RESOURCE_FILES_EXT = (PICKLE_RESOURCE_FILE_EXT, REPORT_FILE_EXT)
 RESOURCE_FILE_ENCODING = 'utf-8'
 
+# Runtime resource cache maximum size
+RESOURCE_CACHE_MAX_SIZE = 256
+
+# Runtime resource cache
+# Key - text resource filename
+# Value - {'mtime': (Text resource file mtime, Pickle resource file mtime),
+#          'resource': Shared resource struct data,
+#          'data': Serialized resource data for copies,
+#          'loads': Copy deserialization function,
+#          'derived': {Name: Data derived from the shared resource (indexes, ...)}}
+RESOURCE_CACHE = collections.OrderedDict()
+RESOURCE_CACHE_STAT = dict(hits=0, misses=0)
+
 
 def loadResource(res_filename):
     """
@@ -41,23 +56,132 @@ def loadResource(res_filename):
     return struct
 
 
-def loadRuntimeResource(res_filename):
+def _getFileMTime(filename):
+    """
+    Get file modification time.
+
+    :param filename: File path.
+    :return: File modification time or None if file not exists.
+    """
+    try:
+        return os.stat(filename).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _dumpResourceCopyData(resource):
+    """
+    Serialize resource for fast copies.
+    Resources of builtin types are serialized by marshal. It is the cheapest deep copy.
+    Other resources are pickled.
+
+    :param resource: Resource struct data.
+    :return: Tuple (deserialization function, serialized data).
+    """
+    try:
+        return marshal.loads, marshal.dumps(resource)
+    except ValueError:
+        return pickle.loads, pickle.dumps(resource)
+
+
+def loadRuntimeResource(res_filename, shared=False):
     """
     Load resource in runtime mode.
+    Loaded resources are kept in the process resource cache.
+    The cache entry is validated by the resource file modification time.
 
     :param res_filename: Resource file path.
+    :param shared: Return shared cached resource?
+        The shared resource must not be changed. Use it for read only access.
+        If False then a copy of the resource is returned
+        (objects created by resource fill and change it).
     :return: Resource struct data or None if error.
     """
     text_res_filename = file_func.setFilenameExt(res_filename, RESOURCE_FILE_EXT)
     pickle_res_filename = file_func.setFilenameExt(res_filename, PICKLE_RESOURCE_FILE_EXT)
+    cache_key = os.path.abspath(text_res_filename)
+
+    mtime = (_getFileMTime(text_res_filename), _getFileMTime(pickle_res_filename))
+    cache_item = RESOURCE_CACHE.get(cache_key, None)
+    if cache_item is not None and cache_item['mtime'] == mtime:
+        RESOURCE_CACHE_STAT['hits'] += 1
+        RESOURCE_CACHE.move_to_end(cache_key)
+    else:
+        RESOURCE_CACHE_STAT['misses'] += 1
+        if (mtime[0] is not None and mtime[1] is None) or \
+                (mtime[0] is not None and mtime[1] is not None and mtime[1] < mtime[0]):
+            resource = loadResourceText(text_res_filename)
+            saveResourcePickle(pickle_res_filename, resource)
+            mtime = (mtime[0], _getFileMTime(pickle_res_filename))
+        else:
+            resource = loadResourcePickle(pickle_res_filename)
+
+        if resource is None:
+            RESOURCE_CACHE.pop(cache_key, None)
+            return None
+
+        loads, data = _dumpResourceCopyData(resource)
+        cache_item = dict(mtime=mtime, resource=resource,
+                          data=data, loads=loads)
+        RESOURCE_CACHE[cache_key] = cache_item
+        while len(RESOURCE_CACHE) > RESOURCE_CACHE_MAX_SIZE:
+            RESOURCE_CACHE.popitem(last=False)
+
+    if shared:
+        return cache_item['resource']
+    return cache_item['loads'](cache_item['data'])
+
+
+def getRuntimeResourceDerived(res_filename, resource, name, build_function):
+    """
+    Get data derived from the shared runtime resource (index, etc.).
+    The derived data is kept in the runtime resource cache item
+    and is dropped together with the resource.
 
-    if (os.path.isfile(text_res_filename) and not os.path.exists(pickle_res_filename)) or \
-            (os.path.exists(text_res_filename) and os.path.exists(pickle_res_filename) and
-             os.path.getmtime(pickle_res_filename) < os.path.getmtime(text_res_filename)):
-        resource = loadResourceText(text_res_filename)
-        saveResourcePickle(pickle_res_filename, resource)
-        return resource
-    return loadResourcePickle(pickle_res_filename)
+    :param res_filename: Resource file path.
+    :param resource: Shared runtime resource.
+    :param name: Derived data name.
+    :param build_function: Derived data build function. The resource is passed as argument.
+    :return: Derived data.
+    """
+    text_res_filename = file_func.setFilenameExt(res_filename, RESOURCE_FILE_EXT)
+    cache_item = RESOURCE_CACHE.get(os.path.abspath(text_res_filename), None)
+    if cache_item is None or cache_item['resource'] is not resource:
+        # The resource is not in the cache. Do not keep the derived data
+        return build_function(resource)
+
+    derived = cache_item.setdefault('derived', dict())
+    if name not in derived:
+        derived[name] = build_function(resource)
+    return derived[name]
+
+
+def invalidateResourceCache(res_filename=None):
+    """
+    Remove resource from the runtime resource cache.
+    It must be called after saving the resource.
+
+    :param res_filename: Resource file path.
+        If None then clear all cache.
+    :return: True/False.
+    """
+    if res_filename is None:
+        RESOURCE_CACHE.clear()
+    else:
+        text_res_filename = file_func.setFilenameExt(res_filename, RESOURCE_FILE_EXT)
+        RESOURCE_CACHE.pop(os.path.abspath(text_res_filename), None)
+    return True
+
+
+def getResourceCacheStat():
+    """
+    Get runtime resource cache statistics.
+
+    :return: Dictionary {'hits': N, 'misses': N, 'size': N}.
+    """
+    stat = dict(RESOURCE_CACHE_STAT)
+    stat['size'] = len(RESOURCE_CACHE)
+    return stat
 
 
 def loadResourcePickle(res_filename):
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Project resource index functions module.
+
+The resource index maps the module name to the resource file path.
+The index is built once per process and is persisted next to the project folder.
+The index is invalidated by the modification time of the indexed directories.
+
+Index structure:
+    {
+        'root': Indexed folder path,
+        'dirs': {Directory path: Directory modification time, ...},
+        'modules': {Module name: Resource file path, ...},
+    }
+"""
+
+import os
+import os.path
+import pickle
+import tempfile
+
+from . import log_func
+from . import file_func
+from . import res_func
+
+__version__ = (0, 0, 0, 2)
+
+RESOURCE_INDEX_FILE_EXT = '.res_index'
+
+# Resource index cache
+# Key - indexed folder path
+RESOURCE_INDEX_CACHE = dict()
+
+
+def getResourceIndexFilename(root_path):
+    """
+    Get persistent resource index filename.
+    The index file is located next to the indexed folder.
+
+    :param root_path: Indexed folder path.
+    :return: Resource index filename.
+    """
+    root_path = os.path.normpath(root_path)
+    return os.path.join(os.path.dirname(root_path),
+                        '.' + os.path.basename(root_path) + RESOURCE_INDEX_FILE_EXT)
+
+
+def _scanResourceDir(path, index):
+    """
+    Scan folder resource files and append them to index.
+    The search order is the same as in iqPassport.findResourceFilename.
+
+    :param path: Folder path.
+    :param index: Resource index dictionary.
+    """
+    try:
+        index['dirs'][path] = os.path.getmtime(path)
+    except OSError:
+        log_func.warning(u'Error get folder <%s> modification time' % path)
+        return
+
+    for filename in file_func.getFileNames(path):
+        if file_func.isFilenameExt(filename, res_func.RESOURCE_FILE_EXT):
+            module_name = os.path.splitext(filename)[0]
+            if module_name not in index['modules']:
+                index['modules'][module_name] = os.path.join(path, filename)
+
+    try:
+        dir_paths = file_func.getDirectoryPaths(path)
+    except OSError:
+        log_func.fatal(u'Error get folders in <%s>' % path)
+        dir_paths = list()
+    for dir_path in dir_paths:
+        _scanResourceDir(dir_path, index)
+
+
+def buildResourceIndex(root_path):
+    """
+    Build resource index of folder.
+
+    :param root_path: Indexed folder path.
+    :return: Resource index dictionary.
+    """
+    root_path = os.path.normpath(root_path)
+    index = dict(root=root_path, dirs=dict(), modules=dict())
+    _scanResourceDir(root_path, index)
+    log_func.info(u'Resource index <%s> built. Modules: %d' % (root_path, len(index['modules'])))
+    return index
+
+
+def isValidResourceIndex(index):
+    """
+    Check if resource index is actual.
+    Adding, deleting or renaming a file changes the folder modification time.
+
+    :param index: Resource index dictionary.
+    :return: True/False.
+    """
+    if not index or not isinstance(index, dict) or 'dirs' not in index:
+        return False
+    try:
+        for dir_path, mtime in index['dirs'].items():
+            if os.path.getmtime(dir_path) != mtime:
+                return False
+    except OSError:
+        return False
+    return True
+
+
+def loadResourceIndex(root_path):
+    """
+    Load persistent resource index.
+
+    :param root_path: Indexed folder path.
+    :return: Resource index dictionary or None if error.
+    """
+    index_filename = getResourceIndexFilename(root_path)
+    if os.path.isfile(index_filename):
+        try:
+            with open(index_filename, 'rb') as index_file:
+                index = pickle.load(index_file)
+            if isinstance(index, dict) and index.get('root') == os.path.normpath(root_path):
+                return index
+        except:
+            log_func.fatal(u'Error load resource index file <%s>' % index_filename)
+    return None
+
+
+def saveResourceIndex(index):
+    """
+    Save persistent resource index.
+
+    :param index: Resource index dictionary.
+    :return: True/False.
+    """
+    index_filename = getResourceIndexFilename(index['root'])
+    tmp_filename = None
+    try:
+        # The index is written to a temporary file and replaced atomically.
+        # Other processes never read a half-written index
+        tmp_file, tmp_filename = tempfile.mkstemp(prefix=os.path.basename(index_filename) + '.',
+                                                  dir=os.path.dirname(index_filename))
+        with os.fdopen(tmp_file, 'wb') as index_file:
+            pickle.dump(index, index_file)
+        os.replace(tmp_filename, index_filename)
+        return True
+    except:
+        log_func.fatal(u'Error save resource index file <%s>' % index_filename)
+    if tmp_filename and os.path.exists(tmp_filename):
+        os.remove(tmp_filename)
+    return False
+
+
+def getResourceIndex(root_path, refresh=False):
+    """
+    Get resource index of folder.
+    The index is loaded or built once per process.
+
+    :param root_path: Indexed folder path.
+    :param refresh: Validate index and rebuild it if it is not actual?
+    :return: Resource index dictionary.
+    """
+    root_path = os.path.normpath(root_path)
+    index = RESOURCE_INDEX_CACHE.get(root_path, None)
+    if index is None:
+        index = loadResourceIndex(root_path)
+        refresh = True
+
+    if refresh and not isValidResourceIndex(index):
+        index = buildResourceIndex(root_path)
+        saveResourceIndex(index)
+
+    RESOURCE_INDEX_CACHE[root_path] = index
+    return index
+
+
+def findResourceFilename(module_name, root_path):
+    """
+    Find resource file by module name in index.
+
+    :param module_name: Module name.
+    :param root_path: Indexed folder path.
+    :return: Resource filename or None if not found.
+    """
+    index = getResourceIndex(root_path)
+    res_filename = index['modules'].get(module_name, None)
+    if res_filename is None or not os.path.isfile(res_filename):
+        # Maybe the resource was created or moved
+        index = getResourceIndex(root_path, refresh=True)
+        res_filename = index['modules'].get(module_name, None)
+    return res_filename
+
+
+def invalidateResourceIndex(root_path=None):
+    """
+    Invalidate resource index in process.
+
+    :param root_path: Indexed folder path.
+        If None then invalidate all indexes.
+    :return: True/False.
+    """
+    if root_path is None:
+        RESOURCE_INDEX_CACHE.clear()
+    else:
+        RESOURCE_INDEX_CACHE.pop(os.path.normpath(root_path), None)
+    return True
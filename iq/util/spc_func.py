@@ -11,7 +11,7 @@ from . import log_func
 
 from .. import components
 
-__version__ = (0, 0, 1, 1)
+__version__ = (0, 0, 1, 2)
 
 SYS_ATTR_SIGN = '__'
 CHILDREN_ATTR_NAME = '_children_'
@@ -210,3 +210,77 @@ def findObjResource(resource, object_type=None, object_name=None, object_guid=No
             if find_resource:
                 break
     return find_resource
+
+
+def _appendObjResourceIndex(resource, resource_index):
+    """
+    Append object resource and its children to index.
+
+    :param resource: Object resource.
+    :param resource_index: Object resource index dictionary.
+    """
+    resource_type = resource.get(TYPE_ATTR_NAME, None)
+    resource_name = resource.get(NAME_ATTR_NAME, None)
+    resource_guid = resource.get(GUID_ATTR_NAME, None)
+
+    resource_index['type'].setdefault(resource_type, list()).append(resource)
+    resource_index['name'].setdefault((resource_type, resource_name), list()).append(resource)
+    if resource_guid:
+        resource_index['guid'].setdefault(resource_guid, list()).append(resource)
+
+    for child_resource in resource.get(CHILDREN_ATTR_NAME, list()):
+        _appendObjResourceIndex(child_resource, resource_index)
+
+
+def buildObjResourceIndex(resource):
+    """
+    Build object resource index by type, (type, name) and guid.
+    The index lists keep the order of the resource tree traversal,
+    so the first item is the same as found by findObjResource.
+
+    :param resource: Parent object resource.
+    :return: Object resource index dictionary:
+        {
+            'type': {type: [object resource, ...], ...},
+            'name': {(type, name): [object resource, ...], ...},
+            'guid': {guid: [object resource, ...], ...},
+        }
+    """
+    resource_index = dict(type=dict(), name=dict(), guid=dict())
+    if isinstance(resource, dict):
+        _appendObjResourceIndex(resource, resource_index)
+    return resource_index
+
+
+def findObjResourceByIndex(resource_index, resource, object_type=None, object_name=None, object_guid=None):
+    """
+    Find object resource in parent resource by type, name and guid using index.
+
+    :param resource_index: Object resource index. See buildObjResourceIndex.
+        If None then findObjResource is used.
+    :param resource: Parent object resource.
+    :param object_type: Object type.
+        If None then not searched.
+    :param object_name: Object name.
+        If None then not searched.
+    :param object_guid:
+        If None then not searched.
+    :return: Object resource or None if not found.
+    """
+    if not object_type or not resource_index:
+        return findObjResource(resource, object_type, object_name, object_guid)
+
+    if object_guid:
+        find_resources = resource_index['guid'].get(object_guid, ())
+    elif object_name:
+        find_resources = resource_index['name'].get((object_type, object_name), ())
+    else:
+        find_resources = resource_index['type'].get(object_type, ())
+
+    for find_resource in find_resources:
+        if find_resource.get(TYPE_ATTR_NAME, None) != object_type:
+            continue
+        if object_name and find_resource.get(NAME_ATTR_NAME, None) != object_name:
+            continue
+        return find_resource
+    return None
@@ -8,19 +8,93 @@ Text generate function by context.
 import os
 import os.path
 import re
+import collections
 import jinja2
 
 from ..util import log_func
 from ..util import global_func
 from ..util import file_func
 
-__version__ = (0, 0, 1, 1)
+__version__ = (0, 0, 2, 1)
 
 REPLACE_NAME_START = u'{{'
 REPLACE_NAME_END = u'}}'
 
 VAR_PATTERN = r'(\{\{.*?\}\})'
 
+# Maximum number of compiled templates in template cache
+TEMPLATE_CACHE_MAX_SIZE = 256
+
+# Template bytecode cache folder name in profile folder
+BYTECODE_CACHE_DIRNAME = 'jinja2_cache'
+
+# Shared environment for text templates
+TEMPLATE_ENVIRONMENT = jinja2.Environment()
+
+# Compiled template cache. Key - template text
+TEMPLATE_CACHE = collections.OrderedDict()
+
+# Environments for file templates. Key - template folder
+FILE_TEMPLATE_ENVIRONMENTS = dict()
+
+
+def compileTemplate(text_template):
+    """
+    Compile text template.
+    Compiled templates are kept in the bounded template cache.
+
+    :param text_template: Template text.
+    :return: Compiled template object or None if error.
+    """
+    template = TEMPLATE_CACHE.get(text_template, None)
+    if template is not None:
+        TEMPLATE_CACHE.move_to_end(text_template)
+        return template
+
+    try:
+        template = TEMPLATE_ENVIRONMENT.from_string(text_template)
+    except:
+        log_func.fatal(u'Error compile template <%s>' % text_template)
+        return None
+
+    TEMPLATE_CACHE[text_template] = template
+    while len(TEMPLATE_CACHE) > TEMPLATE_CACHE_MAX_SIZE:
+        TEMPLATE_CACHE.popitem(last=False)
+    return template
+
+
+def clearTemplateCache():
+    """
+    Clear compiled template cache.
+
+    :return: True/False.
+    """
+    TEMPLATE_CACHE.clear()
+    return True
+
+
+def getFileTemplateEnvironment(template_dirname):
+    """
+    Get environment for file templates.
+    Compiled file templates are persisted in the bytecode cache in profile folder.
+
+    :param template_dirname: Template folder.
+    :return: Environment object.
+    """
+    environment = FILE_TEMPLATE_ENVIRONMENTS.get(template_dirname, None)
+    if environment is None:
+        bytecode_cache = None
+        profile_path = file_func.getProfilePath()
+        if profile_path:
+            cache_dirname = os.path.join(profile_path, BYTECODE_CACHE_DIRNAME)
+            if os.path.exists(cache_dirname) or file_func.createDir(cache_dirname):
+                bytecode_cache = jinja2.FileSystemBytecodeCache(directory=cache_dirname)
+        environment = jinja2.Environment(loader=jinja2.FileSystemLoader(template_dirname),
+                                         bytecode_cache=bytecode_cache,
+                                         cache_size=TEMPLATE_CACHE_MAX_SIZE)
+        FILE_TEMPLATE_ENVIRONMENTS[template_dirname] = environment
+    return environment
+
 
 def generate(text_template, context=None):
     """
@@ -34,7 +108,7 @@ def generate(text_template, context=None):
         context = dict()
 
     try:
-        template = jinja2.Template(text_template)
+        template = compileTemplate(text_template)
         result_txt = template.render(**context)
         return result_txt
     except:
@@ -42,6 +116,24 @@ def generate(text_template, context=None):
     return None
 
 
+def generateByTemplate(template, context=None):
+    """
+    Generate text by compiled template and context.
+
+    :param template: Compiled template object. See compileTemplate.
+    :param context. Context dictionary.
+    :return: Generated text or None if error.
+    """
+    if context is None:
+        context = dict()
+
+    try:
+        return template.render(**context)
+    except:
+        log_func.fatal(u'Error generate text by template <%s>' % str(template))
+    return None
+
+
 def isGenered(txt):
     """
     Checking if the text is generated.
@@ -87,7 +179,6 @@ def generateTextFile(template_filename, output_filename, context=None, encoding=
     :param encoding: Result file code page.
     :return: True/False.
     """
-    template_file = None
     output_file = None
 
     template_filename = os.path.abspath(template_filename)
@@ -95,20 +186,18 @@ def generateTextFile(template_filename, output_filename, context=None, encoding=
         log_func.warning(u'Template file <%s> not found' % template_filename)
         return False
 
-    # Read template
+    if context is None:
+        context = dict()
+
+    # Load compiled template and generate text
     try:
-        template_file = open(template_filename, 'rt')
-        template_txt = template_file.read()
-        template_file.close()
+        environment = getFileTemplateEnvironment(os.path.dirname(template_filename))
+        template = environment.get_template(os.path.basename(template_filename))
+        gen_txt = template.render(**context)
     except:
-        if template_file:
-            template_file.close()
-        log_func.fatal(u'Error read template file <%s>' % template_filename)
+        log_func.fatal(u'Error generate text by template file <%s>' % template_filename)
         return False
 
-    # Generate text
-    gen_txt = generate(template_txt, context)
-
     # Write output file
     output_filename = os.path.abspath(output_filename)
     try:
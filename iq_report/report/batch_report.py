@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Batch report generation module.
+
+Headless generation of a list of report jobs in a process pool.
+Every worker process keeps its own parsed report template cache and
+database connection pool between jobs.
+
+Report job:
+    {
+        'report': Report template filename (*.rep, *.ods, *.xml),
+        'variables': Report variables dictionary,
+        'name': Result report filename without extension (optional),
+        'db_url': Connection string as url (optional),
+        'sql': SQL query text (optional),
+        'stylelib': Style library filename (optional),
+    }
+or tuple (report template filename, report variables dictionary).
+
+Command line options:
+
+    python3 -m iq_report.report.batch_report <Launch parameters>
+
+Launch parameters:
+
+    --help|-h|-?        Print help
+    --debug|-d          Debug mode
+    --jobs=             Report jobs JSON filename. List of report jobs
+    --out=              Result report folder
+    --format=           Result report format: ods/xml. ods by default
+    --workers=          Number of worker processes. CPU count by default
+    --path=             Report folder
+"""
+
+import sys
+import os
+import os.path
+import time
+import json
+import getopt
+import traceback
+import concurrent.futures
+
+from iq.util import log_func
+from iq.util import file_func
+from iq.util import global_func
+from iq import global_data
+
+from . import report_gen_system
+from . import report_generator
+from . import report_template
+from . import report_file
+from . import report_glob_data
+from . import style_library
+from . import template_cache_func
+
+__version__ = (0, 0, 0, 2)
+
+ODS_REPORT_FORMAT = 'ods'
+XML_REPORT_FORMAT = 'xml'
+REPORT_FORMATS = (ODS_REPORT_FORMAT, XML_REPORT_FORMAT)
+DEFAULT_REPORT_FORMAT = ODS_REPORT_FORMAT
+
+XML_FILENAME_EXT = '.xml'
+
+# Report template classes by template source file extension
+REPORT_TEMPLATE_TYPES = {'.ods': report_template.iqODSReportTemplate,
+                         '.xml': report_template.iqlXMLSpreadSheetReportTemplate,
+                         }
+
+# Job result statuses
+JOB_STATUS_OK = 'ok'
+JOB_STATUS_ERROR = 'error'
+
+
+class iqBatchReportGeneratorSystem(report_gen_system.iqReportGeneratorSystem):
+    """
+    Headless report generator system class.
+    Does not use any dialogs.
+    """
+    def __init__(self, report=None, parent=None):
+        """
+        Constructor.
+
+        :param report: Report template data.
+        :param parent: Not used.
+        """
+        report_gen_system.iqReportGeneratorSystem.__init__(self, report, None)
+
+    def loadReportTemplate(self, report_filename, report_dir=None):
+        """
+        Load report template.
+        The parsed template is taken from the template cache.
+
+        :param report_filename: Report template filename (*.rep, *.ods, *.xml).
+        :param report_dir: Report folder for relative filenames.
+        :return: Report template data or None if error.
+        """
+        if report_dir and not os.path.isabs(report_filename):
+            report_filename = os.path.join(report_dir, report_filename)
+        report_filename = os.path.abspath(report_filename)
+
+        ext = os.path.splitext(report_filename)[1].lower()
+        if ext in REPORT_TEMPLATE_TYPES:
+            template = REPORT_TEMPLATE_TYPES[ext]()
+            self._report_template = template.read(report_filename)
+        else:
+            self._report_template = template_cache_func.loadReportResource(report_filename)
+        self.setReportTemplateFileName(report_filename)
+        return self._report_template
+
+    def generateReportFile(self, rep_filename, report=None, db_url=None, sql=None, stylelib=None,
+                           variables=None, rep_format=DEFAULT_REPORT_FORMAT):
+        """
+        Generate report and save it in file.
+
+        :param rep_filename: Result report filename.
+        :param report: Report template data.
+        :param db_url: Connection string as url.
+        :param sql: SQL query.
+        :param stylelib: Style library.
+        :param variables: Report variables dictionary.
+        :param rep_format: Result report format: ods/xml.
+        :return: Dictionary {'filename': result report filename, 'rows': number of query table records}
+            or None if error.
+        """
+        if report is not None:
+            self._report_template = report
+        if stylelib:
+            self._report_template['style_lib'] = stylelib
+
+        # 1. Get query table
+        kwargs = dict(variables=variables)
+        if variables:
+            kwargs.update(variables)
+        query_tbl = self.getQueryTable(self._report_template, db_url=db_url, sql=sql, **kwargs)
+        if self._isEmptyQueryTable(query_tbl):
+            log_func.warning(u'No report data. Continue generation')
+            query_tbl = self.createEmptyQueryTable()
+
+        # 2. Generate. Report rows are written to the XML file during generation
+        xml_filename = os.path.splitext(rep_filename)[0] + XML_FILENAME_EXT
+        rep_stream = report_file.iqXMLSpreadSheetReportStream(rep_filename=xml_filename)
+        try:
+            rep = report_generator.iqReportGenerator()
+            data_rep = rep.generate(self._report_template, query_tbl,
+                                    name_space=variables, row_sink=rep_stream)
+        finally:
+            rep_stream.close()
+        if data_rep is None:
+            return None
+
+        # 3. Convert
+        if rep_format == ODS_REPORT_FORMAT:
+            from iq.components.virtual_spreadsheet import v_spreadsheet
+
+            spreadsheet = v_spreadsheet.iqVSpreadsheet(encoding=report_glob_data.DEFAULT_REPORT_ENCODING)
+            # Rows are loaded into the compact tables and streamed to the ODS file
+            spreadsheet.loadXML(xml_filename, compact=True)
+            spreadsheet.saveAsODS(rep_filename, stream_writer=True)
+            file_func.removeFile(xml_filename)
+        return dict(filename=rep_filename, rows=len(query_tbl.get('__data__', None) or ()))
+
+
+def createReportJob(job):
+    """
+    Create report job dictionary.
+
+    :param job: Report job dictionary or tuple (report template filename, report variables dictionary).
+    :return: Report job dictionary.
+    """
+    if isinstance(job, dict):
+        return dict(job)
+    job = tuple(job)
+    return dict(report=job[0], variables=job[1] if len(job) > 1 else None)
+
+
+def getJobReportFilename(job, i_job, out_dir, rep_format=DEFAULT_REPORT_FORMAT):
+    """
+    Get result report filename of job.
+
+    :param job: Report job dictionary.
+    :param i_job: Job index.
+    :param out_dir: Result report folder.
+    :param rep_format: Result report format: ods/xml.
+    :return: Result report filename.
+    """
+    name = job.get('name', None)
+    if not name:
+        name = '%s_%d' % (os.path.splitext(os.path.basename(job['report']))[0], i_job + 1)
+    return os.path.join(out_dir, '%s.%s' % (name, rep_format))
+
+
+def initWorker(report_dir=None):
+    """
+    Report worker process initialization.
+
+    :param report_dir: Report folder. Report modules are imported from this folder.
+    """
+    global_func.setEngineType(global_data.CUI_ENGINE_TYPE)
+    if report_dir and os.path.isdir(report_dir) and report_dir not in sys.path:
+        sys.path.append(report_dir)
+    # Inherited connection pools must not be used in the worker
+    report_gen_system.DB_ENGINE_CACHE.clear()
+
+
+def runReportJob(job, i_job, out_dir, rep_format=DEFAULT_REPORT_FORMAT, report_dir=None):
+    """
+    Run report job.
+
+    :param job: Report job dictionary.
+    :param i_job: Job index.
+    :param out_dir: Result report folder.
+    :param rep_format: Result report format: ods/xml.
+    :param report_dir: Report folder for relative report template filenames.
+    :return: Job result dictionary:
+        {
+            'index': Job index,
+            'report': Report template filename,
+            'name': Job name,
+            'filename': Result report filename or None if error,
+            'status': 'ok' or 'error',
+            'error': Error message,
+            'rows': Number of query table records,
+            'time': Job time in seconds,
+            'pid': Worker process id,
+        }
+    """
+    time_start = time.time()
+    result = dict(index=i_job, report=job.get('report', None), name=job.get('name', None),
+                  filename=None, status=JOB_STATUS_ERROR, error=None, rows=0, pid=os.getpid())
+    try:
+        rep_system = iqBatchReportGeneratorSystem()
+        template = rep_system.loadReportTemplate(job['report'], report_dir=report_dir)
+        if template is None:
+            result['error'] = u'Report template <%s> not loaded' % job['report']
+        else:
+            stylelib = None
+            if job.get('stylelib', None):
+                stylelib = style_library.iqXMLReportStyleLibrary().convert(os.path.abspath(job['stylelib']))
+            rep_filename = getJobReportFilename(job, i_job, out_dir, rep_format)
+            rep_result = rep_system.generateReportFile(rep_filename, db_url=job.get('db_url', None),
+                                                       sql=job.get('sql', None), stylelib=stylelib,
+                                                       variables=job.get('variables', None),
+                                                       rep_format=rep_format)
+            if rep_result is None:
+                result['error'] = u'Report <%s> generation error' % job['report']
+            else:
+                result.update(rep_result)
+                result['status'] = JOB_STATUS_OK
+    except:
+        result['error'] = traceback.format_exc()
+    result['time'] = time.time() - time_start
+    return result
+
+
+def runBatch(jobs, out_dir, rep_format=DEFAULT_REPORT_FORMAT, max_workers=None, report_dir=None):
+    """
+    Generate reports of jobs in process pool.
+
+    :param jobs: Report job list.
+    :param out_dir: Result report folder.
+    :param rep_format: Result report format: ods/xml.
+    :param max_workers: Number of worker processes. If None then CPU count.
+    :param report_dir: Report folder.
+    :return: Job result list in job order (see runReportJob).
+    """
+    if rep_format not in REPORT_FORMATS:
+        log_func.warning(u'Unsupported report format <%s>' % rep_format)
+        return list()
+
+    out_dir = os.path.abspath(out_dir)
+    if not os.path.exists(out_dir):
+        file_func.createDir(out_dir)
+    if report_dir:
+        report_dir = os.path.abspath(report_dir)
+
+    jobs = [createReportJob(job) for job in jobs]
+    results = [None] * len(jobs)
+    time_start = time.time()
+    log_func.info(u'Batch report generation start. Jobs: %d' % len(jobs))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=initWorker,
+                                                initargs=(report_dir,)) as executor:
+        futures = {executor.submit(runReportJob, job, i_job, out_dir, rep_format, report_dir): i_job
+                   for i_job, job in enumerate(jobs)}
+        for future in concurrent.futures.as_completed(futures):
+            i_job = futures[future]
+            try:
+                result = future.result()
+            except:
+                # The worker process is broken
+                result = dict(index=i_job, report=jobs[i_job].get('report', None),
+                              name=jobs[i_job].get('name', None), filename=None,
+                              status=JOB_STATUS_ERROR, error=traceback.format_exc(),
+                              rows=0, time=0.0, pid=None)
+            results[i_job] = result
+            if result['status'] == JOB_STATUS_OK:
+                log_func.info(u'Job %d <%s>. Report <%s>. Rows: %d. Time: %.2f sec' % (i_job + 1, result['report'],
+                                                                                      result['filename'],
+                                                                                      result['rows'],
+                                                                                      result['time']))
+            else:
+                log_func.warning(u'Job %d <%s>. Error:\n%s' % (i_job + 1, result['report'], result['error']))
+
+    error_count = len([result for result in results if result['status'] != JOB_STATUS_OK])
+    log_func.info(u'Batch report generation end. Jobs: %d. Errors: %d. Time: %.2f sec' % (len(jobs), error_count,
+                                                                                        time.time() - time_start))
+    return results
+
+
+def loadJobs(jobs_filename):
+    """
+    Load report job list from JSON file.
+
+    :param jobs_filename: Report jobs JSON filename.
+    :return: Report job list or None if error.
+    """
+    try:
+        with open(jobs_filename, 'rt', encoding=report_glob_data.DEFAULT_REPORT_ENCODING) as jobs_file:
+            return json.load(jobs_file)
+    except:
+        log_func.fatal(u'Error load report jobs file <%s>' % jobs_filename)
+    return None
+
+
+def main(argv):
+    """
+    Main function.
+
+    :param argv: A list of command line options.
+    :return: Process exit code.
+    """
+    try:
+        options, args = getopt.getopt(argv, 'h?d',
+                                      ['help', 'debug',
+                                       'jobs=', 'out=', 'format=', 'workers=', 'path='])
+    except getopt.error as err:
+        log_func.warning(err.msg, is_force_print=True)
+        log_func.info(__doc__, is_force_print=True)
+        return 2
+
+    jobs_filename = None
+    out_dir = os.getcwd()
+    rep_format = DEFAULT_REPORT_FORMAT
+    max_workers = None
+    path = None
+
+    for option, arg in options:
+        if option in ('-h', '--help', '-?'):
+            log_func.info(__doc__, is_force_print=True)
+            return 0
+        elif option in ('-d', '--debug'):
+            global_func.setDebugMode()
+        elif option in ('--jobs',):
+            jobs_filename = arg
+        elif option in ('--out',):
+            out_dir = arg
+        elif option in ('--format',):
+            rep_format = arg.lower()
+        elif option in ('--workers',):
+            max_workers = int(arg)
+        elif option in ('--path',):
+            path = arg
+
+    if not jobs_filename:
+        log_func.warning(u'Report jobs file not defined', is_force_print=True)
+        return 2
+    jobs = loadJobs(jobs_filename)
+    if jobs is None:
+        return 1
+
+    results = runBatch(jobs, out_dir, rep_format=rep_format, max_workers=max_workers, report_dir=path)
+    return 0 if results and all([result['status'] == JOB_STATUS_OK for result in results]) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
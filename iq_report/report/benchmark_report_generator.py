@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Report generator benchmark.
+
+Generates a report with header, detail with record access and
+summary footer for different query table sizes.
+Time per row must not grow with the number of rows.
+
+Run:
+    python3 -m iq_report.report.benchmark_report_generator [row_count ...]
+"""
+
+import sys
+import time
+import copy
+
+from . import report_generator
+
+__version__ = (0, 0, 0, 1)
+
+DEFAULT_ROW_COUNTS = (1000, 10000, 100000)
+
+BENCHMARK_FIELDS = ('cod', 'name', 'price', 'count')
+
+
+def createBenchmarkCell(value):
+    """
+    Create report template cell.
+
+    :param value: Cell value.
+    :return: Cell dictionary.
+    """
+    cell = copy.deepcopy(report_generator.REP_CELL)
+    cell['value'] = value
+    return cell
+
+
+def createBenchmarkTemplate():
+    """
+    Create benchmark report template.
+
+    :return: Report template dictionary.
+    """
+    template = copy.deepcopy(report_generator.REPORT_TEMPLATE)
+    template['name'] = 'benchmark'
+    template['sheet'] = [
+        # Header
+        [createBenchmarkCell(u'Code'), createBenchmarkCell(u'Name'),
+         createBenchmarkCell(u'Price'), createBenchmarkCell(u'Count')],
+        # Detail
+        [createBenchmarkCell(u'[^N^]. [\'cod\']'), createBenchmarkCell(u'[\'name\']'),
+         createBenchmarkCell(u'[#record[\'price\']#]'), createBenchmarkCell(u'[#len(records)#]')],
+        # Footer
+        [createBenchmarkCell(u'Total'), None,
+         createBenchmarkCell(u'[^SUM({price})^]'), createBenchmarkCell(u'[^SUM({count})^]')],
+    ]
+    template['header'] = dict(row=0, col=0, row_size=1, col_size=4)
+    template['detail'] = dict(row=1, col=0, row_size=1, col_size=4)
+    template['footer'] = dict(row=2, col=0, row_size=1, col_size=4)
+    return template
+
+
+def createBenchmarkQueryTable(row_count):
+    """
+    Create benchmark query table.
+
+    :param row_count: Number of rows.
+    :return: Query table dictionary.
+    """
+    data = [(u'%06d' % i, u'Product %d' % i, float(i % 100), i % 7) for i in range(row_count)]
+    return {'__name__': 'benchmark', '__fields__': BENCHMARK_FIELDS, '__data__': data}
+
+
+def runBenchmark(*row_counts):
+    """
+    Run benchmark.
+
+    :param row_counts: Query table sizes.
+    :return: Dictionary {row count: generate time in seconds}.
+    """
+    if not row_counts:
+        row_counts = DEFAULT_ROW_COUNTS
+
+    result = dict()
+    for row_count in row_counts:
+        query_table = createBenchmarkQueryTable(row_count)
+        template = createBenchmarkTemplate()
+        generator = report_generator.iqReportGenerator()
+
+        time_start = time.time()
+        report = generator.generate(template, query_table)
+        result[row_count] = time.time() - time_start
+
+        assert report is not None, u'Report generation error'
+        print(u'Rows: %8d  Time: %8.2f sec  Time per row: %8.1f us' % (row_count, result[row_count],
+                                                                       result[row_count] / row_count * 1000000))
+    return result
+
+
+if __name__ == '__main__':
+    runBenchmark(*[int(arg) for arg in sys.argv[1:]])
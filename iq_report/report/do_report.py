@@ -9,17 +9,17 @@ import os
 import os.path
 
 from iq.util import log_func
-from iq.util import res_func
 from iq.util import str_func
 from iq.util import file_func
 from iq.util import global_func
 
 from . import report_gen_func
 from . import style_library
+from . import template_cache_func
 
 from .dlg import report_folder_func
 
-__version__ = (0, 0, 1, 1)
+__version__ = (0, 0, 1, 2)
 
 DEFAULT_REPORT_FILE_EXT = report_folder_func.REPORT_FILENAME_EXT
 XML_REPORT_FILE_EXT = '.xml'
@@ -82,6 +82,11 @@ def isNewReportTemplateFile(src_filename, rprt_filename):
 
     :return: True-changes to the original template/False-no changes.
     """
+    # The parsed template cache knows if the source content is changed
+    is_valid_cache = template_cache_func.isValidTemplateCache(src_filename)
+    if is_valid_cache is not None and os.path.exists(rprt_filename):
+        return not is_valid_cache
+
     src_modify_dt = file_func.getFileModifyDatetime(src_filename)
     rprt_modify_dt = file_func.getFileModifyDatetime(rprt_filename)
     if src_modify_dt and rprt_modify_dt:
@@ -228,7 +233,7 @@ def printReport(parent_form=None, report_filename='', report_dir='',
         else:
             stylelib = loadStyleLib(stylelib_filename)
             repgen_system = report_gen_func.getReportGeneratorSystem(report_filename, parent_form)
-            return repgen_system.Print(res_func.loadResource(report_filename),
+            return repgen_system.Print(template_cache_func.loadReportResource(report_filename),
                                        stylelib=stylelib,
                                        variables=variables)
     except:
@@ -261,7 +266,7 @@ def previewReport(parent_form=None, report_filename='', report_dir='',
         else:
             stylelib = loadStyleLib(stylelib_filename)
             repgen_system = report_gen_func.getReportGeneratorSystem(report_filename, parent_form)
-            return repgen_system.preview(res_func.loadResource(report_filename),
+            return repgen_system.preview(template_cache_func.loadReportResource(report_filename),
                                          stylelib=stylelib,
                                          variables=variables)
     except:
@@ -294,7 +299,7 @@ def exportReport(parent_form=None, report_filename='', report_dir='',
         else:
             stylelib = loadStyleLib(stylelib_filename)
             repgen_system = report_gen_func.getReportGeneratorSystem(report_filename, parent_form)
-            return repgen_system.convert(res_func.loadResource(report_filename),
+            return repgen_system.convert(template_cache_func.loadReportResource(report_filename),
                                          stylelib=stylelib,
                                          variables=variables)
     except:
@@ -328,7 +333,7 @@ def selectReport(parent_form=None, report_filename='', report_dir='',
             stylelib = loadStyleLib(stylelib_filename)
             repgen_system = report_gen_func.getReportGeneratorSystem(report_filename, parent_form)
             log_func.info(u'Use report generate system <%s>' % repgen_system.__class__.__name__)
-            return repgen_system.selectAction(res_func.loadResource(report_filename),
+            return repgen_system.selectAction(template_cache_func.loadReportResource(report_filename),
                                               stylelib=stylelib,
                                               variables=variables)
     except:
@@ -367,7 +372,7 @@ def doReport(parent_form=None, report_filename='', report_dir='', db_url='', sql
             repgen_system = report_gen_func.getReportGeneratorSystem(report_filename, parent_form)
             stylelib = loadStyleLib(stylelib_filename)
 
-            data = repgen_system.generate(res_func.loadResource(report_filename), db_url, sql,
+            data = repgen_system.generate(template_cache_func.loadReportResource(report_filename), db_url, sql,
                                           stylelib=stylelib, vars=variables)
 
             if command:
@@ -25,7 +25,7 @@ from . import report_generator
 from . import report_file
 from . import report_glob_data
 
-__version__ = (0, 0, 2, 2)
+__version__ = (0, 0, 2, 4)
 
 ODS_FILENAME_EXT = '.ods'
 PDF_FILENAME_EXT = '.pdf'
@@ -81,8 +81,15 @@ class iqODSReportGeneratorSystem(report_gen_system.iqReportGeneratorSystem):
         """
         if report is None:
             report = self._report_template
-        data_rep = self.generateReport(report, *args, **kwargs)
-        return self.save(data_rep)
+        # Report rows are written to the XML file during generation
+        rep_stream = report_file.iqXMLSpreadSheetReportStream(rep_dirname=self.getSaveDir())
+        try:
+            data_rep = self.generateReport(report, row_sink=rep_stream, *args, **kwargs)
+        finally:
+            rep_stream.close()
+        if data_rep:
+            return self.convertXMLReport(rep_stream.getFilename())
+        return None
 
     def selectAction(self, report=None, *args, **kwargs):
         """
@@ -293,6 +300,8 @@ class iqODSReportGeneratorSystem(report_gen_system.iqReportGeneratorSystem):
             if report is not None:
                 self._report_template = report
 
+            row_sink = kwargs.pop('row_sink', None)
+
             # 1. Get query table
             variables = kwargs.get('variables', None)
             if variables:
@@ -312,7 +321,7 @@ class iqODSReportGeneratorSystem(report_gen_system.iqReportGeneratorSystem):
             rep = report_generator.iqReportGenerator()
             coord_fill = kwargs.get('coord_fill', None)
             data_rep = rep.generate(self._report_template, query_tbl,
-                                    name_space=variables, coord_fill=coord_fill)
+                                    name_space=variables, coord_fill=coord_fill, row_sink=row_sink)
 
             return data_rep
         except:
@@ -362,6 +371,15 @@ class iqODSReportGeneratorSystem(report_gen_system.iqReportGeneratorSystem):
             log_func.fatal(u'Error generate report <%s>.' % str_func.toUnicode(self._report_template['name']))
         return None
 
+    def getSaveDir(self):
+        """
+        Get generated report files folder path.
+        """
+        save_dir = self.getProfileDir()
+        if not save_dir:
+            save_dir = report_gen_system.DEFAULT_REPORT_DIR
+        return save_dir
+
     def save(self, report_data=None, to_virtual_spreadsheet=True):
         """
         Save generated report to file.
@@ -377,29 +395,42 @@ class iqODSReportGeneratorSystem(report_gen_system.iqReportGeneratorSystem):
         """
         if report_data:
             rep_file = report_file.iqXMLSpreadSheetReportFile()
-            save_dir = self.getProfileDir()
-            if not save_dir:
-                save_dir = report_gen_system.DEFAULT_REPORT_DIR
-            xml_rep_file_name = os.path.join(save_dir, '%s_report_result.xml' % report_data['name'])
-            rep_file_name = os.path.join(save_dir, '%s_report_result.ods' % report_data['name'])
-
+            xml_rep_file_name = os.path.join(self.getSaveDir(),
+                                             report_file.REPORT_RESULT_XML_FILENAME_FMT % report_data['name'])
             rep_file.write(xml_rep_file_name, report_data)
+            return self.convertXMLReport(xml_rep_file_name, to_virtual_spreadsheet)
+        return None
 
-            if to_virtual_spreadsheet:
-                log_func.info(u'Convert report <%s> to file <%s>' % (str_func.toUnicode(xml_rep_file_name),
-                                                                     str_func.toUnicode(rep_file_name)))
-                spreadsheet = v_spreadsheet.iqVSpreadsheet(encoding=report_glob_data.DEFAULT_REPORT_ENCODING)
-                spreadsheet.load(xml_rep_file_name)
-                spreadsheet.saveAs(rep_file_name)
-            else:
-                cmd = 'unoconv --format=ods %s' % xml_rep_file_name
-                log_func.info(u'UNOCONV. Convert report <%s> to file <%s>' % (str_func.toUnicode(xml_rep_file_name),
-                                                                              str_func.toUnicode(rep_file_name)))
-                log_func.info(u'Execute command <%s>' % cmd)
-                os.system(cmd)
+    def convertXMLReport(self, xml_rep_file_name, to_virtual_spreadsheet=True):
+        """
+        Convert generated report XML file to ODS file.
 
-            return rep_file_name
-        return None
+        :param xml_rep_file_name: Generated report XML filename.
+        :param to_virtual_spreadsheet: Convert by Virtual SpreadSheet?
+            True - yes,
+            False - Convert by UNOCONV convertation.
+        :return: Destination report filename or None if error.
+        """
+        if not xml_rep_file_name or not os.path.exists(xml_rep_file_name):
+            log_func.warning(u'Report file <%s> not exists' % xml_rep_file_name)
+            return None
+
+        rep_file_name = os.path.splitext(xml_rep_file_name)[0] + ODS_FILENAME_EXT
+        if to_virtual_spreadsheet:
+            log_func.info(u'Convert report <%s> to file <%s>' % (str_func.toUnicode(xml_rep_file_name),
+                                                                 str_func.toUnicode(rep_file_name)))
+            spreadsheet = v_spreadsheet.iqVSpreadsheet(encoding=report_glob_data.DEFAULT_REPORT_ENCODING)
+            # Rows are loaded into the compact tables and streamed to the ODS file
+            spreadsheet.loadXML(xml_rep_file_name, compact=True)
+            spreadsheet.saveAsODS(rep_file_name, stream_writer=True)
+        else:
+            cmd = 'unoconv --format=ods %s' % xml_rep_file_name
+            log_func.info(u'UNOCONV. Convert report <%s> to file <%s>' % (str_func.toUnicode(xml_rep_file_name),
+                                                                          str_func.toUnicode(rep_file_name)))
+            log_func.info(u'Execute command <%s>' % cmd)
+            os.system(cmd)
+
+        return rep_file_name
 
     def previewResult(self, report_data=None):
         """
@@ -10,6 +10,8 @@ http://msdn.microsoft.com/library/default.asp?url=/library/en-us/dnexcl2k2/html/
 
 import time
 import copy
+import shutil
+import tempfile
 from xml.sax import saxutils
 import os.path
 
@@ -20,7 +22,7 @@ from iq.util import file_func
 from . import report_generator
 from . import report_glob_data
 
-__version__ = (0, 0, 3, 2)
+__version__ = (0, 0, 3, 4)
 
 SPC_XML_STYLE = {'style_id': '',  # Style ID
                  'align': {'align_txt': (0, 0), 'wrap_txt': False},  # Alignment
@@ -30,6 +32,12 @@ SPC_XML_STYLE = {'style_id': '',  # Style ID
                  'color': {},  # Colour
                  }
 
+# Generated report XML filename format. Report name is used
+REPORT_RESULT_XML_FILENAME_FMT = '%s_report_result.xml'
+
+# Indentation of row elements in the streamed worksheet table
+STREAM_ROW_BREAK_LINE = '   '
+
 
 class iqReportFile(object):
     """
@@ -90,7 +98,11 @@ class iqXMLSpreadSheetReportFile(iqReportFile):
             # xml_gen.savePageSetup(rep_name,report)
         
             # Styles
-            xml_gen.scanStyles(rec_data['sheet'])
+            if rec_data.get('styles', None) is not None:
+                # Cell styles are already interned by the report generator
+                xml_gen.setStyles(rec_data['styles'])
+            else:
+                xml_gen.scanStyles(rec_data['sheet'])
             xml_gen.saveStyles()
         
             # Data
@@ -166,6 +178,215 @@ class iqXMLSpreadSheetReportFile(iqReportFile):
         return None
 
 
+class iqXMLSSRowWindow(object):
+    """
+    Worksheet access window containing only the currently written row.
+    Used for merge processing of the streamed report.
+    Access to other rows raises IndexError as access outside of the worksheet.
+    """
+    def __init__(self):
+        """
+        Constructor.
+        """
+        # Current row index
+        self.row_idx = -1
+        # Current row
+        self.row = None
+
+    def setRow(self, row_idx, row):
+        """
+        Set current row.
+
+        :param row_idx: Row index in worksheet.
+        :param row: Row data.
+        """
+        self.row_idx = row_idx
+        self.row = row
+
+    def __getitem__(self, row_idx):
+        if row_idx != self.row_idx:
+            raise IndexError(u'Row %d is not available in the stream window' % row_idx)
+        return self.row
+
+
+class iqXMLSpreadSheetReportStream(report_generator.iqReportRowSink):
+    """
+    Streaming XML report file writer in Excel XMLSS format.
+    The report generator emits finished rows to the stream and
+    the rows are written to a temporary file immediately.
+    Styles, columns and the worksheet table are composed in the report file at the end,
+    so memory does not depend on the report size.
+    """
+    def __init__(self, rep_filename=None, rep_dirname=None):
+        """
+        Constructor.
+
+        :param rep_filename: Report filename.
+            If None, then the filename is defined by the report name in rep_dirname folder.
+        :param rep_dirname: Report folder.
+        """
+        self._rep_filename = rep_filename
+        self._rep_dirname = rep_dirname
+
+        # Temporary file of worksheet rows
+        self._rows_file = None
+        # Row and style generator
+        self._xml_gen = None
+        # Cell styles interned by the report generator
+        self._styles = None
+        self._row_window = iqXMLSSRowWindow()
+        # Number of written rows
+        self._row_count = 0
+        # Hidden cells of vertical merge areas not written yet.
+        # Format: {row number: set(column numbers)}
+        self._merge_hidden = dict()
+        # Maximum column count and column widths of the first row with this column count
+        self._col_count = 0
+        self._col_widths = list()
+
+    def getFilename(self):
+        """
+        Get report filename.
+        """
+        return self._rep_filename
+
+    def startReport(self, report):
+        """
+        Start receiving report rows.
+
+        :param report: Result report data.
+        :return: True/False.
+        """
+        self.close()
+        try:
+            self._rows_file = tempfile.TemporaryFile(mode='w+t', encoding=report_glob_data.DEFAULT_REPORT_ENCODING)
+            self._xml_gen = iqXMLSSGenerator(self._rows_file)
+            self._xml_gen.break_line = STREAM_ROW_BREAK_LINE
+            # Cells of the generated rows are already bound to the interned styles
+            self._styles = report.get('styles', None)
+            self._row_count = 0
+            self._merge_hidden = dict()
+            self._col_count = 0
+            self._col_widths = list()
+            return True
+        except:
+            log_func.fatal(u'Error start report stream')
+        return False
+
+    def writeRow(self, row):
+        """
+        Write finished report row to temporary file.
+
+        :param row: Report row. List of cell dictionaries.
+        :return: True/False.
+        """
+        if self._xml_gen is None:
+            log_func.warning(u'Report stream not started')
+            return False
+
+        self._row_count += 1
+        i_row = self._row_count
+        # Hide the cells of the vertical merge areas of previous rows
+        for i_col in self._merge_hidden.pop(i_row, ()):
+            cell = row[i_col - 1] if i_col <= len(row) else None
+            if cell and (not cell['value']):
+                cell['hidden'] = True
+
+        if len(row) > self._col_count:
+            self._col_count = len(row)
+            self._col_widths = [cell['width'] if cell else 8.43 for cell in row]
+
+        if self._styles is None:
+            for cell in row:
+                if cell is not None:
+                    self._xml_gen.setStyle(cell)
+
+        self._row_window.setRow(i_row - 1, row)
+        self._xml_gen.startRow(row)
+        for i_col in range(len(row)):
+            cell = row[i_col]
+            if cell is not None and not cell.get('hidden', False) and cell['merge_row'] > 1:
+                self._addMergeHidden(i_row, i_col + 1, cell['merge_col'], cell['merge_row'])
+            self._xml_gen.saveCell(i_row, i_col + 1, cell, self._row_window)
+        self._xml_gen.endRow()
+        return True
+
+    def _addMergeHidden(self, row, column, merge_across, merge_down):
+        """
+        Register the cells of the merge area in the next rows to hide.
+
+        :param row: Row.
+        :param column: Column.
+        :param merge_across: Merge cell number.
+        :param merge_down: Merge cell number.
+        """
+        for y in range(1, merge_down):
+            columns = self._merge_hidden.setdefault(row + y, set())
+            for x in range(max(merge_across, 1)):
+                columns.add(column + x)
+
+    def endReport(self, report):
+        """
+        Compose report file from the styles, columns and the written rows.
+
+        :param report: Result report data without rows.
+        :return: True/False.
+        """
+        if self._rows_file is None:
+            log_func.warning(u'Report stream not started')
+            return False
+
+        if not self._rep_filename:
+            rep_dirname = self._rep_dirname if self._rep_dirname else tempfile.gettempdir()
+            self._rep_filename = os.path.join(rep_dirname, REPORT_RESULT_XML_FILENAME_FMT % str(report['name']))
+
+        xml_file = None
+        try:
+            rep_dirname = os.path.dirname(self._rep_filename)
+            if rep_dirname and not os.path.exists(rep_dirname):
+                file_func.createDir(rep_dirname)
+
+            xml_file = open(self._rep_filename, 'wt', encoding=report_glob_data.DEFAULT_REPORT_ENCODING)
+            xml_gen = iqXMLSSGenerator(xml_file)
+            xml_gen.startDocument()
+            xml_gen.startBook()
+
+            # Styles
+            styles = report.get('styles', None)
+            xml_gen.setStyles(styles if styles is not None else self._xml_gen.getStyles())
+            xml_gen.saveStyles()
+
+            # Data
+            xml_gen.startSheet(report['name'], report)
+            xml_gen.saveColumnWidths(self._col_widths)
+            self._rows_file.seek(0)
+            shutil.copyfileobj(self._rows_file, xml_file)
+            xml_gen.endSheet(report)
+
+            xml_gen.endBook()
+            xml_gen.endDocument()
+            xml_file.close()
+            log_func.info(u'Report stream <%s> saved. Rows: %d' % (str_func.toUnicode(self._rep_filename),
+                                                                   self._row_count))
+            return True
+        except:
+            if xml_file:
+                xml_file.close()
+            log_func.fatal(u'Error report write <%s>' % str_func.toUnicode(self._rep_filename))
+        finally:
+            self.close()
+        return False
+
+    def close(self):
+        """
+        Close and delete temporary rows file.
+        """
+        if self._rows_file is not None:
+            self._rows_file.close()
+        self._rows_file = None
+        self._xml_gen = None
+
+
 class iqXMLSSGenerator(saxutils.XMLGenerator):
     """
     Report converter generator class in xml representation.
@@ -182,7 +403,8 @@ class iqXMLSSGenerator(saxutils.XMLGenerator):
         self.break_line = ''
         
         # Cell styles
-        self._styles = []
+        self._style_registry = report_generator.iqReportStyleRegistry()
+        self._styles = self._style_registry.getStyles()
         
         # Current cell index in row
         self.cell_idx = 0
@@ -387,6 +609,21 @@ class iqXMLSSGenerator(saxutils.XMLGenerator):
         self.savePageSetup(report)
         self.endElementLevel('Worksheet')
     
+    def setStyles(self, styles):
+        """
+        Set interned cell styles.
+
+        :param styles: Style list. See report_generator.iqReportStyleRegistry.
+        """
+        self._style_registry = report_generator.iqReportStyleRegistry(styles)
+        self._styles = self._style_registry.getStyles()
+
+    def getStyles(self):
+        """
+        Get cell styles.
+        """
+        return self._styles
+
     def scanStyles(self, sheet):
         """
         Worksheet styles scan.
@@ -405,22 +642,8 @@ class iqXMLSSGenerator(saxutils.XMLGenerator):
         :param cell: Cell attributes.
         :return: Style index in style list.
         """
-        cell_style_idx = self.getStyle(cell)
-        if cell_style_idx is None:
-            # Create style
-            new_idx = len(self._styles)
-            cell_style = copy.deepcopy(SPC_XML_STYLE)
-            cell_style['align'] = cell['align']
-            cell_style['font'] = cell['font']
-            cell_style['border'] = cell['border']
-            cell_style['num_format'] = cell['num_format']
-            cell_style['color'] = cell['color']
-            cell_style['style_id'] = 'x'+str(new_idx)
-            # Set style in cell
-            cell['style_id'] = cell_style['style_id']
-            self._styles.append(cell_style)
-            return new_idx
-        return cell_style_idx
+        cell['style_id'] = self._style_registry.getStyleID(cell, cache_objects=False)
+        return self._style_registry.getStyleIndex(cell['style_id'])
       
     def getStyle(self, cell):
         """
@@ -429,11 +652,10 @@ class iqXMLSSGenerator(saxutils.XMLGenerator):
         :param cell: Cell attributes.
         :return: Style index in style list.
         """
-        find_style = [style for style in self._styles if self._equalStyles(style, cell)]
-
-        if find_style:
-            cell['style_id'] = find_style[0]['style_id']
-            return self._styles.index(find_style[0])
+        style_id = self._style_registry.findStyleID(cell)
+        if style_id is not None:
+            cell['style_id'] = style_id
+            return self._style_registry.getStyleIndex(style_id)
         return None
         
     def _equalStyles(self, style1, style2):
@@ -627,7 +849,14 @@ class iqXMLSSGenerator(saxutils.XMLGenerator):
         """
         Save column attributes.
         """
-        width_cols = self.getWidthColumns(sheet)
+        self.saveColumnWidths(self.getWidthColumns(sheet))
+
+    def saveColumnWidths(self, width_cols):
+        """
+        Save column widths.
+
+        :param width_cols: Column width list.
+        """
         for width_col in width_cols:
             if width_col is not None:
                 self.startElement('Column', {'ss:Width': str(width_col), 'ss:AutoFitWidth': '0'})
@@ -6,15 +6,15 @@ Module of functions of the general interface to the generation system.
 """
 
 from iq.util import log_func
-from iq.util import res_func
 
 from . import xml_report_generator
 from . import ods_report_generator
 # from . import xls_report_generator
 # from . import reportman_generator
 from . import rtf_report_generator
+from . import template_cache_func
 
-__version__ = (0, 0, 2, 1)
+__version__ = (0, 0, 2, 2)
 
 REPORT_GEN_SYSTEM = None
 
@@ -39,7 +39,7 @@ def getReportGeneratorSystem(rep_filename, parent=None, refresh=True):
     :return: Report generator system object or None if error.
     """
     try:
-        rep = res_func.loadResourcePickle(rep_filename)
+        rep = template_cache_func.loadReportResource(rep_filename)
         
         global REPORT_GEN_SYSTEM
 
@@ -33,7 +33,7 @@ from iq.dialog import dlg_func
 
 from . import report_template
 
-__version__ = (0, 0, 1, 3)
+__version__ = (0, 0, 1, 4)
 
 DEFAULT_REP_TMPL_FILE = os.path.join(os.path.dirname(__file__), 'new_report_template.ods')
 
@@ -61,6 +61,37 @@ SQL_SIGNATURE = 'SQL:'
 CODE_SIGNATURE = 'PRG:'
 PY_SIGNATURE = 'PY:'
 
+# Database engines of the process. The connection pool is shared between report runs
+# Key - DB URL
+DB_ENGINE_CACHE = dict()
+
+
+def getDBEngine(db_url):
+    """
+    Get database engine by URL.
+    The engine is created once per process.
+
+    :param db_url: Connection string as url.
+    :return: SQLAlchemy engine object.
+    """
+    db_engine = DB_ENGINE_CACHE.get(db_url, None)
+    if db_engine is None:
+        db_engine = sqlalchemy.create_engine(db_url)
+        DB_ENGINE_CACHE[db_url] = db_engine
+    return db_engine
+
+
+def clearDBEngineCache():
+    """
+    Dispose all database engines of the process.
+
+    :return: True/False.
+    """
+    for db_engine in DB_ENGINE_CACHE.values():
+        db_engine.dispose()
+    DB_ENGINE_CACHE.clear()
+    return True
+
 
 class iqReportGeneratorSystem(object):
     """
@@ -411,7 +442,6 @@ class iqReportGeneratorSystem(object):
         """
         result = None
 
-        db_connection = None
         try:
             if not db_url:
                 data_source = report['data_source']
@@ -429,21 +459,15 @@ class iqReportGeneratorSystem(object):
 
             log_func.info(u'DB URL <%s>' % db_url)
 
-            db_connection = sqlalchemy.create_engine(db_url)
+            db_engine = getDBEngine(db_url)
             log_func.info(u'SQL <%s>' % str_func.toUnicode(sql, 'utf-8'))
-            sql_result = db_connection.execute(sql)
+            sql_result = db_engine.execute(sql)
             records = sql_result.fetchall()
             cols = records[0].keys() if records else []
 
-            db_connection.dispose()
-            db_connection = None
-
             result = {'__fields__': cols, '__data__': list([list(record) for record in records])}
             return result
         except:
-            if db_connection:
-                db_connection.dispose()
-
             log_func.fatal(u'Error defining SQL query table <%s>.' % sql)
         return None
 
@@ -40,7 +40,7 @@ from iq.util import str_func
 from iq.util import exec_func
 from iq.util import dt_func
 
-__version__ = (0, 0, 3, 6)
+__version__ = (0, 0, 4, 4)
 
 # Report cell tags:
 # query table field values
@@ -95,6 +95,7 @@ REPORT_TEMPLATE = {
     'sheet': list(),        # Report cells
     'args': dict(),         # Extended arguments
     'page_setup': None,     # Page setup
+    'styles': None,         # Interned cell styles of generated report (see iqReportStyleRegistry)
     }
 
 
@@ -205,8 +206,211 @@ REP_GRP = {
     'old_rec': None,    # Old query table record
     }
 
+# Compiled cell function types
+REP_FUNC_TYPE_FUNCTION = 'function'
+REP_FUNC_TYPE_EXPRESSION = 'expression'
+REP_FUNC_TYPE_LAMBDA = 'lambda'
+REP_FUNC_TYPE_VARIABLE = 'variable'
+REP_FUNC_TYPE_EXEC = 'exec'
+REP_FUNC_TYPE_SUM = 'sum'
+REP_FUNC_TYPE_AVG = 'avg'
+REP_FUNC_TYPE_NUM = 'num'
+REP_FUNC_TYPE_UNKNOWN_SYS = 'unknown_sys'
+REP_FUNC_TYPE_STYLE = 'style'
+REP_FUNC_TYPE_FIELD = 'field'
+REP_FUNC_TYPE_SUBREPORT = 'subreport'
+REP_FUNC_TYPE_ERROR = 'error'
+REP_FUNC_TYPE_UNSUPPORTED = 'unsupported'
+
 DEFAULT_ENCODING = 'utf-8'
 
+# Cell style attributes
+REP_STYLE_ATTRIBUTES = ('align', 'font', 'border', 'num_format', 'color')
+# Cell style identifier format. Style index is used
+REP_STYLE_ID_FMT = 'x%d'
+
+
+def _freezeStyleValue(value):
+    """
+    Convert cell style attribute value to hashable value.
+
+    :param value: Style attribute value.
+    :return: Hashable value.
+    """
+    if isinstance(value, dict):
+        return dict, tuple(sorted([(key, _freezeStyleValue(val)) for key, val in value.items()]))
+    elif isinstance(value, (list, tuple)):
+        return tuple([_freezeStyleValue(val) for val in value])
+    return value
+
+
+class iqQueryRecordsView(object):
+    """
+    Lazily materialized view of query table records as dictionaries.
+    A record dictionary is created on first access and is reused after.
+    """
+    def __init__(self, query_table=None):
+        """
+        Constructor.
+
+        :param query_table: Query table:
+                {
+                    '__fields__': [field names],
+                    '__data__': [query table data],
+                }.
+        """
+        if not query_table:
+            query_table = dict()
+        self._fields = tuple(query_table.get('__fields__', None) or ())
+        self._data = query_table.get('__data__', None) or ()
+        self._records = [None] * len(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._data)))]
+
+        record = self._records[index]
+        if record is None:
+            record = dict(zip(self._fields, self._data[index]))
+            self._records[index] = record
+        return record
+
+    def __iter__(self):
+        for i in range(len(self._data)):
+            yield self[i]
+
+
+class iqReportRowSink(object):
+    """
+    Finished report row receiver.
+    The report generator emits rows to the sink after each generated band.
+    """
+    def startReport(self, report):
+        """
+        Start receiving report rows.
+
+        :param report: Result report data.
+        :return: True/False.
+        """
+        return True
+
+    def writeRow(self, row):
+        """
+        Receive finished report row.
+
+        :param row: Report row. List of cell dictionaries.
+        :return: True/False.
+        """
+        return True
+
+    def endReport(self, report):
+        """
+        End receiving report rows.
+
+        :param report: Result report data without rows.
+        :return: True/False.
+        """
+        return True
+
+
+class iqReportStyleRegistry(object):
+    """
+    Cell style registry.
+    Equal cell styles are interned into one style with the style identifier.
+    Style structure:
+        {
+            'style_id': Style identifier,
+            'align': Alignment,
+            'font': Font,
+            'border': Borders,
+            'num_format': Cell number format,
+            'color': Colour,
+        }
+    """
+    def __init__(self, styles=None):
+        """
+        Constructor.
+
+        :param styles: Already interned style list.
+        """
+        self._styles = list()
+        # Key - hashable style attribute values. Value - style identifier
+        self._style_index = dict()
+        # Key - style attribute object ids. Value - (style identifier, style attribute objects)
+        # Style attribute objects are kept so that object ids are not reused
+        self._object_index = dict()
+        # Key - style identifier. Value - style index in style list
+        self._style_positions = dict()
+
+        for style in styles or ():
+            self._style_index[self._getStyleKey(style)] = style['style_id']
+            self._style_positions[style['style_id']] = len(self._styles)
+            self._styles.append(style)
+
+    def getStyles(self):
+        """
+        Get interned style list.
+        """
+        return self._styles
+
+    def getStyleIndex(self, style_id):
+        """
+        Get style index in style list.
+
+        :param style_id: Style identifier.
+        :return: Style index or None if style not found.
+        """
+        return self._style_positions.get(style_id, None)
+
+    def _getStyleKey(self, cell):
+        """
+        Get hashable style key of cell.
+        """
+        return tuple([_freezeStyleValue(cell.get(attr_name, None)) for attr_name in REP_STYLE_ATTRIBUTES])
+
+    def findStyleID(self, cell):
+        """
+        Find cell style identifier.
+
+        :param cell: Cell attributes.
+        :return: Style identifier or None if style is not interned.
+        """
+        return self._style_index.get(self._getStyleKey(cell), None)
+
+    def getStyleID(self, cell, cache_objects=True):
+        """
+        Get cell style identifier. Intern a new style.
+
+        :param cell: Cell attributes.
+        :param cache_objects: Remember style attribute objects of the cell?
+            Cells sharing the same style attribute objects get the style identifier
+            without comparing the attribute values.
+            Do not use it for cells with unique style attribute objects.
+        :return: Style identifier.
+        """
+        style_objects = tuple([cell.get(attr_name, None) for attr_name in REP_STYLE_ATTRIBUTES])
+        object_key = tuple([id(style_object) for style_object in style_objects])
+        cache_item = self._object_index.get(object_key, None)
+        if cache_item is not None:
+            return cache_item[0]
+
+        style_key = self._getStyleKey(cell)
+        style_id = self._style_index.get(style_key, None)
+        if style_id is None:
+            style_id = REP_STYLE_ID_FMT % len(self._styles)
+            style = copy.deepcopy(dict(zip(REP_STYLE_ATTRIBUTES, style_objects)))
+            style['style_id'] = style_id
+            self._style_positions[style_id] = len(self._styles)
+            self._styles.append(style)
+            self._style_index[style_key] = style_id
+
+        if cache_objects:
+            self._object_index[object_key] = (style_id, style_objects)
+        return style_id
+
 
 class iqReportGenerator(object):
     """
@@ -249,7 +453,21 @@ class iqReportGenerator(object):
         # Cell format dictionary
         self._cell_format = dict()
 
-    def generate(self, rep_template, query_table, name_space=None, coord_fill=None):
+        # Query table records view for cell expressions
+        self._records = iqQueryRecordsView()
+
+        # Compiled sum formulas. List of (sum dictionary, formula code object)
+        self._sum_formulas = None
+
+        # Finished report row receiver. If None, then all rows are kept in the result report
+        self._row_sink = None
+        # Number of rows already emitted to the row sink
+        self._flushed_row_count = 0
+
+        # Cell style registry of the generated report
+        self._style_registry = iqReportStyleRegistry()
+
+    def generate(self, rep_template, query_table, name_space=None, coord_fill=None, row_sink=None):
         """
         Generate report.
 
@@ -272,9 +490,15 @@ class iqReportGenerator(object):
                     (row, col): 'value',
                 }.
             This dictionary can be transmitted in the query table key __coord_fill__.
+        :param row_sink: Finished report row receiver (iqReportRowSink).
+            If defined, then the rows are emitted to the sink after each band
+            and the generated report data does not contain rows.
         :return: Generated report data.
         """
         try:
+            self._row_sink = row_sink
+            self._flushed_row_count = 0
+
             # Coordinate filling in cell values
             self._coord_replacements = coord_fill
             if query_table and '__coord_fill__' in query_table:
@@ -319,6 +543,11 @@ class iqReportGenerator(object):
 
             self._template_sheet = self._template['sheet']
             self._template_sheet = self._initSumCells(self._template_sheet)
+            # Compile cell functions and sum formulas once before generating
+            self._cell_format = dict()
+            self._style_registry = iqReportStyleRegistry()
+            self._compileSheet(self._template_sheet)
+            self._sum_formulas = self._compileSumFormulas(self._template_sheet)
 
             # II. Init query table
             self._query_table = query_table
@@ -326,6 +555,8 @@ class iqReportGenerator(object):
             self._query_table_rec_count = 0
             if self._query_table and '__data__' in self._query_table:
                 self._query_table_rec_count = len(self._query_table['__data__'])
+            # One records view for all cell evaluations of the run
+            self._records = iqQueryRecordsView(self._query_table)
 
             # Init group band
             for grp in self._template['groups']:
@@ -338,6 +569,9 @@ class iqReportGenerator(object):
             # Create report
             self._report = copy.deepcopy(REPORT_TEMPLATE)
             self._report['name'] = self._report_name
+            self._report['styles'] = self._style_registry.getStyles()
+            if self._row_sink is not None:
+                self._row_sink.startReport(self._report)
 
             # Init variables
             field_idx = dict()      # Field indexes
@@ -364,6 +598,7 @@ class iqReportGenerator(object):
             
             # Header
             self._genHeader(self._template['header'])
+            self._flushRows()
 
             # Main loop
             while i_rec < self._query_table_rec_count:
@@ -400,6 +635,7 @@ class iqReportGenerator(object):
 
                 # Increase the sum of summing cells
                 self._sumIterate(self._template_sheet, self._current_record)
+                self._flushRows()
 
                 # Next record
                 i_rec += 1
@@ -423,9 +659,12 @@ class iqReportGenerator(object):
             # Under
             if self._template['under']:
                 self._genUnder(self._template['under'])
+            self._flushRows()
 
             # Page setup
             self._report['page_setup'] = self._template['page_setup']
+            if self._row_sink is not None and not self._row_sink.endReport(self._report):
+                return None
 
             log_func.info(u'Report <%s>. Generate end. Time: %d sec.' % (str_func.toUnicode(self._report_name),
                                                                          time.time()-time_start))
@@ -435,6 +674,26 @@ class iqReportGenerator(object):
             log_func.fatal(u'Error report generate')
         return None
 
+    def _getReportRowCount(self):
+        """
+        Get the number of generated report rows including rows emitted to the row sink.
+        """
+        return self._flushed_row_count + len(self._report['sheet'])
+
+    def _flushRows(self):
+        """
+        Emit generated report rows to the row sink.
+
+        :return: True/False.
+        """
+        if self._row_sink is None:
+            return False
+        for row in self._report['sheet']:
+            self._row_sink.writeRow(row)
+        self._flushed_row_count += len(self._report['sheet'])
+        self._report['sheet'] = list()
+        return True
+
     def _genHeader(self, header):
         """
         Generate report header.
@@ -445,7 +704,7 @@ class iqReportGenerator(object):
         try:
             # log_func.debug(u'Generate header')
             # We will add to the end of the report, therefore, determine the maximum line
-            max_row = len(self._report['sheet'])
+            max_row = self._getReportRowCount()
             i_row = 0
             cur_height = 0
 
@@ -483,7 +742,7 @@ class iqReportGenerator(object):
                 return True
 
             # We will add to the end of the report, therefore, determine the maximum line
-            max_row = len(self._report['sheet'])
+            max_row = self._getReportRowCount()
             i_row = 0       # Row band count
             cur_height = 0
 
@@ -516,7 +775,7 @@ class iqReportGenerator(object):
         """
         try:
             # We will add to the end of the report, therefore, determine the maximum line
-            max_row = len(self._report['sheet'])
+            max_row = self._getReportRowCount()
             i_row = 0
             cur_height = 0
 
@@ -556,7 +815,7 @@ class iqReportGenerator(object):
             if not band:
                 return False
             # We will add to the end of the report, therefore, determine the maximum line
-            max_row = len(self._report['sheet'])
+            max_row = self._getReportRowCount()
             i_row = 0
             cur_height = 0
 
@@ -590,7 +849,7 @@ class iqReportGenerator(object):
             if not band:
                 return False
 
-            max_row = len(self._report['sheet'])
+            max_row = self._getReportRowCount()
             i_row = 0
             cur_height = 0
 
@@ -621,7 +880,7 @@ class iqReportGenerator(object):
                 self._report['upper'] = upper
                 return True
                 
-            max_row = len(self._report['sheet'])
+            max_row = self._getReportRowCount()
             i_row = 0
             cur_height = 0
 
@@ -657,7 +916,7 @@ class iqReportGenerator(object):
                 self._report['under'] = under
                 return True
                 
-            max_row = len(self._report['sheet'])
+            max_row = self._getReportRowCount()
             i_row = 0
             cur_height = 0
 
@@ -705,6 +964,14 @@ class iqReportGenerator(object):
                                                   self._query_table['__sub__'][sub_rep_name]['__variables__'],
                                                   self._query_table['__sub__'][sub_rep_name]['__coord_fill__'])
 
+                    # Sub report styles are interned in the report style registry
+                    for sub_row in rep_result['sheet']:
+                        for sub_cell in sub_row:
+                            if sub_cell:
+                                sub_cell['style_id'] = self._style_registry.getStyleID(sub_cell, cache_objects=False)
+
+                    # Rows before the current band are already emitted to the row sink
+                    row -= self._flushed_row_count
                     self._report['sheet'] = self._report['sheet'][:row] + rep_result['sheet'] + self._report['sheet'][row:]
             return True
         except:
@@ -725,7 +992,11 @@ class iqReportGenerator(object):
         :return: True/False.
         """
         try:
-            cell = copy.deepcopy(from_sheet[from_row][from_col])
+            template_cell = from_sheet[from_row][from_col]
+            # Cells with code blocks, expressions and functions can change their style attributes,
+            # other cells share the template style attribute objects
+            is_dynamic = self._isDynamicCell(template_cell)
+            cell = copy.deepcopy(template_cell) if is_dynamic else dict(template_cell)
 
             # Correct cell coordinate
             cell['top'] = self._cur_top
@@ -744,28 +1015,146 @@ class iqReportGenerator(object):
             # Filling some default cell attributes
             if self.default_cell_attributes and isinstance(self.default_cell_attributes, dict):
                 cell.update(self.default_cell_attributes)
-                
+
             # Set report cell description
-            if len(to_report['sheet']) <= to_row:
+            # Rows emitted to the row sink are not kept in the report sheet
+            sheet_row = to_row - self._flushed_row_count if to_report is self._report else to_row
+            if len(to_report['sheet']) <= sheet_row:
                 # Expand rows
-                for i_row in range(len(to_report['sheet']), to_row + 1):
+                for i_row in range(len(to_report['sheet']), sheet_row + 1):
                     to_report['sheet'].append([])
-            if len(to_report['sheet'][to_row]) <= to_col:
+            if len(to_report['sheet'][sheet_row]) <= to_col:
                 # Expand columns
-                for i_col in range(len(to_report['sheet'][to_row]), to_col + 1):
-                    to_report['sheet'][to_row].append(None)
+                for i_col in range(len(to_report['sheet'][sheet_row]), to_col + 1):
+                    to_report['sheet'][sheet_row].append(None)
 
             if not cell['visible']:
                 cell['width'] = 0
                 cell['height'] = 0
 
             if cell.get('exist', True):
-                to_report['sheet'][to_row][to_col] = cell
+                # Output cells reference the interned style
+                cell['style_id'] = self._style_registry.getStyleID(cell, cache_objects=not is_dynamic)
+                to_report['sheet'][sheet_row][to_col] = cell
             return True
         except:
             log_func.fatal(u'Error report cell generate <%s>' % self._report_name)
         return False
         
+    def _compileFunction(self, cur_func):
+        """
+        Compile cell function.
+        The function type is defined once and expressions are compiled into code objects.
+
+        :param cur_func: Cell function text.
+        :return: Tuple (function type, function text, compiled payload).
+        """
+        func_body = cur_func[2:-2]
+        try:
+            # Function
+            if re.search(REP_FUNC_PATT, cur_func):
+                return REP_FUNC_TYPE_FUNCTION, cur_func, None
+            # Expression
+            elif re.search(REP_EXP_PATT, cur_func):
+                return REP_FUNC_TYPE_EXPRESSION, cur_func, compile(func_body, '<expression>', 'eval')
+            # Lambda
+            elif re.search(REP_LAMBDA_PATT, cur_func):
+                return REP_FUNC_TYPE_LAMBDA, cur_func, eval('lambda ' + func_body)
+            # Variable
+            elif re.search(REP_VAR_PATT, cur_func):
+                return REP_FUNC_TYPE_VARIABLE, cur_func, func_body
+            # Code block
+            elif re.search(REP_EXEC_PATT, cur_func):
+                return REP_FUNC_TYPE_EXEC, cur_func, compile(func_body.strip(), '<code block>', 'exec')
+            # System function
+            elif re.search(REP_SYS_PATT, cur_func):
+                if cur_func[2:6].lower() == 'sum(':
+                    return REP_FUNC_TYPE_SUM, cur_func, None
+                elif cur_func[2:6].lower() == 'avg(':
+                    return REP_FUNC_TYPE_AVG, cur_func, None
+                elif cur_func[2:-2].lower() == 'n':
+                    return REP_FUNC_TYPE_NUM, cur_func, None
+                return REP_FUNC_TYPE_UNKNOWN_SYS, cur_func, None
+            # Style
+            elif re.search(REP_STYLE_PATT, cur_func):
+                return REP_FUNC_TYPE_STYLE, cur_func, None
+            # Field
+            elif re.search(REP_FIELD_PATT, cur_func):
+                return REP_FUNC_TYPE_FIELD, cur_func, None
+            # Sub report
+            elif re.search(REP_SUBREPORT_PATT, cur_func):
+                return REP_FUNC_TYPE_SUBREPORT, cur_func, None
+        except:
+            log_func.fatal(u'Error compile function <%s> in <%s>' % (str(cur_func), self._report_name))
+            return REP_FUNC_TYPE_ERROR, cur_func, None
+        return REP_FUNC_TYPE_UNSUPPORTED, cur_func, None
+
+    def _compileCellFormat(self, cell_val):
+        """
+        Parse and compile cell value format.
+        The result is kept in the cell format dictionary.
+
+        :param cell_val: Cell value text.
+        :return: Dictionary:
+            {
+            'fmt': The format of a line without lines of executable code is %s;
+            'func': List of lines of executable code;
+            'compiled': List of compiled functions. See _compileFunction.
+            }
+        """
+        parsed_fmt = self._cell_format.get(cell_val, None)
+        if parsed_fmt is None:
+            parsed_fmt = self.parseFunctionText(cell_val)
+            if parsed_fmt is None:
+                return None
+            parsed_fmt['compiled'] = [self._compileFunction(cur_func) for cur_func in parsed_fmt['func']]
+            parsed_fmt['dynamic'] = any([func_type in (REP_FUNC_TYPE_FUNCTION, REP_FUNC_TYPE_EXPRESSION, REP_FUNC_TYPE_EXEC)
+                                         for func_type, cur_func, compiled_func in parsed_fmt['compiled']])
+            self._cell_format[cell_val] = parsed_fmt
+        return parsed_fmt
+
+    def _getCellFormat(self, cell):
+        """
+        Get parsed and compiled cell value format.
+
+        :param cell: Cell.
+        :return: Parsed cell format dictionary. See _compileCellFormat.
+        """
+        cell_val = cell['value']
+        if cell_val is not None and not isinstance(cell_val, str):
+            cell_val = str(cell_val)
+        elif cell_val in (None, 'None'):
+            cell_val = ''
+        return self._compileCellFormat(cell_val)
+
+    def _isDynamicCell(self, cell):
+        """
+        Can the cell change its attributes during generation?
+        Code blocks, expressions and functions have access to the cell.
+
+        :param cell: Template cell.
+        :return: True/False.
+        """
+        parsed_fmt = self._getCellFormat(cell)
+        return bool(parsed_fmt and parsed_fmt['dynamic'])
+
+    def _compileSheet(self, sheet):
+        """
+        Compile all template sheet cells before generating.
+
+        :param sheet: Report template sheet data.
+        :return: True/False.
+        """
+        try:
+            for row in sheet:
+                for cell in row:
+                    if cell:
+                        self._getCellFormat(cell)
+            return True
+        except:
+            log_func.fatal(u'Error compile template sheet <%s>' % self._report_name)
+        return False
+
     def _genText(self, cell, record=None, cell_row=None, cell_col=None):
         """
         Generate text.
@@ -780,87 +1169,83 @@ class iqReportGenerator(object):
         """
         value = u''
         try:
-            cell_val = cell['value']
-            if cell_val is not None and not isinstance(cell_val, str):
-                cell_val = str(cell_val)
-            elif cell_val in (None, 'None'):
-                cell_val = ''
-
-            if cell_val not in self._cell_format:
-                parsed_fmt = self.parseFunctionText(cell_val)
-                self._cell_format[cell_val] = parsed_fmt
-            else:
-                parsed_fmt = self._cell_format[cell_val]
+            parsed_fmt = self._getCellFormat(cell)
+            if not parsed_fmt['compiled']:
+                return self._setValueFormat(parsed_fmt['fmt'], [])
 
             # vvv For use records in generate cell text vvv
-            query_table = self._query_table
-            records = [{field_name: table_rec[i_field] for i_field, field_name in enumerate(query_table.get('__fields__', list()))} for table_rec in query_table.get('__data__', list())]
-            variables = self._variables
-
-            i_record = self._current_record.get('sys_num_rec_idx', 0)
+            name_space = dict(self=self, cell=cell, record=record,
+                              cell_row=cell_row, cell_col=cell_col,
+                              query_table=self._query_table,
+                              records=self._records,
+                              variables=self._variables,
+                              i_record=self._current_record.get('sys_num_rec_idx', 0))
             # ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
 
             func_str = list()   # Result value list
             i_sum = 0
 
-            for cur_func in parsed_fmt['func']:
+            for func_type, cur_func, compiled_func in parsed_fmt['compiled']:
+                name_space['value'] = value
 
                 # Function
-                if re.search(REP_FUNC_PATT, cur_func):
-                    value = self._execFunction(cur_func, locals(), globals())
+                if func_type == REP_FUNC_TYPE_FUNCTION:
+                    value = self._execFunction(cur_func, name_space, globals())
 
                 # Expression
-                elif re.search(REP_EXP_PATT, cur_func):
-                    value = self._execExpression(cur_func, locals(), globals())
+                elif func_type == REP_FUNC_TYPE_EXPRESSION:
+                    value = self._evalCompiledExpression(compiled_func, cur_func, name_space, globals())
 
                 # Lambda
-                elif re.search(REP_LAMBDA_PATT, cur_func):
-                    value = self._execLambda(cur_func, locals(), globals())
+                elif func_type == REP_FUNC_TYPE_LAMBDA:
+                    value = self._callCompiledLambda(compiled_func, cur_func, record)
 
                 # Variable
-                elif re.search(REP_VAR_PATT, cur_func):
-                    value = self._getVariable(cur_func, locals(), globals())
+                elif func_type == REP_FUNC_TYPE_VARIABLE:
+                    value = self._getVariable(cur_func, name_space, globals())
 
                 # Code block
-                elif re.search(REP_EXEC_PATT, cur_func):
-                    value = self._execCodeBlock(cur_func, locals(), globals())
+                elif func_type == REP_FUNC_TYPE_EXEC:
+                    value = self._execCompiledCodeBlock(compiled_func, cur_func, name_space, globals())
 
                 # System function
-                elif re.search(REP_SYS_PATT, cur_func):
-                    # Sum function
-                    if cur_func[2:6].lower() == 'sum(':
-                        if isinstance(cell['sum'][i_sum]['value'], datetime.timedelta):
-                            value = dt_func.strfdelta(cell['sum'][i_sum]['value'])
-                        else:
-                            value = str(cell['sum'][i_sum]['value'])
-                        i_sum += 1  # Next sum
-                    # Average calculation function
-                    elif cur_func[2:6].lower() == 'avg(':
-                        if 'sys_num_rec_idx' not in record:
-                            record['sys_num_rec_idx'] = 0
-                        value = str(cell['sum'][i_sum]['value'] / (record['sys_num_rec_idx'] + 1))
-                        i_sum += 1  # Next sum
-                    elif cur_func[2:-2].lower() == 'n':
-                        if 'sys_num_rec_idx' not in record:
-                            record['sys_num_rec_idx'] = 0
-                        sys_num_rec = record['sys_num_rec_idx']
-                        value = str(sys_num_rec + 1)
+                # Sum function
+                elif func_type == REP_FUNC_TYPE_SUM:
+                    if isinstance(cell['sum'][i_sum]['value'], datetime.timedelta):
+                        value = dt_func.strfdelta(cell['sum'][i_sum]['value'])
                     else:
-                        log_func.warning(u'Unknown system function <%s> in <%s>' % (str_func.toUnicode(cur_func),
-                                                                                    self._report_name))
-                        value = ''
-                        
+                        value = str(cell['sum'][i_sum]['value'])
+                    i_sum += 1  # Next sum
+                # Average calculation function
+                elif func_type == REP_FUNC_TYPE_AVG:
+                    if 'sys_num_rec_idx' not in record:
+                        record['sys_num_rec_idx'] = 0
+                    value = str(cell['sum'][i_sum]['value'] / (record['sys_num_rec_idx'] + 1))
+                    i_sum += 1  # Next sum
+                elif func_type == REP_FUNC_TYPE_NUM:
+                    if 'sys_num_rec_idx' not in record:
+                        record['sys_num_rec_idx'] = 0
+                    sys_num_rec = record['sys_num_rec_idx']
+                    value = str(sys_num_rec + 1)
+                elif func_type == REP_FUNC_TYPE_UNKNOWN_SYS:
+                    log_func.warning(u'Unknown system function <%s> in <%s>' % (str_func.toUnicode(cur_func),
+                                                                                self._report_name))
+                    value = ''
+
                 # Style
-                elif re.search(REP_STYLE_PATT, cur_func):
-                    value = self._setStyle(cur_func, locals(), globals())
+                elif func_type == REP_FUNC_TYPE_STYLE:
+                    value = self._setStyle(cur_func, name_space, globals())
 
                 # Field
-                elif re.search(REP_FIELD_PATT, cur_func):
-                    value = self._getFieldValue(cur_func, locals(), globals())
+                elif func_type == REP_FUNC_TYPE_FIELD:
+                    value = self._getFieldValue(cur_func, name_space, globals())
 
                 # Sub report
-                elif re.search(REP_SUBREPORT_PATT, cur_func):
-                    value = self._genSubReportBlock(cur_func, locals(), globals())
+                elif func_type == REP_FUNC_TYPE_SUBREPORT:
+                    value = self._genSubReportBlock(cur_func, name_space, globals())
+
+                elif func_type == REP_FUNC_TYPE_ERROR:
+                    value = u''
 
                 else:
                     log_func.warning(u'Unsupported function <%s>' % str(cur_func))
@@ -906,13 +1291,27 @@ class iqReportGenerator(object):
         :param globals: Global name space.
         :return: The calculated value as a string or an empty string in case of an error.
         """
+        func_type, cur_func, compiled_func = self._compileFunction(cur_func)
+        if compiled_func is None:
+            return u''
+        return self._evalCompiledExpression(compiled_func, cur_func, locals, globals)
+
+    def _evalCompiledExpression(self, compiled_func, cur_func, locals, globals):
+        """
+        Execute compiled expression.
+
+        :param compiled_func: Compiled expression code object.
+        :param cur_func: Expression text.
+        :param locals: Local name space.
+        :param globals: Global name space.
+        :return: The calculated value or an empty string in case of an error.
+        """
         value = u''
-        exp_body = cur_func[2:-2]
         try:
-            value = eval(exp_body, globals, locals)
+            value = eval(compiled_func, globals, locals)
         except:
-            log_func.fatal(u'Error expression execute <%s>' % exp_body)
-        log_func.debug(u'Execute expression <%s>. Value <%s>' % (exp_body, str(value)))
+            log_func.fatal(u'Error expression execute <%s>' % cur_func[2:-2])
+        log_func.debug(u'Execute expression <%s>. Value <%s>' % (cur_func[2:-2], str(value)))
         return value
 
     def _execLambda(self, cur_func, locals, globals):
@@ -927,21 +1326,28 @@ class iqReportGenerator(object):
         :param globals: Global name space.
         :return: The calculated value as a string or an empty string in case of an error.
         """
-        value = u''
-        lambda_body = cur_func[2:-2]
-        lambda_func = None
-        try:
-            lambda_func = eval('lambda ' + cur_func[2:-2])
-        except:
-            log_func.fatal(u'Error lambda format <%s>' % lambda_body)
+        func_type, cur_func, lambda_func = self._compileFunction(cur_func)
+        if lambda_func is None:
+            log_func.error(u'Error lambda format <%s>' % cur_func[2:-2])
+            return u''
+        record = locals['record'] if 'record' in locals else globals.get('record', dict())
+        return self._callCompiledLambda(lambda_func, cur_func, record)
 
+    def _callCompiledLambda(self, lambda_func, cur_func, record):
+        """
+        Call compiled lambda.
+
+        :param lambda_func: Compiled lambda function.
+        :param cur_func: Call lambda text.
+        :param record: Current record.
+        :return: The calculated value as a string or an empty string in case of an error.
+        """
+        value = u''
         if lambda_func:
             try:
-                record = locals['record'] if 'record' in locals else globals.get('record', dict())
                 value = str(lambda_func(record))
             except:
-                log_func.fatal(u'Error lambda execute <%s>' % lambda_body)
-
+                log_func.fatal(u'Error lambda execute <%s>' % cur_func[2:-2])
         return value
 
     def _execCodeBlock(self, cur_func, locals, globals):
@@ -957,18 +1363,31 @@ class iqReportGenerator(object):
         :param globals: Global name space.
         :return: The calculated value as a string or an empty string in case of an error.
         """
-        value = u''
-        exec_func = cur_func[2:-2].strip()
+        func_type, cur_func, compiled_func = self._compileFunction(cur_func)
+        if compiled_func is None:
+            return u''
+        return self._execCompiledCodeBlock(compiled_func, cur_func, locals, globals)
+
+    def _execCompiledCodeBlock(self, compiled_func, cur_func, locals, globals):
+        """
+        Execute compiled code block.
 
+        :param compiled_func: Compiled code block code object.
+        :param cur_func: Code block text.
+        :param locals: Local name space.
+        :param globals: Global name space.
+        :return: The calculated value as a string or an empty string in case of an error.
+        """
+        value = u''
         try:
-            exec(exec_func, globals, locals)
+            exec(compiled_func, globals, locals)
             # When the code block is executed, the value of the variable is located in the locals namespace.
             # Therefore, after executing the code block, it is necessary
             # to return the variable back to the current function
             value = locals.get('value', u'')
-            log_func.debug(u'Execute code block <%s>. Value [%s]' % (exec_func, value))
+            log_func.debug(u'Execute code block <%s>. Value [%s]' % (cur_func[2:-2].strip(), value))
         except:
-            log_func.fatal(u'Error code block execute <%s>' % exec_func)
+            log_func.fatal(u'Error code block execute <%s>' % cur_func[2:-2].strip())
         return str(value)
 
     def _getVariable(self, cur_func, locals, globals):
@@ -1136,6 +1555,26 @@ class iqReportGenerator(object):
             log_func.fatal(u'Error init cell sum <%s>' % cell)
         return cell
 
+    def _compileSumFormulas(self, sheet):
+        """
+        Compile sum formulas of all sheet cells.
+
+        :param sheet: Report sheet data.
+        :return: List of tuples (sum dictionary, formula code object or None if error).
+        """
+        sum_formulas = list()
+        for row in sheet:
+            for cell in row:
+                if cell and cell['sum']:
+                    for cur_sum in cell['sum']:
+                        try:
+                            formula_code = compile(cur_sum['formul'], '<sum>', 'eval')
+                        except:
+                            log_func.fatal(u'Error compile SUM formula <%s>.' % cur_sum)
+                            formula_code = None
+                        sum_formulas.append((cur_sum, formula_code))
+        return sum_formulas
+
     def _sumIterate(self, sheet, record):
         """
         Sum step.
@@ -1146,38 +1585,35 @@ class iqReportGenerator(object):
              The error returns the old sheet description.
         """
         try:
-            new_sheet = sheet
+            if self._sum_formulas is None:
+                self._sum_formulas = self._compileSumFormulas(sheet)
 
             # vvv For use records in generate cell text vvv
-            query_table = self._query_table
-            records = [{field_name: table_rec[i_field] for i_field, field_name in enumerate(query_table.get('__fields__', list()))} for table_rec in query_table.get('__data__', list())]
-            variables = self._variables
+            name_space = dict(self=self, sheet=sheet, record=record,
+                              query_table=self._query_table,
+                              records=self._records,
+                              variables=self._variables)
             # ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
 
-            for row in range(len(new_sheet)):
-                for col in range(len(new_sheet[row])):
-
-                    if new_sheet[row][col]:
-                        if new_sheet[row][col]['sum'] is not None and new_sheet[row][col]['sum'] is not []:
-                            for cur_sum in new_sheet[row][col]['sum']:
-                                try:
-                                    value = eval(cur_sum['formul'], globals(), locals())
-                                except:
-                                    log_func.fatal(u'Error SUM by formula <%s>.' % cur_sum)
-                                    value = 0.0
-                                try:
-                                    if value is None:
-                                        value = 0.0
-                                    elif isinstance(value, str):
-                                        value = float(value)
-                                    if isinstance(cur_sum['value'], value.__class__):
-                                        cur_sum['value'] += value
-                                    else:
-                                        cur_sum['value'] = value
-                                except:
-                                    log_func.fatal(u'Error SUM iteration: <%s> + <%s>' % (cur_sum['value'], value))
+            for cur_sum, formula_code in self._sum_formulas:
+                try:
+                    value = eval(formula_code, globals(), name_space) if formula_code is not None else 0.0
+                except:
+                    log_func.fatal(u'Error SUM by formula <%s>.' % cur_sum)
+                    value = 0.0
+                try:
+                    if value is None:
+                        value = 0.0
+                    elif isinstance(value, str):
+                        value = float(value)
+                    if isinstance(cur_sum['value'], value.__class__):
+                        cur_sum['value'] += value
+                    else:
+                        cur_sum['value'] = value
+                except:
+                    log_func.fatal(u'Error SUM iteration: <%s> + <%s>' % (cur_sum['value'], value))
 
-            return new_sheet
+            return sheet
         except:
             log_func.fatal(u'Error step sum. Report <%s>' % self._report_name)
         return sheet
@@ -18,10 +18,11 @@ from iq.util import str_func
 
 from . import report_generator
 from . import report_glob_data
+from . import template_cache_func
 
 from iq.components.virtual_spreadsheet import v_spreadsheet
 
-__version__ = (0, 0, 4, 2)
+__version__ = (0, 0, 4, 3)
 
 # Report template tags
 DESCRIPTION_TAG = '[description]'   # Description band
@@ -632,13 +633,22 @@ class iqlXMLSpreadSheetReportTemplate(iqReportTemplate):
         :param tmpl_filename: Report template filename.
         :param template_name: Template name.
         """
-        if self.needUpdate(tmpl_filename, template_name):
+        # The parsed template is taken from the cache while the source file is not changed
+        rep_template = template_cache_func.loadTemplateCache(tmpl_filename, template_name)
+        if rep_template is not None:
+            self.setTemplateFilename(tmpl_filename)
+            self._rep_template = rep_template
+            if self.needUpdate(tmpl_filename, template_name):
+                self.save(tmpl_filename, template_name)
+        elif self.needUpdate(tmpl_filename, template_name):
             # Need update template data
             template_data = self.open(tmpl_filename)
             self._rep_template = self.parse(template_data, template_name)
             self.save(tmpl_filename, template_name)
+            template_cache_func.saveTemplateCache(tmpl_filename, self._rep_template, template_name)
         else:
             self.load(tmpl_filename, template_name)
+            template_cache_func.saveTemplateCache(tmpl_filename, self._rep_template, template_name)
         return self._rep_template
 
     def open(self, tmpl_filename):
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Parsed report template cache functions module.
+
+The parsed and band-resolved report template is saved in the cache file
+beside the report template resource file (*.rep).
+The cache is validated by the template source file modification time and size.
+If they are changed, the cache is validated by the source file content hash,
+so a touched but unchanged template is not parsed again.
+
+Cache file structure:
+    {
+        'version': Cache format version,
+        'src_filename': Template source filename,
+        'src_mtime': Source file modification time (ns),
+        'src_size': Source file size,
+        'src_hash': Source file content hash,
+        'template_name': Template name,
+        'data': Pickled report template data,
+    }
+"""
+
+import os
+import os.path
+import pickle
+import hashlib
+import tempfile
+
+from iq.util import log_func
+
+__version__ = (0, 0, 0, 2)
+
+TEMPLATE_CACHE_FILE_EXT = '.rep_cache'
+TEMPLATE_CACHE_VERSION = 1
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Parsed report template cache in process
+# Key - (source filename, template name)
+# Value - (source modification time, source size, pickled report template data)
+TEMPLATE_CACHE = dict()
+
+# Report template resource cache in process
+# Key - resource filename
+# Value - (resource modification time, resource file data)
+REPORT_RESOURCE_CACHE = dict()
+
+
+def getTemplateCacheFilename(src_filename):
+    """
+    Get parsed report template cache filename.
+    The cache file is located beside the report template resource file.
+
+    :param src_filename: Template source filename.
+    :return: Cache filename.
+    """
+    return os.path.splitext(os.path.abspath(src_filename))[0] + TEMPLATE_CACHE_FILE_EXT
+
+
+def _getFileStat(filename):
+    """
+    Get file modification time (ns) and size.
+
+    :param filename: File path.
+    :return: Tuple (modification time, size) or (None, None) if file not exists.
+    """
+    try:
+        stat = os.stat(filename)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None, None
+
+
+def getFileHash(filename):
+    """
+    Get file content hash.
+
+    :param filename: File path.
+    :return: Hex digest of the file content or None if error.
+    """
+    try:
+        file_hash = hashlib.md5()
+        with open(filename, 'rb') as src_file:
+            for block in iter(lambda: src_file.read(HASH_BLOCK_SIZE), b''):
+                file_hash.update(block)
+        return file_hash.hexdigest()
+    except:
+        log_func.fatal(u'Error get file <%s> hash' % filename)
+    return None
+
+
+def _readTemplateCacheFile(cache_filename):
+    """
+    Read parsed report template cache file.
+
+    :param cache_filename: Cache filename.
+    :return: Cache dictionary or None if error.
+    """
+    if not os.path.isfile(cache_filename):
+        return None
+    try:
+        with open(cache_filename, 'rb') as cache_file:
+            cache = pickle.load(cache_file)
+        if isinstance(cache, dict) and cache.get('version') == TEMPLATE_CACHE_VERSION:
+            return cache
+    except:
+        log_func.fatal(u'Error read report template cache file <%s>' % cache_filename)
+    return None
+
+
+def _writeTemplateCacheFile(cache_filename, cache):
+    """
+    Write parsed report template cache file.
+
+    :param cache_filename: Cache filename.
+    :param cache: Cache dictionary.
+    :return: True/False.
+    """
+    tmp_filename = None
+    try:
+        # The cache is written to a temporary file and replaced atomically.
+        # Pool worker processes never load a truncated cache
+        tmp_file, tmp_filename = tempfile.mkstemp(prefix=os.path.basename(cache_filename) + '.',
+                                                  dir=os.path.dirname(os.path.abspath(cache_filename)))
+        with os.fdopen(tmp_file, 'wb') as cache_file:
+            pickle.dump(cache, cache_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_filename, cache_filename)
+        return True
+    except:
+        log_func.fatal(u'Error write report template cache file <%s>' % cache_filename)
+    if tmp_filename and os.path.exists(tmp_filename):
+        os.remove(tmp_filename)
+    return False
+
+
+def _validateTemplateCache(cache, src_filename, template_name=None):
+    """
+    Validate parsed report template cache by template source file.
+    If the source file is touched but the content is not changed,
+    the cache file is updated with the new modification time.
+
+    :param cache: Cache dictionary.
+    :param src_filename: Template source filename.
+    :param template_name: Template name.
+    :return: True/False.
+    """
+    if not cache or cache.get('src_filename') != src_filename or cache.get('template_name') != template_name:
+        return False
+
+    src_mtime, src_size = _getFileStat(src_filename)
+    if src_mtime is None:
+        return False
+    if cache['src_mtime'] == src_mtime and cache['src_size'] == src_size:
+        return True
+    if cache['src_size'] != src_size or cache['src_hash'] != getFileHash(src_filename):
+        return False
+
+    cache['src_mtime'] = src_mtime
+    _writeTemplateCacheFile(getTemplateCacheFilename(src_filename), cache)
+    return True
+
+
+def isValidTemplateCache(src_filename, template_name=None):
+    """
+    Check if parsed report template cache is actual.
+
+    :param src_filename: Template source filename.
+    :param template_name: Template name.
+    :return: True - cache is actual / False - cache is not actual /
+        None - cache of the source file not exists.
+    """
+    src_filename = os.path.abspath(src_filename)
+    cache_item = TEMPLATE_CACHE.get((src_filename, template_name), None)
+    if cache_item is not None and cache_item[:2] == _getFileStat(src_filename):
+        return True
+
+    cache = _readTemplateCacheFile(getTemplateCacheFilename(src_filename))
+    if cache is None or cache.get('src_filename') != src_filename:
+        # The cache file is absent or is made for other source file (*.ods/*.xml)
+        return None
+    return _validateTemplateCache(cache, src_filename, template_name)
+
+
+def loadTemplateCache(src_filename, template_name=None):
+    """
+    Load parsed report template from cache.
+
+    :param src_filename: Template source filename.
+    :param template_name: Template name.
+    :return: Report template data or None if the cache is not actual.
+    """
+    src_filename = os.path.abspath(src_filename)
+    src_mtime, src_size = _getFileStat(src_filename)
+    if src_mtime is None:
+        return None
+
+    key = (src_filename, template_name)
+    cache_item = TEMPLATE_CACHE.get(key, None)
+    if cache_item is not None and cache_item[0] == src_mtime and cache_item[1] == src_size:
+        return pickle.loads(cache_item[2])
+
+    cache = _readTemplateCacheFile(getTemplateCacheFilename(src_filename))
+    if not _validateTemplateCache(cache, src_filename, template_name):
+        TEMPLATE_CACHE.pop(key, None)
+        return None
+
+    TEMPLATE_CACHE[key] = (cache['src_mtime'], cache['src_size'], cache['data'])
+    log_func.info(u'Report template <%s> loaded from cache' % src_filename)
+    return pickle.loads(cache['data'])
+
+
+def saveTemplateCache(src_filename, template, template_name=None):
+    """
+    Save parsed report template to cache.
+
+    :param src_filename: Template source filename.
+    :param template: Report template data.
+    :param template_name: Template name.
+    :return: True/False.
+    """
+    if template is None:
+        return False
+
+    src_filename = os.path.abspath(src_filename)
+    src_mtime, src_size = _getFileStat(src_filename)
+    if src_mtime is None:
+        log_func.warning(u'Report template source file <%s> not found' % src_filename)
+        return False
+
+    try:
+        data = pickle.dumps(template, pickle.HIGHEST_PROTOCOL)
+    except:
+        log_func.fatal(u'Error pickle report template <%s>' % src_filename)
+        return False
+
+    cache = dict(version=TEMPLATE_CACHE_VERSION,
+                 src_filename=src_filename,
+                 src_mtime=src_mtime,
+                 src_size=src_size,
+                 src_hash=getFileHash(src_filename),
+                 template_name=template_name,
+                 data=data)
+    TEMPLATE_CACHE[(src_filename, template_name)] = (src_mtime, src_size, data)
+    return _writeTemplateCacheFile(getTemplateCacheFilename(src_filename), cache)
+
+
+def invalidateTemplateCache(src_filename=None):
+    """
+    Invalidate parsed report template cache.
+
+    :param src_filename: Template source filename.
+        If None then invalidate all templates in process.
+    :return: True/False.
+    """
+    if src_filename is None:
+        TEMPLATE_CACHE.clear()
+        REPORT_RESOURCE_CACHE.clear()
+        return True
+
+    src_filename = os.path.abspath(src_filename)
+    for key in [key for key in TEMPLATE_CACHE.keys() if key[0] == src_filename]:
+        del TEMPLATE_CACHE[key]
+    cache_filename = getTemplateCacheFilename(src_filename)
+    if os.path.isfile(cache_filename):
+        try:
+            os.remove(cache_filename)
+        except OSError:
+            log_func.fatal(u'Error remove report template cache file <%s>' % cache_filename)
+            return False
+    return True
+
+
+def loadReportResource(rep_filename):
+    """
+    Load report template resource file (*.rep).
+    The file data is kept in process and is read again only
+    if the file modification time is changed.
+
+    :param rep_filename: Report template resource filename.
+    :return: Report template data or None if error.
+    """
+    rep_filename = os.path.abspath(rep_filename)
+    rep_mtime, rep_size = _getFileStat(rep_filename)
+    if rep_mtime is None:
+        log_func.warning(u'Report template resource file <%s> not found' % rep_filename)
+        return None
+
+    cache_item = REPORT_RESOURCE_CACHE.get(rep_filename, None)
+    try:
+        if cache_item is None or cache_item[0] != (rep_mtime, rep_size):
+            with open(rep_filename, 'rb') as rep_file:
+                data = rep_file.read()
+            cache_item = ((rep_mtime, rep_size), data)
+            REPORT_RESOURCE_CACHE[rep_filename] = cache_item
+        return pickle.loads(cache_item[1])
+    except:
+        REPORT_RESOURCE_CACHE.pop(rep_filename, None)
+        log_func.fatal(u'Error load report template resource file <%s>' % rep_filename)
+    return None
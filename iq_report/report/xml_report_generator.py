@@ -19,7 +19,7 @@ from . import report_generator
 from . import report_file
 
 
-__version__ = (0, 0, 2, 1)
+__version__ = (0, 0, 2, 2)
 
 XML_FILENAME_EXT = '.xml'
 
@@ -73,12 +73,14 @@ class iqXMLReportGeneratorSystem(report_gen_system.iqReportGeneratorSystem):
         """
         if report is None:
             report = self._report_template
-        data_rep = self.generateReport(report)
+        # Report rows are written to the XML file during generation
+        rep_stream = report_file.iqXMLSpreadSheetReportStream(rep_dirname=self.getReportDir())
+        try:
+            data_rep = self.generateReport(report, row_sink=rep_stream)
+        finally:
+            rep_stream.close()
         if data_rep:
-            rep_file = report_file.iqXMLSpreadSheetReportFile()
-            rep_file_name = os.path.join(self.getReportDir(),
-                                         '%s_report_result.xml' % str(data_rep['name']))
-            rep_file.write(rep_file_name, data_rep)
+            rep_file_name = rep_stream.getFilename()
             log_func.info(u'Save report file <%s>' % rep_file_name)
             return rep_file_name
         return None
@@ -230,7 +232,7 @@ class iqXMLReportGeneratorSystem(report_gen_system.iqReportGeneratorSystem):
 
             # 2. Run generation
             rep = report_generator.iqReportGenerator()
-            data_rep = rep.generate(self._report_template, query_tbl)
+            data_rep = rep.generate(self._report_template, query_tbl, row_sink=kwargs.get('row_sink', None))
 
             return data_rep
         except: